@@ -0,0 +1,5 @@
+"""Throughput and scaling benchmarks for the game's hot paths.
+
+Run with `python -m benchmarks run`, and compare two result files with
+`python -m benchmarks compare`.
+"""
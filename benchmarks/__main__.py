@@ -0,0 +1,204 @@
+"""Command line entrypoint for the benchmarks.
+
+    python -m benchmarks run [-o results.json] [--quick] [-k filter]
+    python -m benchmarks compare baseline.json results.json [--threshold 0.1]
+    python -m benchmarks startup [--budget-ms 80] [--runs 10]
+    python -m benchmarks memory [--quick]
+"""
+
+import argparse
+import curses
+import sys
+
+from benchmarks.cases import QUICK_BOARDS, QUICK_LENGTHS, BOARDS, LENGTHS
+from benchmarks.memory import (
+    MEMORY_BOARDS,
+    MEMORY_LENGTHS,
+    measure_bodies,
+    measure_grids
+)
+from benchmarks.startup import measure_imports, slowest, total_us
+from benchmarks.results import (
+    compare,
+    format_comparison,
+    load,
+    result_key,
+    run_cases,
+    save
+)
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the benchmarks and save the results.
+
+    :param args: The parsed command line arguments.
+
+    :return: The exit code.
+    """
+    lengths = QUICK_LENGTHS if args.quick else LENGTHS
+    boards = QUICK_BOARDS if args.quick else BOARDS
+
+    # the cases need curses windows, but nothing is drawn to the terminal
+    curses.initscr()
+    try:
+        results = run_cases(
+            lengths=lengths,
+            boards=boards,
+            min_time=args.min_time,
+            name_filter=args.filter
+        )
+    finally:
+        try:
+            curses.endwin()
+        except curses.error:
+            # there is no terminal to restore when the output is redirected
+            pass
+
+    for result in results["results"]:
+        print(
+            f"{result_key(result):<60} {result['best_ns']:>14.0f}ns "
+            f"{result['ops_per_sec']:>12.0f}/s"
+        )
+
+    save(results, args.output)
+    return 0
+
+
+def compare_runs(args: argparse.Namespace) -> int:
+    """Compare two saved runs, and fail if there are regressions.
+
+    :param args: The parsed command line arguments.
+
+    :return: 1 if any case regressed, 0 otherwise.
+    """
+    rows = compare(load(args.baseline), load(args.current), args.threshold)
+    print(format_comparison(rows))
+    return 1 if any(row[4] for row in rows) else 0
+
+
+def startup(args: argparse.Namespace) -> int:
+    """Time importing the game, and fail if it's over budget.
+
+    :param args: The parsed command line arguments.
+
+    :return: 1 if the fastest run was over budget, 0 otherwise.
+    """
+    runs = [measure_imports(args.module) for _ in range(args.runs)]
+    best = min(runs, key=lambda times: total_us(times, args.module))
+    best_ms = total_us(best, args.module) / 1000
+
+    for time in slowest(best, args.top):
+        print(f"{time.module:<40} {time.self_us:>8}us {time.cumulative_us:>8}us")
+    print(f"importing {args.module} took {best_ms:.1f}ms (budget {args.budget_ms}ms)")
+    return 1 if best_ms > args.budget_ms else 0
+
+
+def memory(args: argparse.Namespace) -> int:
+    """Measure the memory held by each way of storing the snake, and by each
+    grid tracking it.
+
+    :param args: The parsed command line arguments.
+
+    :return: The exit code.
+    """
+    lengths = MEMORY_LENGTHS[:2] if args.quick else MEMORY_LENGTHS
+    usages = measure_bodies(lengths, MEMORY_BOARDS)
+    usages += measure_grids(lengths, MEMORY_BOARDS)
+    for usage in usages:
+        size = f"{usage.length} on {usage.width}x{usage.height}"
+        print(
+            f"{usage.body:<10} {size:<24} {usage.bytes:>12}B "
+            f"{usage.bytes_per_segment:>10.1f}B/segment"
+        )
+    return 0
+
+
+def main() -> int:
+    """Parse the command line and run the chosen command.
+
+    :return: The exit code.
+    """
+    parser = argparse.ArgumentParser("python -m benchmarks")
+    commands = parser.add_subparsers(required=True)
+
+    run_parser = commands.add_parser("run", help="time the hot paths")
+    run_parser.add_argument("-o", "--output", default="benchmarks.json")
+    run_parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="skip the largest snakes and boards"
+    )
+    run_parser.add_argument(
+        "-k",
+        "--filter",
+        default="",
+        help="only run cases with this in their name"
+    )
+    run_parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="seconds to time each case at each size (default: %(default)s)"
+    )
+    run_parser.set_defaults(command=run)
+
+    compare_parser = commands.add_parser(
+        "compare",
+        help="flag regressions against a baseline"
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="fraction slower that counts as a regression (default: %(default)s)"
+    )
+    compare_parser.set_defaults(command=compare_runs)
+
+    startup_parser = commands.add_parser(
+        "startup",
+        help="check the time taken to import the game against a budget"
+    )
+    startup_parser.add_argument(
+        "--module",
+        default="main",
+        help="module to import (default: %(default)s)"
+    )
+    startup_parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=80.0,
+        help="milliseconds the fastest run may take (default: %(default)s)"
+    )
+    startup_parser.add_argument(
+        "--runs",
+        type=int,
+        default=10,
+        help="number of fresh interpreters to time (default: %(default)s)"
+    )
+    startup_parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="number of slowest imports to list (default: %(default)s)"
+    )
+    startup_parser.set_defaults(command=startup)
+
+    memory_parser = commands.add_parser(
+        "memory",
+        help="compare the memory of each way of storing the snake"
+    )
+    memory_parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="skip the longest snakes"
+    )
+    memory_parser.set_defaults(command=memory)
+
+    args = parser.parse_args()
+    return args.command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,491 @@
+"""Benchmark cases for the game's hot paths. Each case is timed across snake
+lengths and board sizes.
+"""
+
+import copy
+import curses
+import itertools
+from typing import Callable, NamedTuple
+
+from engine import BitGame, SafetyGrid
+from entities import Facing, Pellet, Player
+from entities.compact import CompactPlayer
+from entities.runs import RunLengthPlayer
+from entities.segment import Segment
+from entities.vacate import VacateGrid
+from state import Game
+from utils.curses import printf
+
+
+LENGTHS = (5, 100, 1_000, 10_000)
+"""Snake lengths to time each case with."""
+BOARDS = ((80, 24), (200, 60), (1_000, 1_000))
+"""Window sizes (width, height) to time each case with."""
+
+QUICK_LENGTHS = LENGTHS[:3]
+"""Snake lengths for a quick run."""
+QUICK_BOARDS = BOARDS[:2]
+"""Window sizes for a quick run."""
+
+
+class Timed(NamedTuple):
+    """The function to time, and how to time it."""
+    run: Callable[[], object]
+    """The function to time."""
+    reset: Callable[[], object] | None = None
+    """Puts the state back before each round of calls."""
+    batch: int = 1
+    """Number of calls to make in each round."""
+
+
+class Case(NamedTuple):
+    """A benchmark, and which sizes to run it at."""
+    name: str
+    """Name of the benchmark."""
+    setup: Callable[[int, int, int], Timed]
+    """Makes the function to time, from the snake length and window size."""
+    max_work: int | None = None
+    """Skip sizes where the snake length times the field area is larger than
+    this. For cases that are too slow to time at every size."""
+    uses_length: bool = True
+    """False for cases that don't have a snake, which only need to run at the
+    first length."""
+
+
+def field(width: int, height: int) -> tuple[int, int, int, int]:
+    """Get the bounds of the playable field for a game window, without making
+    the game.
+
+    :param width: Width of the window.
+    :param height: Height of the window.
+
+    :return: left, right, upper, and lower bounds of the field.
+    """
+    border = 1
+    header = 1
+    return border, width - border, border, height - header - border
+
+
+def serpentine(length: int, width: int, height: int) -> list[tuple[int, int]]:
+    """Lay a snake out row by row from the top of the field, turning at each
+    side. The head is on the lowest row, so it can move straight down.
+
+    :param length: Number of segments.
+    :param width: Width of the window.
+    :param height: Height of the window.
+
+    :return: The segment positions, head first.
+    """
+    left, right, upper, _ = field(width, height)
+    row_width = right - left
+
+    positions = []
+    for num in range(length):
+        row, col = divmod(num, row_width)
+        x_pos = left + col if row % 2 == 0 else right - 1 - col
+        positions.append((x_pos, upper + row))
+
+    positions.reverse()
+    return positions
+
+
+def free_rows(length: int, width: int, height: int) -> int:
+    """Get the number of moves the laid out snake can make straight down
+    before it reaches the last row of the field.
+
+    :param length: Number of segments.
+    :param width: Width of the window.
+    :param height: Height of the window.
+
+    :return: The number of moves.
+    """
+    _, _, _, lower = field(width, height)
+    head_y = serpentine(length, width, height)[0][1]
+    return lower - head_y - 2
+
+
+def fits(length: int, width: int, height: int) -> bool:
+    """Check that a snake of the length leaves room to move on the field.
+
+    :param length: Number of segments.
+    :param width: Width of the window.
+    :param height: Height of the window.
+
+    :return: True if the snake can be laid out with free rows below it.
+    """
+    left, right, upper, lower = field(width, height)
+    return (
+        right - left > 1
+        and length <= (right - left) * (lower - upper) // 2
+        and free_rows(length, width, height) >= 1
+    )
+
+
+def place(player: Player, positions: list[tuple[int, int]]):
+    """Put the snake back at the given positions, facing down.
+
+    :param player: The snake to move.
+    :param positions: The segment positions, head first.
+    """
+    player.segments = [Segment(x_pos, y_pos) for x_pos, y_pos in positions]
+    player.facing = Facing.DOWN
+    player._facing_buffer.clear() #pylint: disable=protected-access
+
+
+def laid_out_player(
+    length: int,
+    width: int,
+    height: int,
+    player_type: type[Player] = Player
+) -> Player:
+    """Make a snake laid out on the field.
+
+    :param length: Number of segments.
+    :param width: Width of the window.
+    :param height: Height of the window.
+    :param player_type: The class of the snake.
+
+    :return: The snake.
+    """
+    player = player_type(0, 0, 1)
+    place(player, serpentine(length, width, height))
+    return player
+
+
+def laid_out_game(
+    length: int,
+    width: int,
+    height: int,
+    pellet_count: int = 1
+) -> Game:
+    """Make a game with a laid out snake, and pellets filling the field from
+    the bottom right corner, out of the snake's way.
+
+    :param length: Number of segments.
+    :param width: Width of the window.
+    :param height: Height of the window.
+    :param pellet_count: Number of pellets. Fewer are placed if they don't
+        fit.
+
+    :return: The game.
+    """
+    game = Game(width, height, 10, pellet_count=pellet_count)
+    positions = serpentine(length, width, height)
+    place(game.player, positions)
+
+    left, right, upper, lower = field(width, height)
+    snake = set(positions)
+    head_x = positions[0][0]
+    game.pellets = list(
+        itertools.islice(
+            (
+                Pellet(x_pos, y_pos)
+                for y_pos in range(lower - 1, upper - 1, -1)
+                for x_pos in range(right - 1, left - 1, -1)
+                if x_pos != head_x and (x_pos, y_pos) not in snake
+            ),
+            pellet_count
+        )
+    )
+    return game
+
+
+def player_move(length: int, width: int, height: int) -> Timed:
+    """Move the snake down through the free rows."""
+    positions = serpentine(length, width, height)
+    player = laid_out_player(length, width, height)
+    return Timed(
+        player.move,
+        lambda: place(player, positions),
+        free_rows(length, width, height)
+    )
+
+
+def player_check_body_hit(length: int, width: int, height: int) -> Timed:
+    """Check a snake that isn't overlapping itself."""
+    player = laid_out_player(length, width, height)
+    return Timed(player.check_body_hit, batch=10)
+
+
+def player_space_occupied(length: int, width: int, height: int) -> Timed:
+    """Check a free space, which has to be compared to every segment."""
+    player = laid_out_player(length, width, height)
+    _, right, _, lower = field(width, height)
+    return Timed(
+        lambda: player.space_occupied(right - 1, lower - 1),
+        batch=10
+    )
+
+
+def compact_move(length: int, width: int, height: int) -> Timed:
+    """Move a snake stored in arrays down through the free rows."""
+    positions = serpentine(length, width, height)
+    player = laid_out_player(length, width, height, CompactPlayer)
+    return Timed(
+        player.move,
+        lambda: place(player, positions),
+        free_rows(length, width, height)
+    )
+
+
+def compact_check_body_hit(length: int, width: int, height: int) -> Timed:
+    """Check a snake stored in arrays that isn't overlapping itself."""
+    player = laid_out_player(length, width, height, CompactPlayer)
+    return Timed(player.check_body_hit, batch=10)
+
+
+def runs_move(length: int, width: int, height: int) -> Timed:
+    """Move a run-length encoded snake down through the free rows."""
+    positions = serpentine(length, width, height)
+    player = laid_out_player(length, width, height, RunLengthPlayer)
+    return Timed(
+        player.move,
+        lambda: place(player, positions),
+        free_rows(length, width, height)
+    )
+
+
+def runs_check_body_hit(length: int, width: int, height: int) -> Timed:
+    """Check a run-length encoded snake that isn't overlapping itself."""
+    player = laid_out_player(length, width, height, RunLengthPlayer)
+    return Timed(player.check_body_hit, batch=10)
+
+
+LOOKAHEAD = 10
+"""Number of moves ahead the lookahead cases look."""
+
+
+def lookahead_simulate(length: int, width: int, height: int) -> Timed:
+    """Check if a cell near the tail is free a few moves ahead, by moving a
+    copy of the snake."""
+    player = laid_out_player(length, width, height)
+    x_pos, y_pos = serpentine(length, width, height)[-LOOKAHEAD // 2]
+
+    def lookahead() -> bool:
+        future = copy.deepcopy(player)
+        for _ in range(LOOKAHEAD):
+            future.move()
+        return not future.space_occupied(x_pos, y_pos)
+
+    return Timed(lookahead)
+
+
+def lookahead_grid(length: int, width: int, height: int) -> Timed:
+    """Check if a cell near the tail is free a few moves ahead, with a
+    single read of the vacate grid."""
+    player = laid_out_player(length, width, height)
+    grid = VacateGrid(*field(width, height))
+    player.track(grid)
+    x_pos, y_pos = serpentine(length, width, height)[-LOOKAHEAD // 2]
+    return Timed(lambda: grid.free_in(x_pos, y_pos, LOOKAHEAD), batch=10)
+
+
+def vacate_move(length: int, width: int, height: int) -> Timed:
+    """Move a snake that keeps a vacate grid down through the free rows."""
+    positions = serpentine(length, width, height)
+    player = laid_out_player(length, width, height)
+    grid = VacateGrid(*field(width, height))
+
+    def reset():
+        place(player, positions)
+        player.track(grid)
+
+    return Timed(player.move, reset, free_rows(length, width, height))
+
+
+def bitboard_step(length: int, width: int, height: int) -> Timed:
+    """Move a snake kept in bitboards down through the free rows."""
+    positions = serpentine(length, width, height)
+    bit_game = BitGame.from_game(laid_out_game(length, width, height))
+
+    def reset():
+        bit_game.layout(positions)
+        bit_game.facing = Facing.DOWN
+
+    return Timed(bit_game.step, reset, free_rows(length, width, height))
+
+
+def bitboard_reachable(length: int, width: int, height: int) -> Timed:
+    """Count the free cells the head can reach, by flooding the bitboard."""
+    bit_game = BitGame.from_game(laid_out_game(length, width, height))
+    return Timed(bit_game.reachable)
+
+
+def bitboard_clone(length: int, width: int, height: int) -> Timed:
+    """Fork the game state, as a tree search does for every rollout."""
+    bit_game = BitGame.from_game(laid_out_game(length, width, height))
+    return Timed(bit_game.clone, batch=10)
+
+
+def bitboard_rollout(length: int, width: int, height: int) -> Timed:
+    """Fork the game state and play the fork a few moves ahead."""
+    bit_game = BitGame.from_game(laid_out_game(length, width, height))
+    moves = min(LOOKAHEAD, free_rows(length, width, height))
+
+    def rollout() -> BitGame:
+        future = bit_game.clone()
+        future.step(moves)
+        return future
+
+    return Timed(rollout)
+
+
+def safety_reachable(length: int, width: int, height: int) -> Timed:
+    """Count the free cells the head can reach after a move, from the free
+    regions kept up to date as the snake moves."""
+    game = laid_out_game(length, width, height)
+    grid = SafetyGrid.attach(game)
+    return Timed(lambda: grid.reachable(Facing.DOWN), batch=10)
+
+
+def safety_move(length: int, width: int, height: int) -> Timed:
+    """Move a snake that keeps the free regions up to date down through the
+    free rows."""
+    positions = serpentine(length, width, height)
+    game = laid_out_game(length, width, height)
+    grid = SafetyGrid.attach(game)
+
+    def reset():
+        place(game.player, positions)
+        game.player.track(grid)
+
+    return Timed(game.player.move, reset, free_rows(length, width, height))
+
+
+def game_new_pellet(length: int, width: int, height: int) -> Timed:
+    """Spawn a pellet on the field."""
+    game = laid_out_game(length, width, height)
+
+    def reset():
+        game.pellets = []
+
+    return Timed(
+        game._new_pellet, #pylint: disable=protected-access
+        reset
+    )
+
+
+def game_update(length: int, width: int, height: int) -> Timed:
+    """Update the game while the snake moves down through the free rows."""
+    positions = serpentine(length, width, height)
+    game = laid_out_game(length, width, height)
+    pellets = list(game.pellets)
+
+    def reset():
+        place(game.player, positions)
+        game.pellets = list(pellets)
+        game.done = False
+
+    return Timed(game.update, reset, free_rows(length, width, height))
+
+
+def game_update_pellets(count: int) -> Callable[[int, int, int], Timed]:
+    """Make a case that updates a game with many pellets on the field, none of
+    them in the snake's way.
+
+    :param count: Number of pellets.
+
+    :return: The case's setup.
+    """
+    def setup(length: int, width: int, height: int) -> Timed:
+        positions = serpentine(length, width, height)
+        game = laid_out_game(length, width, height, count)
+        pellets = list(game.pellets)
+
+        def reset():
+            place(game.player, positions)
+            game.pellets = pellets
+            game.done = False
+
+        return Timed(game.update, reset, free_rows(length, width, height))
+
+    return setup
+
+
+def game_spawn_pellets(length: int, width: int, height: int) -> Timed:
+    """Replace one of 500 pellets on the field."""
+    game = laid_out_game(length, width, height, 500)
+
+    def reset():
+        # new pellets go on the end, so this removes the last one added
+        last = game.pellets[-1]
+        game.pellet_map.remove_at(last.x_pos, last.y_pos)
+
+    return Timed(
+        game._new_pellet, #pylint: disable=protected-access
+        reset
+    )
+
+
+def game_draw(length: int, width: int, height: int) -> Timed:
+    """Draw the header, field, snake and pellet to the window buffers."""
+    game = laid_out_game(length, width, height)
+    return Timed(game.draw, batch=10)
+
+
+def curses_printf(_length: int, width: int, height: int) -> Timed:
+    """Center a line as wide as the window."""
+    window = curses.newwin(height, width)
+    line = "N" * width
+    return Timed(
+        lambda: printf(window, line, 0, 0, width, "center"),
+        batch=10
+    )
+
+
+CASES = (
+    Case("player.move", player_move),
+    Case("player.check_body_hit", player_check_body_hit),
+    Case("player.space_occupied", player_space_occupied),
+    Case("compact.move", compact_move),
+    Case("compact.check_body_hit", compact_check_body_hit),
+    Case("runs.move", runs_move),
+    Case("runs.check_body_hit", runs_check_body_hit),
+    Case("lookahead.simulate", lookahead_simulate, max_work=20_000_000),
+    Case("lookahead.grid", lookahead_grid),
+    Case("vacate.move", vacate_move),
+    Case("bitboard.step", bitboard_step),
+    Case("bitboard.reachable", bitboard_reachable),
+    Case("bitboard.clone", bitboard_clone),
+    Case("bitboard.rollout", bitboard_rollout),
+    Case("safety.reachable", safety_reachable),
+    Case("safety.move", safety_move),
+    Case("game._new_pellet", game_new_pellet, max_work=20_000_000),
+    Case("game.update", game_update),
+    Case("game.update_10_pellets", game_update_pellets(10)),
+    Case("game.update_500_pellets", game_update_pellets(500)),
+    Case("game.spawn_500_pellets", game_spawn_pellets),
+    Case("game.draw", game_draw),
+    Case("curses.printf", curses_printf, uses_length=False)
+)
+"""Every benchmark case."""
+
+
+def sizes(
+    case: Case,
+    lengths: tuple[int, ...] = LENGTHS,
+    boards: tuple[tuple[int, int], ...] = BOARDS
+) -> list[tuple[int, int, int]]:
+    """Get the sizes to run a case at: every combination of snake length and
+    window size where the snake fits, and the work is within the case's limit.
+
+    :param case: The case to run.
+    :param lengths: Snake lengths to try.
+    :param boards: Window sizes to try.
+
+    :return: The snake length, window width and window height of each size.
+    """
+    if not case.uses_length:
+        lengths = lengths[:1]
+
+    result = []
+    for width, height in boards:
+        left, right, upper, lower = field(width, height)
+        area = (right - left) * (lower - upper)
+        for length in lengths:
+            if not fits(length, width, height):
+                continue
+            if case.max_work is not None and length * area > case.max_work:
+                continue
+            result.append((length, width, height))
+    return result
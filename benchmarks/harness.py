@@ -0,0 +1,57 @@
+"""Timing harness for the benchmark cases."""
+
+import time
+from typing import Callable
+
+
+def measure(
+    run: Callable[[], object],
+    reset: Callable[[], object] | None = None,
+    batch: int = 1,
+    min_time: float = 0.2,
+    max_rounds: int = 10_000
+) -> dict[str, float | int]:
+    """Time a function in rounds of calls, until enough time has been spent.
+    The reset function is called before each round, and isn't timed. This is
+    for cases that change the state they run on, like moving the snake.
+
+    At least one round is always timed, however long it takes.
+
+    :param run: The function to time.
+    :param reset: Puts the state back before each round, when given.
+    :param batch: Number of calls to time in each round.
+    :param min_time: Seconds of timed calls to stop after.
+    :param max_rounds: Maximum number of rounds to time.
+
+    :return: The number of calls, and the mean and best per-call time of the
+        rounds in nanoseconds, and the calls per second from the mean.
+    """
+    clock = time.perf_counter_ns
+    calls = range(batch)
+
+    total = 0
+    best = None
+    rounds = 0
+    while True:
+        if reset is not None:
+            reset()
+
+        start = clock()
+        for _ in calls:
+            run()
+        elapsed = clock() - start
+
+        total += elapsed
+        rounds += 1
+        best = elapsed if best is None else min(best, elapsed)
+
+        if rounds >= max_rounds or total >= min_time * 1e9:
+            break
+
+    mean_ns = total / (rounds * batch)
+    return {
+        "calls": rounds * batch,
+        "mean_ns": mean_ns,
+        "best_ns": (best or 0) / batch,
+        "ops_per_sec": 1e9 / mean_ns if mean_ns else 0.0
+    }
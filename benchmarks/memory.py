@@ -0,0 +1,142 @@
+"""Memory used by each way of storing the snake's body, and the grids that
+track it."""
+
+import tracemalloc
+from typing import Callable, Iterable, NamedTuple
+
+from benchmarks.cases import field, fits, laid_out_player, serpentine
+from entities import Player
+from entities.compact import CompactPlayer
+from entities.runs import RunLengthPlayer
+from entities.sparse import SparseGrid
+from entities.vacate import VacateGrid
+
+
+MEMORY_LENGTHS = (1_000, 10_000, 100_000)
+"""Snake lengths to measure."""
+MEMORY_BOARDS = ((200, 60), (1_000, 1_000))
+"""Window sizes (width, height) to lay the snakes out on."""
+
+BODIES: dict[str, type[Player]] = {
+    "segments": Player,
+    "compact": CompactPlayer,
+    "runs": RunLengthPlayer
+}
+"""Each snake class, by the name shown in the results."""
+
+GRIDS: dict[str, Callable[[int, int], VacateGrid]] = {
+    "dense": lambda width, height: VacateGrid(*field(width, height)),
+    "sparse": lambda width, height: SparseGrid()
+}
+"""Makes each kind of vacate grid for a window size, by the name shown in the
+results."""
+
+
+class MemoryUsage(NamedTuple):
+    """Memory held by one snake."""
+
+    body: str
+    """Name of the snake class, or of the grid."""
+    length: int
+    """Number of segments."""
+    width: int
+    """Width of the window the snake was laid out on."""
+    height: int
+    """Height of the window the snake was laid out on."""
+    bytes: int
+    """Bytes allocated for the snake or grid and still held once it was
+    made."""
+
+
+    @property
+    def bytes_per_segment(self) -> float:
+        """Bytes held for each segment of the snake."""
+        return self.bytes / self.length
+
+
+def retained_bytes(build: Callable[[], object]) -> int:
+    """Measure the memory held by what a function makes. Temporary
+    allocations made along the way aren't counted.
+
+    :param build: Makes the object to measure.
+
+    :return: Bytes still allocated after the function returns, while its
+        result is kept alive.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def measure_bodies(
+    lengths: tuple[int, ...] = MEMORY_LENGTHS,
+    boards: tuple[tuple[int, int], ...] = MEMORY_BOARDS
+) -> list[MemoryUsage]:
+    """Lay out snakes of each class on the field row by row, like the speed
+    benchmarks, and measure the memory each one holds.
+
+    :param lengths: Snake lengths to measure.
+    :param boards: Window sizes to lay the snakes out on.
+
+    :return: The memory of every snake class at every size the snake fits.
+    """
+    usage = []
+    for width, height in boards:
+        for length in lengths:
+            if not fits(length, width, height):
+                continue
+            for name, body in BODIES.items():
+                held = retained_bytes(
+                    # pylint: disable-next=cell-var-from-loop
+                    lambda: laid_out_player(length, width, height, body)
+                )
+                usage.append(MemoryUsage(name, length, width, height, held))
+    return usage
+
+
+def laid_out_grid(
+    grid: VacateGrid,
+    cells: Iterable[tuple[int, int]]
+) -> VacateGrid:
+    """Lay a snake out on a grid.
+
+    :param grid: The grid.
+    :param cells: The position of each segment, head first.
+
+    :return: The grid.
+    """
+    grid.layout(cells)
+    return grid
+
+
+def measure_grids(
+    lengths: tuple[int, ...] = MEMORY_LENGTHS,
+    boards: tuple[tuple[int, int], ...] = MEMORY_BOARDS
+) -> list[MemoryUsage]:
+    """Lay out snakes on each kind of grid, and measure the memory each grid
+    holds.
+
+    :param lengths: Snake lengths to measure.
+    :param boards: Window sizes to lay the snakes out on.
+
+    :return: The memory of every grid at every size the snake fits.
+    """
+    usage = []
+    for width, height in boards:
+        for length in lengths:
+            if not fits(length, width, height):
+                continue
+            cells = serpentine(length, width, height)
+            for name, make in GRIDS.items():
+                held = retained_bytes(
+                    # pylint: disable-next=cell-var-from-loop
+                    lambda: laid_out_grid(make(width, height), cells)
+                )
+                usage.append(MemoryUsage(name, length, width, height, held))
+    return usage
@@ -0,0 +1,145 @@
+"""Running the benchmark cases, and saving and comparing their results."""
+
+import datetime
+import json
+import platform
+from typing import Callable
+
+from benchmarks.cases import BOARDS, CASES, LENGTHS, Case, sizes
+from benchmarks.harness import measure
+
+
+def result_key(result: dict) -> str:
+    """Get the name that identifies a result across runs.
+
+    :param result: A single result.
+
+    :return: The case name and its parameters.
+    """
+    params = ",".join(
+        f"{name}={value}"
+        for name, value in sorted(result["params"].items())
+    )
+    return f"{result['name']}[{params}]"
+
+
+def run_cases( #pylint: disable=too-many-arguments,too-many-positional-arguments
+    cases: tuple[Case, ...] = CASES,
+    lengths: tuple[int, ...] = LENGTHS,
+    boards: tuple[tuple[int, int], ...] = BOARDS,
+    min_time: float = 0.2,
+    name_filter: str = "",
+    progress: Callable[[dict], object] | None = None
+) -> dict:
+    """Run every case at every size. Curses has to be initialized first.
+
+    :param cases: The cases to run.
+    :param lengths: Snake lengths to run each case with.
+    :param boards: Window sizes to run each case with.
+    :param min_time: Seconds to spend timing each case at each size.
+    :param name_filter: Only run cases with this in their name.
+    :param progress: Called with each result as it is finished.
+
+    :return: The run's metadata and results, ready to be saved as JSON.
+    """
+    results = []
+    for case in cases:
+        if name_filter not in case.name:
+            continue
+
+        for length, width, height in sizes(case, lengths, boards):
+            timed = case.setup(length, width, height)
+            result = {
+                "name": case.name,
+                "params": {"length": length, "width": width, "height": height},
+                **measure(timed.run, timed.reset, timed.batch, min_time)
+            }
+            results.append(result)
+            if progress is not None:
+                progress(result)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat()
+        },
+        "results": results
+    }
+
+
+def save(run: dict, path: str):
+    """Save a run's results as JSON.
+
+    :param run: The run returned by `run_cases`.
+    :param path: Path of the file to write.
+    """
+    with open(path, "wt", encoding="UTF-8") as file:
+        json.dump(run, file, indent=2)
+        file.write("\n")
+
+
+def load(path: str) -> dict:
+    """Load a run's results.
+
+    :param path: Path of the file written by `save`.
+
+    :return: The run.
+    """
+    with open(path, "rt", encoding="UTF-8") as file:
+        return json.load(file)
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    threshold: float = 0.1
+) -> list[tuple[str, float, float, float, bool]]:
+    """Compare the best per-call times of two runs. Only results in both runs
+    are compared.
+
+    :param baseline: The run to compare against.
+    :param current: The new run.
+    :param threshold: Fraction slower than the baseline that counts as a
+        regression.
+
+    :return: The key, baseline time, current time, ratio of current to
+        baseline, and whether it's a regression, for each result.
+    """
+    baseline_times = {
+        result_key(result): result["best_ns"]
+        for result in baseline["results"]
+    }
+
+    rows = []
+    for result in current["results"]:
+        key = result_key(result)
+        if key not in baseline_times:
+            continue
+
+        old = baseline_times[key]
+        new = result["best_ns"]
+        ratio = new / old if old else float("inf")
+        rows.append((key, old, new, ratio, ratio > 1 + threshold))
+
+    return rows
+
+
+def format_comparison(rows: list[tuple[str, float, float, float, bool]]) -> str:
+    """Format the comparison as a table.
+
+    :param rows: The rows returned by `compare`.
+
+    :return: The table, with regressions marked.
+    """
+    width = max((len(row[0]) for row in rows), default=0)
+    lines = [
+        f"{'case':<{width}} {'baseline':>12} {'current':>12} {'ratio':>7}"
+    ]
+    for key, old, new, ratio, regressed in rows:
+        lines.append(
+            f"{key:<{width}} {old:>10.0f}ns {new:>10.0f}ns {ratio:>7.2f}"
+            + ("  REGRESSION" if regressed else "")
+        )
+    return "\n".join(lines)
@@ -0,0 +1,116 @@
+"""Start-up time, measured from the interpreter's `-X importtime` report."""
+
+import subprocess
+import sys
+from typing import NamedTuple
+
+
+class ImportTime(NamedTuple):
+    """One line of the `-X importtime` report."""
+
+    module: str
+    """Name of the imported module."""
+    self_us: int
+    """Microseconds spent importing the module itself."""
+    cumulative_us: int
+    """Microseconds spent importing the module and everything it imported."""
+    depth: int
+    """How deeply nested the import was, from 0 for the module imported."""
+
+
+def parse_importtime(report: str) -> list[ImportTime]:
+    """Parse the report written to stderr by `python -X importtime`.
+
+    :param report: The report. Lines that aren't part of it are skipped.
+
+    :return: Each import, in the order they finished.
+    """
+    times = []
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # the header line
+            continue
+
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        times.append(
+            ImportTime(
+                stripped,
+                int(fields[0]),
+                int(fields[1]),
+                (len(name) - len(stripped) - 1) // 2
+            )
+        )
+    return times
+
+
+def measure_imports(module: str = "main") -> list[ImportTime]:
+    """Import a module in a fresh interpreter, and time every import.
+
+    :param module: The module to import.
+
+    :raises subprocess.CalledProcessError: If the import fails.
+
+    :return: The imports, in the order they finished.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def imported_modules(module: str = "main") -> set[str]:
+    """Import a module in a fresh interpreter, and list every module that was
+    loaded. Unlike the `-X importtime` report, this includes modules imported
+    with `importlib`, like the lazily imported states.
+
+    :param module: The module to import.
+
+    :raises subprocess.CalledProcessError: If the import fails.
+
+    :return: The names of the loaded modules.
+    """
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module}; print(*sys.modules, sep='\\n')"
+        ],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return set(result.stdout.split())
+
+
+def total_us(times: list[ImportTime], module: str) -> int:
+    """Get the time taken to import a module, including its own imports.
+
+    :param times: The parsed report.
+    :param module: The module.
+
+    :return: The module's cumulative import time in microseconds, or 0 if it
+        wasn't imported.
+    """
+    return next(
+        (time.cumulative_us for time in times if time.module == module),
+        0
+    )
+
+
+def slowest(times: list[ImportTime], count: int = 10) -> list[ImportTime]:
+    """Get the imports that took longest by themselves.
+
+    :param times: The parsed report.
+    :param count: Number of imports to get.
+
+    :return: The slowest imports, slowest first.
+    """
+    return sorted(times, key=lambda time: time.self_us, reverse=True)[:count]
@@ -0,0 +1,15 @@
+"""Game cores without windows, for bots and solvers"""
+
+from engine.bitboard import Bitboard, BitGame
+from engine.regions import FreeRegions, SafetyGrid
+from engine.solver import Solver, TranspositionTable, ZobristGame
+
+__all__ = [
+    "Bitboard",
+    "BitGame",
+    "FreeRegions",
+    "SafetyGrid",
+    "Solver",
+    "TranspositionTable",
+    "ZobristGame"
+]
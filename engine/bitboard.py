@@ -0,0 +1,501 @@
+"""Game core that keeps the field in Python ints, one bit per cell"""
+
+import random
+from typing import TYPE_CHECKING, Iterable, Iterator
+
+from entities.player import Facing
+from state.stats import Death
+
+if TYPE_CHECKING:
+    from state.game import Game
+
+
+def nth_bit(bits: int, num: int) -> int:
+    """Find the index of one of the set bits, by halving the range it's in.
+
+    :param bits: The bits to look through.
+    :param num: Which set bit to find, from 0 at the lowest.
+
+    :return: The bit's index.
+    """
+    low = 0
+    high = bits.bit_length()
+    while high - low > 1:
+        middle = (low + high) // 2
+        if (bits & ((1 << middle) - 1)).bit_count() > num:
+            high = middle
+        else:
+            low = middle
+    return low
+
+
+class Bitboard:
+    """Maps the cells of the field to the bits of an int, row by row. Each row
+    has a spare bit after it that's never set, so moving every bit one column
+    over can't wrap it onto the next row. Whole sets of cells are then moved,
+    masked and counted with a few int operations, rather than a loop over
+    the cells.
+
+    :param left: Position of the leftmost boundary.
+    :param right: Position of the rightmost boundary.
+    :param upper: Position of the uppermost boundary.
+    :param lower: Position of the lowermost boundary.
+    """
+
+    def __init__(self, left: int, right: int, upper: int, lower: int):
+        self.left = left
+        self.upper = upper
+        self.width = max(right - left, 0)
+        self.height = max(lower - upper, 0)
+        self.stride = self.width + 1
+        """Number of bits per row, including the spare bit."""
+
+        self.cells = int(("0" + "1" * self.width) * self.height or "0", 2)
+        """Every cell of the field."""
+
+
+    def index(self, x_pos: int, y_pos: int) -> int | None:
+        """Get the bit of a cell.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: The index of the bit, or None if the cell is outside the
+            field.
+        """
+        col = x_pos - self.left
+        row = y_pos - self.upper
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return row * self.stride + col
+        return None
+
+
+    def bit(self, x_pos: int, y_pos: int) -> int:
+        """Get a cell by itself.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: The cell's bit, or 0 if the cell is outside the field.
+        """
+        index = self.index(x_pos, y_pos)
+        return 0 if index is None else 1 << index
+
+
+    def position(self, index: int) -> tuple[int, int]:
+        """Get the cell of a bit.
+
+        :param index: The index of the bit.
+
+        :return: The (x, y) position of the cell.
+        """
+        row, col = divmod(index, self.stride)
+        return col + self.left, row + self.upper
+
+
+    def positions(self, bits: int) -> Iterator[tuple[int, int]]:
+        """Get the cells of every set bit.
+
+        :param bits: The cells.
+
+        :return: The (x, y) position of each cell, row by row.
+        """
+        while bits:
+            lowest = bits & -bits
+            yield self.position(lowest.bit_length() - 1)
+            bits ^= lowest
+
+
+    def neighbours(self, bits: int) -> int:
+        """Get the cells next to any of the given cells.
+
+        :param bits: The cells.
+
+        :return: The cells one move away from them, on the field.
+        """
+        return (
+            (bits << 1) | (bits >> 1)
+            | (bits << self.stride) | (bits >> self.stride)
+        ) & self.cells
+
+
+    def flood(self, seeds: int, free: int) -> int:
+        """Get the cells reachable from some cells by moving through free
+        cells. Each step grows every edge of the region at once.
+
+        :param seeds: The cells to start from. Only the free ones count.
+        :param free: The cells that can be moved through.
+
+        :return: The free cells reachable from the seeds, including them.
+        """
+        stride = self.stride
+        region = seeds & free & self.cells
+        remaining = free & self.cells & ~region
+        frontier = region
+        while frontier:
+            # the spare bits are never in `remaining`, so nothing wraps
+            frontier = (
+                (frontier << 1) | (frontier >> 1)
+                | (frontier << stride) | (frontier >> stride)
+            ) & remaining
+            remaining ^= frontier
+            region |= frontier
+        return region
+
+
+LINKS = (Facing.LEFT, Facing.RIGHT, Facing.UP, Facing.DOWN)
+"""The direction each 2 bit link code points in."""
+
+CODES = {facing: code for code, facing in enumerate(LINKS)}
+"""The link code of each direction."""
+
+
+class BitGame: #pylint: disable=too-many-instance-attributes
+    """A game without windows or drawing, with the snake's body and the pellets
+    kept as bitboards, for bots and solvers that look at the field thousands
+    of times a move. It follows the same rules as `Game.update`.
+
+    The order of the segments is kept as a link in each body cell, pointing
+    to the next segment towards the head, so the whole state is ints and
+    tuples that are never changed in place. `clone` only has to copy the
+    references, and the random generator is only copied once a clone or its
+    original places a pellet.
+
+    New pellets are placed in a free cell picked by `rng`, so they don't turn
+    up in the same place as in a `Game` with the same seed.
+
+    :param left: Position of the leftmost boundary.
+    :param right: Position of the rightmost boundary.
+    :param upper: Position of the uppermost boundary.
+    :param lower: Position of the lowermost boundary.
+    :param rng: Picks where new pellets go. Defaults to a new generator.
+    """
+
+    def __init__( #pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        left: int,
+        right: int,
+        upper: int,
+        lower: int,
+        rng: random.Random | None = None
+    ):
+        self.board = Bitboard(left, right, upper, lower)
+        """Maps the cells of the field to bits. Shared by clones."""
+        self.body = 0
+        """The cells the snake is in."""
+        self.head_index = 0
+        """The bit of the head's cell."""
+        self.tail_index = 0
+        """The bit of the tail's cell."""
+        self.links = (0, 0)
+        """The low and high bits of the code in `LINKS` of the direction from
+        each body cell to the next one towards the head. The bits of the head
+        and of free cells are always 0."""
+        self.growth = 0
+        """Number of segments waiting under the tail."""
+        self.facing = Facing.LEFT
+        """Direction the snake moves in."""
+        self._facing_buffer: tuple[Facing, ...] = ()
+        """Turns waiting to be made, as in `Player`."""
+        self.pellets = 0
+        """The cells with a pellet."""
+        self.score = 0
+        """Number of pellets eaten."""
+        self.ticks = 0
+        """Number of times the snake has moved."""
+        self.death = Death.NONE
+        """How the game ended."""
+        self.rng = rng if rng is not None else random.Random()
+        """Picks where new pellets go."""
+        self._rng_shared = False
+        """Whether a clone might be using `rng` too, so it has to be copied
+        before it's used."""
+
+        self._offsets = (-1, 1, -self.board.stride, self.board.stride)
+        """How far each link in `LINKS` moves along the bits."""
+        self._edges = (
+            self.board.stride,
+            self.board.width,
+            self.board.stride * self.board.height
+        )
+        """Bits per row, the column of the spare bit, and the number of bits,
+        for checking if a move runs into a wall."""
+
+
+    @classmethod
+    def from_game(cls, game: "Game", rng: random.Random | None = None) -> "BitGame":
+        """Copy the field, snake, pellets and score of a game.
+
+        :param game: The game to copy.
+        :param rng: Picks where new pellets go. Defaults to a new generator.
+
+        :return: The copy.
+
+        :raises ValueError: If the snake is off the field, or broken up.
+        """
+        bounds = game._bounds() #pylint: disable=protected-access
+        bit_game = cls(*bounds, rng)
+        bit_game.layout(game.player.cells())
+        bit_game.facing = game.player.facing
+        bit_game._facing_buffer = tuple(
+            game.player._facing_buffer #pylint: disable=protected-access
+        )
+        for pellet in game.pellets:
+            bit_game.add_pellet(pellet.x_pos, pellet.y_pos)
+        bit_game.score = game.score
+        bit_game.ticks = game.ticks
+        return bit_game
+
+
+    def clone(self) -> "BitGame":
+        """Copy the game, to play it out without changing this one. Nothing
+        is copied but the references to the state, which is never changed in
+        place.
+
+        :return: The copy.
+        """
+        self._rng_shared = True
+        twin = object.__new__(type(self))
+        # copying the whole dict is much faster than adding each attribute
+        twin.__dict__ = self.__dict__.copy()
+        return twin
+
+
+    def layout(self, cells: Iterable[tuple[int, int]]):
+        """Put the snake on the given cells.
+
+        :param cells: The position of each segment, from the head to the tail.
+            Positions the same as the one before are waiting under the tail.
+
+        :raises ValueError: If a segment is off the field, or isn't next to
+            the one before.
+        """
+        indexes = []
+        self.growth = 0
+        for x_pos, y_pos in cells:
+            index = self.board.index(x_pos, y_pos)
+            if index is None:
+                raise ValueError(f"segment at ({x_pos}, {y_pos}) is off the field")
+            if indexes and index == indexes[-1]:
+                self.growth += 1
+            else:
+                indexes.append(index)
+
+        self.body = 0
+        low = high = 0
+        for toward, index in zip(indexes, indexes[1:]):
+            if toward - index not in self._offsets:
+                x_pos, y_pos = self.board.position(index)
+                raise ValueError(
+                    f"segment at ({x_pos}, {y_pos}) isn't next to the one before"
+                )
+            code = self._offsets.index(toward - index)
+            low |= (code & 1) << index
+            high |= (code >> 1) << index
+        for index in indexes:
+            self.body |= 1 << index
+
+        self.links = (low, high)
+        self.head_index = indexes[0] if indexes else 0
+        self.tail_index = indexes[-1] if indexes else 0
+
+
+    def head(self) -> tuple[int, int]:
+        """Get the position of the snake's head.
+
+        :return: The (x, y) position.
+        """
+        return self.board.position(self.head_index)
+
+
+    def cells(self) -> list[tuple[int, int]]:
+        """Get the position of every segment, by following the links from the
+        tail.
+
+        :return: The positions, from the head to the tail, the same as
+            `Player.cells`.
+        """
+        low, high = self.links
+        index = self.tail_index
+        indexes = [index] * (self.growth + 1)
+        while index != self.head_index:
+            index += self._offsets[(low >> index & 1) | (high >> index & 1) << 1]
+            indexes.append(index)
+        return [self.board.position(index) for index in reversed(indexes)]
+
+
+    def add_pellet(self, x_pos: int, y_pos: int) -> bool:
+        """Put a pellet in a cell.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: True if the cell is on the field.
+        """
+        bit = self.board.bit(x_pos, y_pos)
+        self.pellets |= bit
+        return bit != 0
+
+
+    def occupied(self, x_pos: int, y_pos: int) -> bool:
+        """Check if the snake is in a cell.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: True if a segment is in the cell.
+        """
+        return self.body & self.board.bit(x_pos, y_pos) != 0
+
+
+    def reachable(self) -> int:
+        """Count the free cells the head can reach, going round the body as it
+        is now.
+
+        :return: The number of cells.
+        """
+        head = 1 << self.head_index
+        free = self.board.cells & ~self.body
+        return self.board.flood(self.board.neighbours(head), free).bit_count()
+
+
+    def add_facing_to_buffer(self, facing: Facing):
+        """Queue a turn, with the same rules as `Player.add_facing_to_buffer`.
+
+        :param facing: The new facing to potentially add to the buffer.
+        """
+        if len(self._facing_buffer) >= 2:
+            return
+
+        prev_facing = self._facing_buffer[-1] if self._facing_buffer else self.facing
+        if (
+            abs(prev_facing.x) != abs(facing.x)
+            and abs(prev_facing.y) != abs(facing.y)
+        ):
+            self._facing_buffer += (facing,)
+
+
+    def step(self, moves: int = 1) -> bool: #pylint: disable=too-many-locals,too-many-branches,too-many-statements
+        """Move the snake, then eat and replace the pellet under its head, the
+        same as `Game.update`, a number of times. The snake isn't moved if it
+        dies.
+
+        This is the inner loop of every rollout, so the state is kept in
+        locals until the last move, and only the attributes that changed are
+        written back. Each move only works on bit indexes, and only touches
+        each of the big ints when it has to change them.
+
+        :param moves: Number of times to move, stopping early if the game
+            ends.
+
+        :return: True if the game goes on, False if it's ended.
+        """
+        if self.death:
+            return False
+
+        stride, width, limit = self._edges
+        buffer = self._facing_buffer
+        head_index = self.head_index
+        tail_index = self.tail_index
+        body = self.body
+        low, high = self.links
+        growth = self.growth
+        pellets = self.pellets
+
+        # how far the head moves, and which link bits point that way
+        facing = self.facing
+        vertical = facing.y
+        delta = vertical * stride or facing.x
+        forward = delta > 0
+        head = 1 << head_index
+        move = 0
+        for move in range(1, moves + 1):
+            if buffer:
+                self.facing = facing = buffer[0]
+                self._facing_buffer = buffer = buffer[1:]
+                vertical = facing.y
+                delta = vertical * stride or facing.x
+                forward = delta > 0
+
+            # off the top or bottom rows, or onto the spare bit after a row
+            index = head_index + delta
+            if vertical:
+                if not 0 <= index < limit:
+                    self.death = Death.WALL
+                    break
+            elif index % stride == width:
+                self.death = Death.WALL
+                break
+
+            # the tail moves out of the way first, unless a segment is under it
+            bit = 1 << index
+            if body & bit and (growth or index != tail_index):
+                self.death = Death.BODY
+                break
+
+            # point the old head at the new one, before the tail follows it.
+            # Cells outside the body have no link, so there's nothing to clear
+            if forward:
+                low |= head
+            if vertical:
+                high |= head
+
+            if growth:
+                growth -= 1
+            else:
+                tail = 1 << tail_index
+                body ^= tail
+                if low & tail:
+                    low ^= tail
+                    if high & tail:
+                        high ^= tail
+                        tail_index += stride
+                    else:
+                        tail_index += 1
+                elif high & tail:
+                    high ^= tail
+                    tail_index -= stride
+                else:
+                    tail_index -= 1
+            head_index = index
+            head = bit
+            body |= head
+
+            if pellets & head:
+                self.body = body
+                self.pellets = pellets ^ head
+                self.score += 1
+                growth += 1
+                self.spawn_pellet()
+                pellets = self.pellets
+            if not pellets:
+                self.death = Death.FILLED
+                break
+
+        # the move the snake died on counts too
+        self.ticks += move
+        self.head_index = head_index
+        self.tail_index = tail_index
+        self.body = body
+        self.links = (low, high)
+        self.growth = growth
+        return not self.death
+
+
+    def spawn_pellet(self) -> bool:
+        """Put a pellet in a random free cell.
+
+        :return: True if a pellet was added, False if the field is full.
+        """
+        free = self.board.cells & ~(self.body | self.pellets)
+        if not free:
+            return False
+
+        if self._rng_shared:
+            rng = random.Random()
+            rng.setstate(self.rng.getstate())
+            self.rng = rng
+            self._rng_shared = False
+
+        self.pellets |= 1 << nth_bit(free, self.rng.randrange(free.bit_count()))
+        return True
@@ -0,0 +1,295 @@
+"""Connected regions of free cells, kept up to date as the snake moves"""
+
+from typing import TYPE_CHECKING, Iterable
+
+from engine.bitboard import Bitboard
+from entities.player import Facing
+from entities.sparse import SparseGrid, unpack
+
+if TYPE_CHECKING:
+    from state.game import Game
+
+
+def components(board: Bitboard, free: int) -> list[int]:
+    """Split cells into the groups that are connected to each other.
+
+    :param board: Maps the cells to bits.
+    :param free: The cells.
+
+    :return: The cells of each group.
+    """
+    groups = []
+    while free:
+        group = board.flood(free & -free, free)
+        groups.append(group)
+        free ^= group
+    return groups
+
+
+class FreeRegions:
+    """The free cells of the field, split into the regions that can be moved
+    between. Filling or freeing a cell only changes the regions next to it,
+    and a region is only flooded again when filling a cell might have cut it
+    in two.
+
+    :param board: Maps the cells of the field to bits.
+    :param occupied: The cells that aren't free.
+    """
+
+    def __init__(self, board: Bitboard, occupied: int = 0):
+        self.board = board
+        self.regions: list[int] = []
+        """The cells of each region."""
+
+        self.reset(occupied)
+
+
+    def __len__(self) -> int:
+        """Number of regions."""
+        return len(self.regions)
+
+
+    def reset(self, occupied: int):
+        """Work out every region from scratch.
+
+        :param occupied: The cells that aren't free.
+        """
+        self.regions = components(self.board, self.board.cells & ~occupied)
+
+
+    def region_of(self, bit: int) -> int | None:
+        """Find the region a cell is in.
+
+        :param bit: The cell.
+
+        :return: The index of the region in `regions`, or None if the cell
+            isn't free.
+        """
+        for num, region in enumerate(self.regions):
+            if region & bit:
+                return num
+        return None
+
+
+    def pieces(self, bit: int) -> list[int]:
+        """Get what the region of a free cell would split into if the cell
+        was filled, without filling it.
+
+        :param bit: The cell.
+
+        :return: The cells of each piece, or an empty list if the cell isn't
+            free, or is a region by itself.
+        """
+        num = self.region_of(bit)
+        if num is None:
+            return []
+
+        rest = self.regions[num] ^ bit
+        seeds = self.board.neighbours(bit) & rest
+        if not seeds:
+            return []
+        if seeds & (seeds - 1) == 0 or self._ring_connected(bit, rest):
+            return [rest]
+
+        # every cell of the region is connected to the cell through one of
+        # its neighbours, so flooding from them finds every piece
+        pieces = []
+        while seeds & (seeds - 1):
+            piece = self.board.flood(seeds & -seeds, rest)
+            pieces.append(piece)
+            rest ^= piece
+            seeds &= rest
+        if rest:
+            pieces.append(rest)
+        return pieces
+
+
+    def fill(self, bit: int):
+        """Take a cell out of its region, splitting the region if that cuts it
+        in two.
+
+        :param bit: The cell. Nothing changes if it isn't free.
+        """
+        num = self.region_of(bit)
+        if num is not None:
+            self.regions[num:num + 1] = self.pieces(bit)
+
+
+    def free(self, bit: int):
+        """Add a cell to the regions, joining the regions next to it into one.
+
+        :param bit: The cell. Nothing changes if it's already free or off the
+            field.
+        """
+        if not bit & self.board.cells or self.region_of(bit) is not None:
+            return
+
+        around = self.board.neighbours(bit)
+        joined = bit
+        kept = []
+        for region in self.regions:
+            if region & around:
+                joined |= region
+            else:
+                kept.append(region)
+        kept.append(joined)
+        self.regions = kept
+
+
+    def _ring_connected(self, bit: int, free: int) -> bool:
+        """Check if the free cells next to a cell are connected by the free
+        cells around it, so filling it can't cut its region in two.
+
+        :param bit: The cell.
+        :param free: The free cells.
+
+        :return: True if they're connected. False if they might not be.
+        """
+        x_pos, y_pos = self.board.position(bit.bit_length() - 1)
+        # the eight cells around, in order, so each is next to the one before
+        ring = [
+            self.board.bit(x_pos + x_off, y_pos + y_off) & free
+            for x_off, y_off in (
+                (0, -1), (1, -1), (1, 0), (1, 1),
+                (0, 1), (-1, 1), (-1, 0), (-1, -1)
+            )
+        ]
+
+        # count the runs of free cells that have one of the neighbours in,
+        # which are the even places in the ring. A neighbour joined to the one
+        # before by the corner between them is in the same run.
+        runs = 0
+        for num in range(0, 8, 2):
+            if ring[num] and not (ring[num - 1] and ring[num - 2]):
+                runs += 1
+        return runs <= 1
+
+
+class SafetyGrid(SparseGrid):
+    """A `SparseGrid` that also keeps the free regions of the field up to date
+    as the snake moves, so a bot can ask how much room a move leaves it, or if
+    it cuts the field in two, without flooding the field for every question.
+
+    :param left: Position of the leftmost boundary.
+    :param right: Position of the rightmost boundary.
+    :param upper: Position of the uppermost boundary.
+    :param lower: Position of the lowermost boundary.
+    """
+
+    def __init__(self, left: int, right: int, upper: int, lower: int):
+        self.board = Bitboard(left, right, upper, lower)
+        """Maps the cells of the field to bits."""
+        self.free_regions = FreeRegions(self.board)
+        """The regions of the cells the snake isn't in."""
+
+        super().__init__()
+
+
+    @classmethod
+    def attach(cls, game: "Game") -> "SafetyGrid":
+        """Make a grid for a game's field, and have its snake keep it up to
+        date.
+
+        :param game: The game.
+
+        :return: The grid.
+        """
+        grid = cls(*game._bounds()) #pylint: disable=protected-access
+        game.player.track(grid)
+        return grid
+
+
+    def layout(self, cells: Iterable[tuple[int, int]]):
+        """Forget every cell, lay the snake out over the given cells, and work
+        out the free regions again.
+
+        :param cells: The position of each segment, from the head to the tail.
+            Positions the same as the one before are waiting under the tail.
+        """
+        super().layout(cells)
+
+        occupied = 0
+        for key in self.cells:
+            occupied |= self.board.bit(*unpack(key))
+        self.free_regions.reset(occupied)
+
+
+    def advance(self, x_pos: int, y_pos: int):
+        """Move the head onto a cell, and the tail off its cell unless there's
+        a segment waiting under it, updating the regions of both cells.
+
+        :param x_pos: X position of the new head.
+        :param y_pos: Y position of the new head.
+        """
+        tail = self.path[0] if self.path else None
+        super().advance(x_pos, y_pos)
+
+        if tail is not None and tail not in self.cells:
+            self.free_regions.free(self.board.bit(*unpack(tail)))
+        self.free_regions.fill(self.board.bit(x_pos, y_pos))
+
+
+    def regions_after(self, facing: Facing) -> list[int]:
+        """Get the free regions next to the head after it moves, as they'll be
+        once the tail has moved too.
+
+        :param facing: Direction of the move.
+
+        :return: The cells of each region, or an empty list if the move runs
+            into a wall or the snake.
+        """
+        x_pos, y_pos = unpack(self.path[-1])
+        x_pos += facing.x
+        y_pos += facing.y
+        head = self.board.bit(x_pos, y_pos)
+
+        # the cell the tail leaves, if it leaves one
+        tail = 0
+        if self.growth == 0:
+            tail = self.board.bit(*unpack(self.path[0]))
+            if self.entry(*unpack(self.path[0])) != self.tail:
+                tail = 0
+
+        num = self.free_regions.region_of(head)
+        if num is None and (not head or head != tail):
+            return []
+
+        regions = self.free_regions.regions
+        if num is not None:
+            regions = regions[:num] + regions[num + 1:] + self.free_regions.pieces(head)
+
+        if tail and tail != head:
+            around = self.board.neighbours(tail)
+            joined = tail
+            kept = []
+            for region in regions:
+                if region & around:
+                    joined |= region
+                else:
+                    kept.append(region)
+            regions = kept + [joined]
+
+        around = self.board.neighbours(head)
+        return [region for region in regions if region & around]
+
+
+    def reachable(self, facing: Facing) -> int:
+        """Count the free cells the head can reach after a move.
+
+        :param facing: Direction of the move.
+
+        :return: The number of cells, 0 if the move runs into a wall or the
+            snake.
+        """
+        return sum(region.bit_count() for region in self.regions_after(facing))
+
+
+    def splits(self, facing: Facing) -> bool:
+        """Check if a move cuts the free cells around the head apart, so the
+        snake has to pick one side.
+
+        :param facing: Direction of the move.
+
+        :return: True if the head will be next to more than one region.
+        """
+        return len(self.regions_after(facing)) > 1
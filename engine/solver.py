@@ -0,0 +1,442 @@
+"""Exact search for the best score on small fields"""
+
+import random
+from typing import Iterable, NamedTuple
+
+from engine.bitboard import CODES, LINKS, BitGame, nth_bit
+from entities.player import Facing
+from state.stats import Death
+
+
+MASK = (1 << 64) - 1
+"""Keeps keys and mixed values to 64 bits."""
+
+OPPOSITES = {
+    Facing.LEFT: Facing.RIGHT,
+    Facing.RIGHT: Facing.LEFT,
+    Facing.UP: Facing.DOWN,
+    Facing.DOWN: Facing.UP
+}
+"""The direction the snake can't turn to from each direction."""
+
+
+def mix(value: int) -> int:
+    """Scramble a number into a 64 bit value that looks random (SplitMix64).
+
+    :param value: The number.
+
+    :return: The scrambled value.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+class Zobrist: #pylint: disable=too-few-public-methods
+    """A random 64 bit key for each part of a game's state that can change.
+    A state's key is every key of its parts XORed together, so a move only
+    has to XOR in the parts it changes. The keys only depend on the size of
+    the field, so games on fields of the same size can share a table.
+
+    :param size: Number of bits in the field's bitboards.
+    """
+
+    def __init__(self, size: int):
+        rng = random.Random(size)
+        self.links = [
+            [rng.getrandbits(64) for _ in LINKS] for _ in range(size)
+        ]
+        """Key of each body cell but the head, by its link."""
+        self.heads = [rng.getrandbits(64) for _ in range(size)]
+        """Key of the head in each cell."""
+        self.pellets = [rng.getrandbits(64) for _ in range(size)]
+        """Key of a pellet in each cell."""
+        self.facings = {facing: rng.getrandbits(64) for facing in LINKS}
+        """Key of each direction the snake can face."""
+        self.growth = [rng.getrandbits(64) for _ in range(size + 1)]
+        """Key of each number of segments waiting under the tail."""
+        self.scores = [rng.getrandbits(64) for _ in range(size + 1)]
+        """Key of each score. New pellets depend on the score."""
+
+
+class ZobristGame(BitGame):
+    """A `BitGame` that keeps a Zobrist key of its state up to date as it's
+    played, and places pellets by the seed and score, so two games in the same
+    state always play out the same way and can share a search.
+
+    New pellets go in a free cell picked by mixing the seed with the score,
+    rather than by `rng`. They're still spread evenly over the free cells.
+
+    :param left: Position of the leftmost boundary.
+    :param right: Position of the rightmost boundary.
+    :param upper: Position of the uppermost boundary.
+    :param lower: Position of the lowermost boundary.
+    :param rng: Unused, as pellets are placed by `seed`.
+    :param seed: Picks where new pellets go.
+
+    Call `rehash` after changing the state other than through the methods,
+    e.g. after `from_game`.
+    """
+
+    def __init__( #pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        left: int,
+        right: int,
+        upper: int,
+        lower: int,
+        rng: random.Random | None = None,
+        seed: int = 0
+    ):
+        self.seed = seed
+        """Picks where new pellets go."""
+        self.key = 0
+        """The Zobrist key of the state."""
+
+        super().__init__(left, right, upper, lower, rng)
+        self.zobrist = Zobrist(self.board.stride * self.board.height)
+        """The keys of each part of the state. Shared by clones."""
+        self.rehash()
+
+
+    def rehash(self):
+        """Work out the key from scratch, after the state has been changed
+        other than by playing. The seed is mixed in too, so games with
+        different seeds never share keys."""
+        zobrist = self.zobrist
+        key = mix(self.seed) ^ zobrist.facings[self.facing]
+        key ^= zobrist.growth[self.growth] ^ zobrist.scores[self.score]
+        if self.body:
+            key ^= zobrist.heads[self.head_index]
+        low, high = self.links
+        for index in self._body_indexes():
+            bit = 1 << index
+            key ^= zobrist.links[index][(1 if low & bit else 0) | (2 if high & bit else 0)]
+        pellets = self.pellets
+        while pellets:
+            lowest = pellets & -pellets
+            key ^= zobrist.pellets[lowest.bit_length() - 1]
+            pellets ^= lowest
+        self.key = key
+
+
+    def layout(self, cells: Iterable[tuple[int, int]]):
+        """Put the snake on the given cells, and work out the key again.
+
+        :param cells: The position of each segment, from the head to the tail.
+            Positions the same as the one before are waiting under the tail.
+
+        :raises ValueError: If a segment is off the field, or isn't next to
+            the one before.
+        """
+        super().layout(cells)
+        self.rehash()
+
+
+    def add_pellet(self, x_pos: int, y_pos: int) -> bool:
+        """Put a pellet in a cell.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: True if the cell is on the field.
+        """
+        before = self.pellets
+        added = super().add_pellet(x_pos, y_pos)
+        if self.pellets != before:
+            self.key ^= self.zobrist.pellets[self.board.index(x_pos, y_pos)]
+        return added
+
+
+    def turn(self, facing: Facing):
+        """Face a direction straight away, dropping any queued turns. Unlike
+        `add_facing_to_buffer`, nothing stops the snake turning back on
+        itself.
+
+        :param facing: The direction.
+        """
+        self._facing_buffer = ()
+        self.key ^= self.zobrist.facings[self.facing] ^ self.zobrist.facings[facing]
+        self.facing = facing
+
+
+    def step(self, moves: int = 1) -> bool:
+        """Play moves the same as `BitGame.step`, XORing the parts of the
+        state each one changed in and out of the key: the head added, the tail
+        removed, the pellet eaten, and the growth, score and facing.
+
+        :param moves: Number of times to move, stopping early if the game
+            ends.
+
+        :return: True if the game goes on, False if it's ended.
+        """
+        for _ in range(moves):
+            if not self._step_once():
+                return False
+        return not self.death
+
+
+    def _step_once(self) -> bool:
+        """Play a single move, keeping the key up to date.
+
+        :return: True if the game goes on, False if it's ended.
+        """
+        zobrist = self.zobrist
+        facing = self.facing
+        head = self.head_index
+        tail = self.tail_index
+        growth = self.growth
+        score = self.score
+        # the tail's link is cleared once it moves on
+        low, high = self.links
+        bit = 1 << tail
+        link = (1 if low & bit else 0) | (2 if high & bit else 0)
+
+        alive = super().step()
+
+        key = self.key
+        if self.facing is not facing:
+            key ^= zobrist.facings[facing] ^ zobrist.facings[self.facing]
+        if self.head_index != head:
+            key ^= zobrist.heads[head] ^ zobrist.heads[self.head_index]
+            key ^= zobrist.links[head][CODES[self.facing]]
+        if self.tail_index != tail:
+            # a snake of one cell pointed its tail at the new head first
+            if tail == head:
+                link = CODES[self.facing]
+            key ^= zobrist.links[tail][link]
+        if self.growth != growth:
+            key ^= zobrist.growth[growth] ^ zobrist.growth[self.growth]
+        if self.score != score:
+            # the pellet eaten. The one placed is XORed in by spawn_pellet
+            key ^= zobrist.scores[score] ^ zobrist.scores[self.score]
+            key ^= zobrist.pellets[self.head_index]
+        self.key = key
+        return alive
+
+
+    def spawn_pellet(self) -> bool:
+        """Put a pellet in a free cell picked by the seed and score.
+
+        :return: True if a pellet was added, False if the field is full.
+        """
+        free = self.board.cells & ~(self.body | self.pellets)
+        if not free:
+            return False
+
+        num = mix(self.seed ^ mix(self.score)) % free.bit_count()
+        index = nth_bit(free, num)
+        self.pellets |= 1 << index
+        self.key ^= self.zobrist.pellets[index]
+        return True
+
+
+    def _body_indexes(self) -> list[int]:
+        """Get the bit of every body cell but the head.
+
+        :return: The bits, from the tail.
+        """
+        if not self.body:
+            return []
+
+        low, high = self.links
+        index = self.tail_index
+        indexes = []
+        while index != self.head_index:
+            indexes.append(index)
+            bit = 1 << index
+            index += self._offsets[(1 if low & bit else 0) | (2 if high & bit else 0)]
+        return indexes
+
+
+class Entry(NamedTuple):
+    """A searched state in a `TranspositionTable`."""
+
+    key: int
+    """The state's Zobrist key."""
+    depth: int
+    """Number of moves ahead the state was searched."""
+    score: int
+    """The best score reachable within that many moves."""
+    move: Facing | None
+    """The first move towards the best score. None if the game is over."""
+    work: int
+    """Number of states searched to find the score."""
+
+
+class TranspositionTable:
+    """A fixed number of searched states, looked up by Zobrist key. Each key
+    has a bucket of two slots: the first keeps whichever state took the most
+    work to search, and the second always takes the newest state, so the
+    table never grows, but keeps the states that are most costly to search
+    again.
+
+    :param size: Number of buckets.
+    """
+
+    def __init__(self, size: int = 1 << 16):
+        self.size = size
+        self.slots: list[Entry | None] = [None] * (2 * size)
+        """Both slots of each bucket, one after the other."""
+        self.hits = 0
+        """Number of lookups that found a state."""
+        self.lookups = 0
+        """Number of lookups."""
+
+
+    def __len__(self) -> int:
+        """Number of states kept."""
+        return sum(entry is not None for entry in self.slots)
+
+
+    def get(self, key: int, depth: int) -> Entry | None:
+        """Look up a state searched to a depth.
+
+        :param key: The state's Zobrist key.
+        :param depth: Number of moves ahead it has to have been searched.
+
+        :return: The entry, or None if it isn't kept.
+        """
+        self.lookups += 1
+        start = 2 * (key % self.size)
+        for entry in self.slots[start:start + 2]:
+            if entry is not None and entry.key == key and entry.depth == depth:
+                self.hits += 1
+                return entry
+        return None
+
+
+    def put(self, entry: Entry):
+        """Keep a searched state, replacing the first slot of its bucket if
+        that took no more work to search, or the second otherwise.
+
+        :param entry: The state.
+        """
+        start = 2 * (entry.key % self.size)
+        kept = self.slots[start]
+        if kept is None or kept.work <= entry.work or (
+            kept.key == entry.key and kept.depth == entry.depth
+        ):
+            self.slots[start] = entry
+        else:
+            self.slots[start + 1] = entry
+
+
+    def clear(self):
+        """Forget every state."""
+        self.slots = [None] * (2 * self.size)
+        self.hits = 0
+        self.lookups = 0
+
+
+class Solver:
+    """Finds the best score that can be reached from a state within a number
+    of moves, by trying every move, with the same rules as `Game.update`.
+    States reached again by other moves are looked up in a transposition
+    table instead of being searched again, and a state's moves stop being
+    tried once one of them reaches the most pellets that could be eaten.
+
+    :param depth: Number of moves to look ahead.
+    :param table: The table of searched states. Defaults to a new one.
+    """
+
+    def __init__(self, depth: int, table: TranspositionTable | None = None):
+        self.depth = depth
+        self.table = table if table is not None else TranspositionTable()
+        """The states searched so far."""
+
+
+    def best(self, game: ZobristGame) -> Entry:
+        """Search for the best score within `depth` moves.
+
+        :param game: The state to search from. It isn't changed.
+
+        :return: The best score and the first move towards it.
+        """
+        return self._search(game, self.depth)
+
+
+    def play(self, game: ZobristGame, max_moves: int) -> ZobristGame:
+        """Play a game out, making the best move found by a search before each
+        move.
+
+        :param game: The state to play from. It isn't changed.
+        :param max_moves: Most moves to make, in case the snake can only go
+            round in circles.
+
+        :return: The state at the end.
+        """
+        game = game.clone()
+        for _ in range(max_moves):
+            move = self.best(game).move
+            if move is None:
+                break
+            game.turn(move)
+            if not game.step():
+                break
+        return game
+
+
+    def _search(self, game: ZobristGame, depth: int) -> Entry:
+        """Search a state.
+
+        :param game: The state.
+        :param depth: Number of moves to look ahead.
+
+        :return: The best score and the first move towards it.
+        """
+        if depth == 0 or game.death != Death.NONE:
+            return Entry(game.key, depth, game.score, None, 1)
+
+        entry = self.table.get(game.key, depth)
+        if entry is not None:
+            return entry
+
+        # at most one pellet is eaten each move, and only in a free cell
+        free = (game.board.cells & ~game.body).bit_count()
+        most = game.score + min(depth, free)
+
+        best_score = -1
+        best_move = None
+        work = 1
+        for facing in self._moves(game):
+            future = game.clone()
+            future.turn(facing)
+            future.step()
+            found = self._search(future, depth - 1)
+            work += found.work
+            if found.score > best_score:
+                best_score = found.score
+                best_move = facing
+                if best_score >= most:
+                    break
+
+        entry = Entry(game.key, depth, best_score, best_move, work)
+        self.table.put(entry)
+        return entry
+
+
+    @staticmethod
+    def _moves(game: ZobristGame) -> list[Facing]:
+        """Get the moves worth trying, nearest the pellets first.
+
+        :param game: The state.
+
+        :return: Every direction but back into the neck.
+        """
+        x_pos, y_pos = game.head()
+        targets = list(game.board.positions(game.pellets))
+
+        def distance(facing: Facing) -> int:
+            return min(
+                (
+                    abs(x_pos + facing.x - pellet_x) + abs(y_pos + facing.y - pellet_y)
+                    for pellet_x, pellet_y in targets
+                ),
+                default=0
+            )
+
+        return sorted(
+            (facing for facing in LINKS if facing is not OPPOSITES[game.facing]),
+            key=distance
+        )
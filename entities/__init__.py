@@ -1,10 +1,12 @@
 """Entity classes"""
 
 from entities.pellet import Pellet
+from entities.pellet_map import PelletMap
 from entities.player import Player, Facing
 
 __all__ = [
     "Pellet",
+    "PelletMap",
     "Player",
     "Facing"
 ]
@@ -0,0 +1,373 @@
+"""Snake stored as arrays of coordinates, with segments served as views"""
+
+from array import array
+from collections.abc import Sequence
+import curses
+import random
+from typing import Iterator, overload
+
+from entities.pellet import Pellet
+from entities.player import Facing, Player
+from entities.segment import Segment, icon_at
+
+
+class SegmentView(Segment):
+    """A segment of a `CompactPlayer`, read from and written to its arrays.
+    A view follows its place in the snake, not the cell: once the snake moves,
+    the view of the head is at the new head.
+
+    :param player: The snake the segment is part of.
+    :param index: Place of the segment in the snake, from 0 at the head.
+    """
+
+    # the position and icon are in the player's arrays, so nothing is set up
+    def __init__(self, player: "CompactPlayer", index: int): #pylint: disable=super-init-not-called
+        self.player = player
+        self.index = index
+
+
+    @property
+    def x_pos(self) -> int: #type: ignore[override]
+        """X position of the segment."""
+        return self.player.xs[self.player.slot(self.index)]
+
+
+    @x_pos.setter
+    def x_pos(self, x_pos: int):
+        self.player.xs[self.player.slot(self.index)] = x_pos
+
+
+    @property
+    def y_pos(self) -> int: #type: ignore[override]
+        """Y position of the segment."""
+        return self.player.ys[self.player.slot(self.index)]
+
+
+    @y_pos.setter
+    def y_pos(self, y_pos: int):
+        self.player.ys[self.player.slot(self.index)] = y_pos
+
+
+    @property
+    def icon(self) -> str: #type: ignore[override]
+        """Icon that is shown on the window. Set by the segment's place."""
+        return icon_at(self.index, self.player.icon_seed)
+
+
+    def __repr__(self) -> str:
+        """"""
+        return f"<SegmentView '{self.icon}' at ({self.x_pos},{self.y_pos})>"
+
+
+class SegmentList(Sequence):
+    """The segments of a `CompactPlayer` as a sequence of views, made as
+    they're accessed.
+
+    :param player: The snake the segments are part of.
+    """
+
+    def __init__(self, player: "CompactPlayer"):
+        self.player = player
+
+
+    def __len__(self) -> int:
+        """Number of segments."""
+        return self.player.length
+
+
+    @overload
+    def __getitem__(self, index: int) -> SegmentView: ...
+    @overload
+    def __getitem__(self, index: slice) -> list[SegmentView]: ...
+
+    def __getitem__(self, index):
+        """Get a view of a segment, or a list of views for a slice.
+
+        :param index: Place of the segment in the snake, from 0 at the head.
+            Negative places count back from the tail.
+
+        :raises IndexError: If there's no segment there.
+        """
+        if isinstance(index, slice):
+            return [
+                SegmentView(self.player, num)
+                for num in range(*index.indices(len(self)))
+            ]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return SegmentView(self.player, index)
+
+
+    def __eq__(self, other: object) -> bool:
+        """Segment lists are equal to sequences of segments in the same
+        places."""
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            segment == view for segment, view in zip(other, self)
+        )
+
+
+    __hash__ = None #type: ignore[assignment]
+
+
+class CompactPlayer(Player):
+    """A snake that keeps its segments' coordinates in two `array`s used as
+    a ring buffer, instead of a `Segment` object for each one. That's 8 bytes
+    a segment instead of over a hundred, and moving writes a single cell
+    instead of shifting every segment along.
+
+    Icons are picked from the place of each segment in the snake, using a
+    seed drawn once for the whole snake, so no segment needs a random number.
+    `segments`, `head()` and `tail()` give `SegmentView`s of the arrays.
+
+    :param head_x_pos: the X position of the player's head segment.
+    :param head_y_pos: the Y position of the player's head segment.
+    :param num_segments: number of segments the player starts with.
+    """
+
+    def __init__(self, head_x_pos: int, head_y_pos: int, num_segments: int):
+        self.xs = array("i")
+        """X position of each segment, in ring buffer order."""
+        self.ys = array("i")
+        """Y position of each segment, in ring buffer order."""
+        self.start = 0
+        """Where the head is in the arrays."""
+        self.length = 0
+        """Number of segments."""
+        self.icon_seed = random.getrandbits(32)
+        """Picks the sequence of icons the segments are shown with."""
+
+        super().__init__(head_x_pos, head_y_pos, num_segments)
+
+
+    @property
+    def segments(self) -> SegmentList: #type: ignore[override]
+        """Views of the snake's segments, from the head to the tail."""
+        return SegmentList(self)
+
+
+    @segments.setter
+    def segments(self, segments: Sequence[Segment]):
+        """Copy the positions of a list of segments into the arrays.
+
+        :param segments: The segments, from the head to the tail.
+        """
+        self.xs = array("i", [segment.x_pos for segment in segments])
+        self.ys = array("i", [segment.y_pos for segment in segments])
+        self.start = 0
+        self.length = len(self.xs)
+
+
+    def __len__(self) -> int:
+        """Number of segments."""
+        return self.length
+
+
+    def slot(self, index: int) -> int:
+        """Get where a segment is in the arrays.
+
+        :param index: Place of the segment in the snake, from 0 at the head.
+
+        :return: The index into `xs` and `ys`.
+        """
+        return (self.start + index) % len(self.xs)
+
+
+    def reset(self, head_x_pos: int, head_y_pos: int, num_segments: int):
+        """Put the snake back in its starting position, facing left, reusing
+        the arrays if they're big enough.
+
+        :param head_x_pos: the X position of the player's head segment.
+        :param head_y_pos: the Y position of the player's head segment.
+        :param num_segments: number of segments the player starts with.
+        """
+        self.facing = Facing.LEFT
+        self._facing_buffer.clear()
+
+        if len(self.xs) < num_segments:
+            self.xs = array("i", bytes(4 * num_segments))
+            self.ys = array("i", bytes(4 * num_segments))
+        for num in range(num_segments):
+            self.xs[num] = head_x_pos + num
+            self.ys[num] = head_y_pos
+        self.start = 0
+        self.length = num_segments
+
+        if self.grid is not None:
+            self.grid.layout(self.cells())
+
+
+    def head(self) -> SegmentView:
+        """Gets a view of the snake's head segment.
+
+        :return: The snake's head segment.
+        """
+        return SegmentView(self, 0)
+
+
+    def tail(self) -> SegmentView:
+        """Gets a view of the snake's tail segment.
+
+        :return: The snake's tail segment.
+        """
+        return SegmentView(self, self.length - 1)
+
+
+    def move(self):
+        """Move the snake forward one position, based on the direction it is
+        facing. If the buffer isn't empty, pop the least recent facing before
+        moving. The new head is written just before the old one in the ring,
+        and the tail drops off the end."""
+        if self._facing_buffer:
+            self.facing = self._facing_buffer.popleft()
+
+        head = self.start
+        self.start = (head - 1) % len(self.xs)
+        self.xs[self.start] = self.xs[head] + self.facing.x
+        self.ys[self.start] = self.ys[head] + self.facing.y
+
+        if self.grid is not None:
+            self.grid.advance(self.xs[self.start], self.ys[self.start])
+
+
+    def draw(self, window: curses.window):
+        """Draw each segment of the snake.
+
+        :param window: The curses window to draw the segments to.
+        """
+        for index in range(self.length):
+            slot = self.slot(index)
+            window.addch(self.ys[slot], self.xs[slot], icon_at(index, self.icon_seed))
+
+
+    def space_occupied(self, x_pos: int, y_pos: int) -> bool:
+        """Check if the given position is occupied by any of the snake's
+        segments.
+
+        :param x_pos: X position to check.
+        :param y_pos: Y position to check.
+
+        :return: True if the coordinate is occupied by any of the snake's
+            segments. False otherwise.
+        """
+        return self._find(x_pos, y_pos, 0)
+
+
+    def check_pellet(self, pellet: Pellet) -> bool:
+        """Check if the given pellet is on the same space as the snake's head.
+
+        :param pellet: The pellet to check.
+
+        :return: True if the pellet is on the same space as the head. False
+            otherwise.
+        """
+        if (
+            self.xs[self.start] == pellet.x_pos
+            and self.ys[self.start] == pellet.y_pos
+        ):
+            self._new_segment()
+            return True
+
+        return False
+
+
+    def _new_segment(self):
+        """Add a new segment to the snake's tail. This is placed under the last
+        segment. The arrays double in size when they're full.
+        """
+        tail = self.slot(self.length - 1)
+        tail_x = self.xs[tail]
+        tail_y = self.ys[tail]
+
+        if self.length == len(self.xs):
+            # unroll the ring so the head is at the start, then make room
+            self.xs = self.xs[self.start:] + self.xs[:self.start]
+            self.ys = self.ys[self.start:] + self.ys[:self.start]
+            self.xs.extend(self.xs)
+            self.ys.extend(self.ys)
+            self.start = 0
+
+        tail = self.slot(self.length)
+        self.xs[tail] = tail_x
+        self.ys[tail] = tail_y
+        self.length += 1
+        if self.grid is not None:
+            self.grid.grow()
+
+
+    def check_out_of_bounds(
+        self,
+        left: int,
+        right: int,
+        upper: int,
+        lower: int
+    ) -> bool:
+        """Check if the snake's head is out of the given boundaries.
+
+        :param left: Position of the leftmost boundary.
+        :param right: Position of the rightmost boundary.
+        :param upper: Position of the uppermost boundary.
+        :param lower: Position of the lowermost boundary.
+
+        :return: True if the player's head has moved out of bounds. False
+            otherwise.
+        """
+        return not (
+            left <= self.xs[self.start] < right
+            and upper <= self.ys[self.start] < lower
+        )
+
+
+    def check_body_hit(self) -> bool:
+        """Check if the snake's head is overlapping any of the other segments.
+
+        :return: True if the head is on the same space as any of the segments.
+            False otherwise.
+        """
+        if self.grid is not None:
+            return self.grid.hit
+
+        return self._find(self.xs[self.start], self.ys[self.start], 1)
+
+
+    def cells(self) -> Iterator[tuple[int, int]]:
+        """Get the position of every segment.
+
+        :return: The positions, from the head to the tail.
+        """
+        for index in range(self.length):
+            slot = self.slot(index)
+            yield self.xs[slot], self.ys[slot]
+
+
+    def _find(self, x_pos: int, y_pos: int, first: int) -> bool:
+        """Check if any segment from a place in the snake onwards is at a
+        position. The X coordinates are searched by `array.index`, so only the
+        segments in the same column are compared in Python.
+
+        :param x_pos: X position to look for.
+        :param y_pos: Y position to look for.
+        :param first: Place of the first segment to check, from 0 at the head.
+
+        :return: True if one of the segments is at the position.
+        """
+        if first >= self.length:
+            return False
+
+        begin = self.slot(first)
+        end = begin + self.length - first
+        capacity = len(self.xs)
+        # the segments are in at most two stretches of the arrays
+        for start, stop in ((begin, min(end, capacity)), (0, end - capacity)):
+            while start < stop:
+                try:
+                    start = self.xs.index(x_pos, start, stop)
+                except ValueError:
+                    break
+                if self.ys[start] == y_pos:
+                    return True
+                start += 1
+        return False
@@ -0,0 +1,111 @@
+"""Pellets on the field, indexed by their cell"""
+
+from typing import Iterable, Iterator
+
+from entities.pellet import Pellet
+
+
+class PelletMap:
+    """The pellets on the field, looked up by position. Finding, adding and
+    removing a pellet take the same time however many pellets there are.
+
+    The pellets are also kept in a list, so they can be drawn and compared
+    like a plain list. Removing a pellet moves the last one into its place, so
+    the order is only kept while pellets are added.
+
+    :param pellets: The pellets to start with.
+    """
+
+    def __init__(self, pellets: Iterable[Pellet] = ()):
+        self.pellets: list[Pellet] = []
+        """Every pellet. Only changed through the map, so it stays in step
+        with the index."""
+        self._index: dict[tuple[int, int], int] = {}
+        """Where the pellet in each cell is in `pellets`."""
+
+        self.replace(pellets)
+
+
+    def __len__(self) -> int:
+        """Number of pellets."""
+        return len(self.pellets)
+
+
+    def __iter__(self) -> Iterator[Pellet]:
+        """Iterate over the pellets."""
+        return iter(self.pellets)
+
+
+    def __contains__(self, position: object) -> bool:
+        """Check if there's a pellet in a cell.
+
+        :param position: The (x, y) position of the cell.
+        """
+        return position in self._index
+
+
+    def at(self, x_pos: int, y_pos: int) -> Pellet | None:
+        """Get the pellet in a cell.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: The pellet, or None if the cell is empty.
+        """
+        index = self._index.get((x_pos, y_pos))
+        return None if index is None else self.pellets[index]
+
+
+    def add(self, pellet: Pellet) -> bool:
+        """Add a pellet, unless its cell already has one.
+
+        :param pellet: The pellet to add.
+
+        :return: True if the pellet was added.
+        """
+        position = (pellet.x_pos, pellet.y_pos)
+        if position in self._index:
+            return False
+
+        self._index[position] = len(self.pellets)
+        self.pellets.append(pellet)
+        return True
+
+
+    def remove_at(self, x_pos: int, y_pos: int) -> Pellet | None:
+        """Remove the pellet in a cell.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: The removed pellet, or None if the cell was empty.
+        """
+        index = self._index.pop((x_pos, y_pos), None)
+        if index is None:
+            return None
+
+        pellet = self.pellets[index]
+        last = self.pellets.pop()
+        if last is not pellet:
+            self.pellets[index] = last
+            self._index[(last.x_pos, last.y_pos)] = index
+        return pellet
+
+
+    def clear(self):
+        """Remove every pellet."""
+        self.pellets.clear()
+        self._index.clear()
+
+
+    def replace(self, pellets: Iterable[Pellet]):
+        """Replace every pellet, keeping the same list. Only the first pellet
+        in each cell is kept.
+
+        :param pellets: The new pellets.
+        """
+        # copied first, in case it's the map's own list
+        pellets = list(pellets)
+        self.clear()
+        for pellet in pellets:
+            self.add(pellet)
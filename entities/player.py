@@ -3,9 +3,11 @@
 from collections import deque
 import curses
 from enum import Enum
+from typing import Iterator
 
 from entities.pellet import Pellet
 from entities.segment import Segment
+from entities.vacate import VacateGrid
 
 
 class Facing(Enum):
@@ -48,10 +50,53 @@ class Player:
         """FIFO queue with the directions the snake will turn before moving.
         When empty, the snake stays facing the same direction."""
 
-        self.segments = [
-            Segment(head_x_pos + num, head_y_pos)
-            for num in range(0, num_segments)
-        ]
+        self.segments: list[Segment] = []
+        """The snake's segments, from the head to the tail."""
+        self.grid: VacateGrid | None = None
+        """Tracks when the snake will leave each cell, once `track` is
+        called."""
+        self.reset(head_x_pos, head_y_pos, num_segments)
+
+
+    def reset(self, head_x_pos: int, head_y_pos: int, num_segments: int):
+        """Put the snake back in its starting position, facing left, reusing
+        its segments.
+
+        :param head_x_pos: the X position of the player's head segment.
+        :param head_y_pos: the Y position of the player's head segment.
+        :param num_segments: number of segments the player starts with.
+        """
+        self.facing = Facing.LEFT
+        self._facing_buffer.clear()
+
+        del self.segments[num_segments:]
+        for num, segment in enumerate(self.segments):
+            segment.move(head_x_pos + num, head_y_pos)
+        for num in range(len(self.segments), num_segments):
+            self.segments.append(Segment(head_x_pos + num, head_y_pos))
+
+        if self.grid is not None:
+            self.grid.layout(self.cells())
+
+
+    def track(self, grid: VacateGrid):
+        """Keep a grid of when the snake will leave each cell up to date as it
+        moves and grows. `check_body_hit` is then answered from the grid.
+        Call this again if the segments are replaced.
+
+        :param grid: The grid, covering the field.
+        """
+        self.grid = grid
+        grid.layout(self.cells())
+
+
+    def cells(self) -> Iterator[tuple[int, int]]:
+        """Get the position of every segment.
+
+        :return: The positions, from the head to the tail.
+        """
+        for segment in self.segments:
+            yield segment.x_pos, segment.y_pos
 
 
     def head(self) -> Segment:
@@ -118,6 +163,9 @@ class Player:
             new_x = old_x
             new_y = old_y
 
+        if self.grid is not None:
+            self.grid.advance(head.x_pos, head.y_pos)
+
 
     def draw(self, window: curses.window):
         """Draw each segment of the snake.
@@ -168,6 +216,8 @@ class Player:
         """
         tail = self.tail()
         self.segments.append(Segment(tail.x_pos, tail.y_pos))
+        if self.grid is not None:
+            self.grid.grow()
 
 
     def check_out_of_bounds(
@@ -202,6 +252,9 @@ class Player:
         :return: True if the head is on the same space as any of the segments.
             False otherwise.
         """
+        if self.grid is not None:
+            return self.grid.hit
+
         head = self.head()
         return any(
             head == segment
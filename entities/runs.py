@@ -0,0 +1,355 @@
+"""Run-length encoded snake, for snakes too long to keep a segment per cell"""
+
+from collections import deque
+import curses
+import itertools
+from typing import Iterator
+
+from entities.pellet import Pellet
+from entities.player import Facing, Player
+from entities.segment import Segment, icon_at
+
+
+FACINGS = {(facing.x, facing.y): facing for facing in Facing}
+"""Each facing, by the change in position when moving that way."""
+
+
+class Run:
+    """A straight stretch of the snake's body.
+
+    :param x_pos: X position of the end of the run nearest the head.
+    :param y_pos: Y position of the end of the run nearest the head.
+    :param facing: Direction the snake moved along the run. None while the
+        run is only one cell long.
+    :param length: Number of cells in the run.
+    """
+
+    __slots__ = ("x_pos", "y_pos", "facing", "length")
+
+    def __init__(
+        self,
+        x_pos: int,
+        y_pos: int,
+        facing: Facing | None,
+        length: int
+    ):
+        self.x_pos = x_pos
+        self.y_pos = y_pos
+        self.facing = facing
+        self.length = length
+
+
+    def __repr__(self) -> str:
+        """String representation of the run"""
+        facing = self.facing.value if self.facing else "none"
+        return f"<Run {self.length} {facing} from ({self.x_pos},{self.y_pos})>"
+
+
+    def cells(self) -> Iterator[tuple[int, int]]:
+        """Get the positions of the run's cells.
+
+        :return: The positions, from the head end.
+        """
+        step_x = self.facing.x if self.facing else 0
+        step_y = self.facing.y if self.facing else 0
+        for num in range(self.length):
+            yield self.x_pos - num * step_x, self.y_pos - num * step_y
+
+
+    def end(self) -> tuple[int, int]:
+        """Get the position of the end of the run nearest the tail.
+
+        :return: The position.
+        """
+        if self.facing is None:
+            return self.x_pos, self.y_pos
+        return (
+            self.x_pos - (self.length - 1) * self.facing.x,
+            self.y_pos - (self.length - 1) * self.facing.y
+        )
+
+
+    def contains(self, x_pos: int, y_pos: int, skip: int = 0) -> bool:
+        """Check if a position is on the run.
+
+        :param x_pos: X position to check.
+        :param y_pos: Y position to check.
+        :param skip: Number of cells at the head end to leave out.
+
+        :return: True if the position is one of the run's cells.
+        """
+        if self.facing is None:
+            return skip == 0 and x_pos == self.x_pos and y_pos == self.y_pos
+
+        # the distance back along the run, if the position is in line with it
+        if self.facing.x:
+            if y_pos != self.y_pos:
+                return False
+            distance = (self.x_pos - x_pos) * self.facing.x
+        else:
+            if x_pos != self.x_pos:
+                return False
+            distance = (self.y_pos - y_pos) * self.facing.y
+        return skip <= distance < self.length
+
+
+class RunLengthPlayer(Player):
+    """A snake that stores its body as straight runs instead of a `Segment`
+    for every cell, so its memory grows with the number of turns rather than
+    its length. Moving, growing and checking for hits only touch the runs;
+    only drawing visits every cell.
+
+    `segments` is still there for code that expects a `Player`, but builds
+    the segments on every access, so it's slow for long snakes.
+
+    :param head_x_pos: the X position of the player's head segment.
+    :param head_y_pos: the Y position of the player's head segment.
+    :param num_segments: number of segments the player starts with.
+    """
+
+    def __init__(self, head_x_pos: int, head_y_pos: int, num_segments: int):
+        self.runs: deque[Run] = deque()
+        """The straight runs of the body, from the head to the tail."""
+        self._growth = 0
+        """Number of segments waiting under the tail, which are added to the
+        end of the body as the snake moves."""
+
+        super().__init__(head_x_pos, head_y_pos, num_segments)
+
+
+    @property
+    def segments(self) -> list[Segment]:
+        """The snake's segments, from the head to the tail. Built on each
+        access."""
+        segments = []
+        for index, (x_pos, y_pos) in enumerate(self.cells()):
+            segment = Segment(x_pos, y_pos)
+            segment.icon = icon_at(index)
+            segments.append(segment)
+        return segments
+
+
+    @segments.setter
+    def segments(self, segments: list[Segment]):
+        """Lay the snake out over a list of segments. Segments in the same
+        place as the one before them are waiting to be added to the tail.
+
+        :param segments: The segments, from the head to the tail. Each has
+            to be next to the one before it, or in the same place.
+        """
+        self.runs = deque()
+        self._growth = 0
+
+        previous = None
+        for segment in segments:
+            position = (segment.x_pos, segment.y_pos)
+            if previous is None:
+                self.runs.append(Run(*position, None, 1))
+            elif position == previous:
+                self._growth += 1
+            else:
+                self._add_cell(position, previous)
+            previous = position
+
+
+    def __len__(self) -> int:
+        """Number of segments, including the ones waiting under the tail."""
+        return sum(run.length for run in self.runs) + self._growth
+
+
+    def reset(self, head_x_pos: int, head_y_pos: int, num_segments: int):
+        """Put the snake back in its starting position, facing left.
+
+        :param head_x_pos: the X position of the player's head segment.
+        :param head_y_pos: the Y position of the player's head segment.
+        :param num_segments: number of segments the player starts with.
+        """
+        self.facing = Facing.LEFT
+        self._facing_buffer.clear()
+
+        self.runs.clear()
+        self._growth = 0
+        if num_segments:
+            self.runs.append(
+                Run(
+                    head_x_pos,
+                    head_y_pos,
+                    Facing.LEFT if num_segments > 1 else None,
+                    num_segments
+                )
+            )
+
+        if self.grid is not None:
+            self.grid.layout(self.cells())
+
+
+    def cells(self) -> Iterator[tuple[int, int]]:
+        """Get the position of every segment, including the ones waiting
+        under the tail.
+
+        :return: The positions, from the head to the tail.
+        """
+        for run in self.runs:
+            yield from run.cells()
+        if self._growth:
+            tail = self.runs[-1].end()
+            for _ in range(self._growth):
+                yield tail
+
+
+    def head(self) -> Segment:
+        """Gets the snake's head segment. Made on each call.
+
+        :return: The snake's head segment.
+        """
+        head = self.runs[0]
+        segment = Segment(head.x_pos, head.y_pos)
+        segment.icon = icon_at(0)
+        return segment
+
+
+    def tail(self) -> Segment:
+        """Gets the snake's tail segment. Made on each call.
+
+        :return: The snake's tail segment.
+        """
+        segment = Segment(*self.runs[-1].end())
+        segment.icon = icon_at(len(self) - 1)
+        return segment
+
+
+    def move(self):
+        """Move the snake forward one position, based on the direction it is
+        facing. If the buffer isn't empty, pop the least recent facing before
+        moving. The head run gets longer, and the tail run shorter, unless
+        there's a segment waiting under the tail."""
+        if self._facing_buffer:
+            self.facing = self._facing_buffer.popleft()
+
+        head = self.runs[0]
+        new_x = head.x_pos + self.facing.x
+        new_y = head.y_pos + self.facing.y
+        if head.facing is None or head.facing == self.facing:
+            head.x_pos = new_x
+            head.y_pos = new_y
+            head.facing = self.facing
+            head.length += 1
+        else:
+            self.runs.appendleft(Run(new_x, new_y, None, 1))
+
+        if self.grid is not None:
+            self.grid.advance(new_x, new_y)
+
+        if self._growth:
+            self._growth -= 1
+            return
+
+        tail = self.runs[-1]
+        tail.length -= 1
+        if not tail.length:
+            self.runs.pop()
+        elif tail.length == 1:
+            tail.facing = None
+
+
+    def draw(self, window: curses.window):
+        """Draw each segment of the snake.
+
+        :param window: The curses window to draw the segments to.
+        """
+        for index, (x_pos, y_pos) in enumerate(self.cells()):
+            window.addch(y_pos, x_pos, icon_at(index))
+
+
+    def space_occupied(self, x_pos: int, y_pos: int) -> bool:
+        """Check if the given position is occupied by any of the snake's
+        segments.
+
+        :param x_pos: X position to check.
+        :param y_pos: Y position to check.
+
+        :return: True if the coordinate is occupied by any of the snake's
+            segments. False otherwise.
+        """
+        return any(run.contains(x_pos, y_pos) for run in self.runs)
+
+
+    def check_pellet(self, pellet: Pellet) -> bool:
+        """Check if the given pellet is on the same space as the snake's head.
+
+        :param pellet: The pellet to check.
+
+        :return: True if the pellet is on the same space as the head. False
+            otherwise.
+        """
+        head = self.runs[0]
+        if head.x_pos == pellet.x_pos and head.y_pos == pellet.y_pos:
+            self._new_segment()
+            return True
+
+        return False
+
+
+    def _new_segment(self):
+        """Add a new segment to the snake's tail. It waits under the tail
+        until the snake moves off it.
+        """
+        self._growth += 1
+        if self.grid is not None:
+            self.grid.grow()
+
+
+    def check_out_of_bounds(
+        self,
+        left: int,
+        right: int,
+        upper: int,
+        lower: int
+    ) -> bool:
+        """Check if the snake's head is out of the given boundaries.
+
+        :param left: Position of the leftmost boundary.
+        :param right: Position of the rightmost boundary.
+        :param upper: Position of the uppermost boundary.
+        :param lower: Position of the lowermost boundary.
+
+        :return: True if the player's head has moved out of bounds. False
+            otherwise.
+        """
+        head = self.runs[0]
+        return not (left <= head.x_pos < right and upper <= head.y_pos < lower)
+
+
+    def check_body_hit(self) -> bool:
+        """Check if the snake's head is overlapping any of the other segments.
+
+        :return: True if the head is on the same space as any of the segments.
+            False otherwise.
+        """
+        if self.grid is not None:
+            return self.grid.hit
+
+        head = self.runs[0]
+        if len(self.runs) == 1 and head.length == 1:
+            # only the segments waiting under the tail can be under the head
+            return self._growth > 0
+
+        return head.contains(head.x_pos, head.y_pos, skip=1) or any(
+            run.contains(head.x_pos, head.y_pos)
+            for run in itertools.islice(self.runs, 1, None)
+        )
+
+
+    def _add_cell(self, position: tuple[int, int], previous: tuple[int, int]):
+        """Add a cell to the tail end of the body, next to the last cell.
+
+        :param position: Position of the new cell.
+        :param previous: Position of the last cell.
+        """
+        facing = FACINGS[(previous[0] - position[0], previous[1] - position[1])]
+        tail = self.runs[-1]
+        if tail.facing is None or tail.facing == facing:
+            tail.facing = facing
+            tail.length += 1
+        else:
+            self.runs.append(Run(*position, None, 1))
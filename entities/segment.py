@@ -6,16 +6,32 @@ import random
 from entities.pellet import Pellet
 
 
+ICONS = [
+    "G", "A", "T", "C"
+]
+"""Icons a segment can be shown with."""
+
+
+def icon_at(index: int, seed: int = 0) -> str:
+    """Get the icon of a segment from its place in the snake. The icons look
+    random, but don't need to be stored, and stay with a segment as the snake
+    moves, the same as a `Segment`'s.
+
+    :param index: Place of the segment in the snake, from 0 at the head.
+    :param seed: Picks which sequence of icons is used.
+
+    :return: The segment's icon.
+    """
+    return ICONS[((index ^ seed) * 0x9E3779B1 >> 16) % len(ICONS)]
+
+
 class Segment:
     """A single segment of the worm"""
-    __icons = [
-        "G", "A", "T", "C"
-    ]
 
     def __init__(self, x_pos: int, y_pos: int):
         self.x_pos = int(x_pos)
         self.y_pos = int(y_pos)
-        self.icon = random.choice(self.__icons)
+        self.icon = random.choice(ICONS)
         """Icon that is shown on the window"""
 
 
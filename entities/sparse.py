@@ -0,0 +1,97 @@
+"""Vacate grid for fields too big to store every cell of"""
+
+from collections import deque
+
+from entities.vacate import NEVER, VacateGrid
+
+
+def pack(x_pos: int, y_pos: int) -> int:
+    """Pack a position into a single int, to use as a key.
+
+    :param x_pos: X position, from -2**31 up to 2**31.
+    :param y_pos: Y position.
+
+    :return: The key, different for every position.
+    """
+    return (y_pos << 32) + x_pos
+
+
+def unpack(key: int) -> tuple[int, int]:
+    """Get the position a key was packed from.
+
+    :param key: The key, from `pack`.
+
+    :return: The (x, y) position.
+    """
+    y_pos, x_pos = divmod(key + 2**31, 2**32)
+    return x_pos - 2**31, y_pos
+
+
+class SparseGrid(VacateGrid):
+    """A `VacateGrid` that only stores the cells the snake is in, keyed by
+    their packed position, so it takes memory for the snake's length rather
+    than the field's area, and has no bounds. Cells are forgotten once the
+    tail leaves them.
+
+    `entries` isn't used.
+    """
+
+    def __init__(self):
+        self.cells: dict[int, int] = {}
+        """The move at which the head last entered each cell the snake is in,
+        by packed position."""
+        self.path: deque[int] = deque()
+        """Packed position of the cell entered at each move from the tail's to
+        the head's."""
+
+        super().__init__(0, 0, 0, 0)
+
+
+    def __len__(self) -> int:
+        """Number of cells stored."""
+        return len(self.cells)
+
+
+    def advance(self, x_pos: int, y_pos: int):
+        """Move the head onto a cell, and the tail off its cell unless there's
+        a segment waiting under it. The cell the tail left is forgotten,
+        unless the head has been back in it since.
+
+        :param x_pos: X position of the new head.
+        :param y_pos: Y position of the new head.
+        """
+        super().advance(x_pos, y_pos)
+
+        while len(self.path) > self.tick - self.tail + 1:
+            key = self.path.popleft()
+            if self.cells.get(key, NEVER) < self.tail:
+                del self.cells[key]
+
+
+    def entry(self, x_pos: int, y_pos: int) -> int:
+        """Get the move at which the head last entered a cell.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: The move, or `NEVER` if the snake isn't in the cell.
+        """
+        return self.cells.get(pack(x_pos, y_pos), NEVER)
+
+
+    def _clear(self):
+        """Forget every cell."""
+        self.cells.clear()
+        self.path.clear()
+
+
+    def _enter(self, x_pos: int, y_pos: int, tick: int):
+        """Record the head entering a cell.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+        :param tick: The move the head entered at.
+        """
+        key = pack(x_pos, y_pos)
+        self.cells[key] = tick
+        self.path.append(key)
@@ -0,0 +1,162 @@
+"""Grid of when the snake will leave each cell of the field"""
+
+from array import array
+from typing import Iterable
+
+
+NEVER = -1
+"""Entry time of a cell the snake hasn't been in since the grid was laid
+out."""
+
+
+class VacateGrid:
+    """Remembers the move at which the snake's head entered each cell of the
+    field. The snake's body is the cells entered since its tail did, so
+    together with the entry time of the tail and the segments waiting to be
+    added under it, a single read tells how many moves it will be until a
+    cell is free. Nothing is stored for free cells, and a move only writes
+    the head's cell.
+
+    :param left: Position of the leftmost boundary.
+    :param right: Position of the rightmost boundary.
+    :param upper: Position of the uppermost boundary.
+    :param lower: Position of the lowermost boundary.
+    """
+
+    def __init__(self, left: int, right: int, upper: int, lower: int):
+        self.left = left
+        self.upper = upper
+        self.width = max(right - left, 0)
+        self.height = max(lower - upper, 0)
+
+        self.entries = array("q", [NEVER]) * (self.width * self.height)
+        """The move at which the head last entered each cell, row by row."""
+        self.tick = 0
+        """Number of moves the snake has made. The head entered its cell at
+        this move."""
+        self.tail = 0
+        """The move at which the head entered the tail's cell."""
+        self.growth = 0
+        """Number of segments waiting under the tail. The tail stays where it
+        is for that many moves."""
+        self.hit = False
+        """Whether the head moved onto the snake's body at the last move."""
+
+
+    def layout(self, cells: Iterable[tuple[int, int]]):
+        """Forget every cell, and lay the snake out over the given cells, as
+        if it had moved along them to its head.
+
+        :param cells: The position of each segment, from the head to the tail.
+            Positions the same as the one before are waiting under the tail.
+        """
+        self._clear()
+        self.hit = False
+
+        path = []
+        self.growth = 0
+        for position in cells:
+            if path and position == path[-1]:
+                self.growth += 1
+            else:
+                path.append(position)
+
+        self.tick = max(len(path) - 1, 0)
+        self.tail = 0
+        for num, (x_pos, y_pos) in enumerate(reversed(path)):
+            self._enter(x_pos, y_pos, num)
+
+
+    def advance(self, x_pos: int, y_pos: int):
+        """Move the head onto a cell, and the tail off its cell unless there's
+        a segment waiting under it.
+
+        :param x_pos: X position of the new head.
+        :param y_pos: Y position of the new head.
+        """
+        self.tick += 1
+        if self.growth:
+            self.growth -= 1
+        else:
+            self.tail += 1
+
+        self.hit = self.moves_until_free(x_pos, y_pos) > 0
+        self._enter(x_pos, y_pos, self.tick)
+
+
+    def grow(self):
+        """Add a segment under the tail."""
+        self.growth += 1
+
+
+    def moves_until_free(self, x_pos: int, y_pos: int) -> int:
+        """Get the number of moves before the snake leaves a cell, if it
+        doesn't eat anything else on the way.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: 0 if the cell is free now, or outside the grid.
+        """
+        entry = self.entry(x_pos, y_pos)
+        if entry < self.tail:
+            return 0
+        return entry - self.tail + self.growth + 1
+
+
+    def free_in(self, x_pos: int, y_pos: int, moves: int) -> bool:
+        """Check if a cell will be free after a number of moves, if the snake
+        doesn't eat anything else on the way.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+        :param moves: Number of moves from now. 0 checks the cell now.
+
+        :return: True if the snake will have left the cell.
+        """
+        return self.moves_until_free(x_pos, y_pos) <= moves
+
+
+    def entry(self, x_pos: int, y_pos: int) -> int:
+        """Get the move at which the head last entered a cell.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: The move, or `NEVER` if the cell is outside the grid, or
+            hasn't been entered.
+        """
+        index = self._index(x_pos, y_pos)
+        return NEVER if index is None else self.entries[index]
+
+
+    def _clear(self):
+        """Forget when every cell was entered."""
+        self.entries = array("q", [NEVER]) * (self.width * self.height)
+
+
+    def _index(self, x_pos: int, y_pos: int) -> int | None:
+        """Get the index of a cell in `entries`.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: The index, or None if the cell is outside the grid.
+        """
+        col = x_pos - self.left
+        row = y_pos - self.upper
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return row * self.width + col
+        return None
+
+
+    def _enter(self, x_pos: int, y_pos: int, tick: int):
+        """Record the head entering a cell.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+        :param tick: The move the head entered at.
+        """
+        index = self._index(x_pos, y_pos)
+        if index is not None:
+            self.entries[index] = tick
@@ -5,28 +5,50 @@ import curses
 import argparse
 import signal
 import sys
+from typing import TYPE_CHECKING
 
-from state import Game
-from state import StateTest
-from state.hiscore import HighScore
-from utils.curses import (
-    check_boundaries,
-    get_old_cursor_visibility
-)
+from scores import BACKENDS
+from state.manager import StateManager
+from state.state import State
+from state.windows import WindowPool
+from utils.curses import check_boundaries
 from utils.errors import WindowSizeError
 from utils.files import get_savedir
+from utils.profiling import FrameProfiler
+
+if TYPE_CHECKING:
+    from scores.submitter import ScoreSubmitter
 
 WIDTH = 80
 HEIGHT = 24
 
 SAVE_FOLDER = "snakey"
+STATS_FILE = "stats.bin"
+
+
+def _on_resize(window: curses.window, width: int, height: int):
+    """Keep the root window at the game's size, and tell the running state to
+    recompute its layout.
+
+    :param window: The root window.
+    :param width: Width of the game window.
+    :param height: Height of the game window.
+    """
+    window.resize(height, width)
+    State.notify_resize()
 
 
-def run(
+def run( #pylint: disable=too-many-arguments,too-many-positional-arguments
     window: curses.window,
     width: int = WIDTH,
     height: int = HEIGHT,
-    test: bool = False
+    test: bool = False,
+    profiler: FrameProfiler | None = None,
+    backend: str = "text",
+    submitter: "ScoreSubmitter | None" = None,
+    pellet_count: int = 1,
+    sparse: bool = False,
+    stats: bool = False
 ):
     """The core game function that runs in a curses wrapper.
 
@@ -34,59 +56,202 @@ def run(
     :param width: Width of the game window.
     :param height: Height of the game window.
     :param test: Whether or not to launch the test state.
+    :param profiler: Times the frames of each game when given.
+    :param backend: Which score store to save the scores to.
+    :param submitter: Also sends the scores to a leaderboard service when
+        given.
+    :param pellet_count: Number of pellets kept on the field at once.
+    :param sparse: Whether the games only keep track of the occupied cells.
+    :param stats: Whether to save each game's statistics.
     """
     check_boundaries(window, height, width)
 
-    curses.curs_set(0)
+    # curses can only read the cursor visibility by changing it
+    old_cursor = curses.curs_set(0)
+    try:
+        _play(
+            window,
+            width,
+            height,
+            test,
+            profiler,
+            backend,
+            submitter,
+            pellet_count,
+            sparse,
+            stats
+        )
+    finally:
+        curses.curs_set(old_cursor)
+
+
+def _play( #pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    window: curses.window,
+    width: int,
+    height: int,
+    test: bool,
+    profiler: FrameProfiler | None,
+    backend: str,
+    submitter: "ScoreSubmitter | None",
+    pellet_count: int,
+    sparse: bool,
+    stats: bool
+):
+    """Set up the terminal, then play games until the player quits. The
+    arguments are the same as `run`'s.
+    """
     curses.start_color()
     curses.use_default_colors()
 
     if sys.platform != "win32":
         signal.signal(
             signal.SIGWINCH,
-            lambda *_: window.resize(height, width)
+            lambda *_: _on_resize(window, width, height)
         )
 
     # run the tests and immediately quit
     if test:
-        StateTest(width, height, fps=10).run()
-        StateTest(width, height, no_delay=False).run()
+        # the test state is rarely used, so it's only imported when it is
+        from state.state_test import StateTest #pylint: disable=import-outside-toplevel
+        pool = WindowPool()
+        for no_delay in (True, False):
+            test_state = StateTest(width, height, 10, no_delay, pool=pool)
+            test_state.run()
+            test_state.close()
         return
 
-    replay = True
-    while replay:
-        game = Game(width, height, 10)
-        game.run()
+    save_dir = get_savedir(SAVE_FOLDER)
+    background = None
+    if save_dir is not None:
+        # imported here rather than with the game, to keep starting up fast
+        from scores.background import BackgroundScores #pylint: disable=import-outside-toplevel
+        background = BackgroundScores(save_dir, backend)
+    stats_buffer = None
+    if stats and save_dir is not None:
+        # statistics are only saved when asked for, so they're only imported
+        # when they are
+        from scores.stats import StatsBuffer #pylint: disable=import-outside-toplevel
+        stats_buffer = StatsBuffer(f"{save_dir}/{STATS_FILE}")
 
-        high_score = HighScore(
-            width,
-            height,
-            game.score,
-            get_savedir(SAVE_FOLDER)
-        )
-        high_score.run()
-        replay = high_score.replay
+    manager = StateManager(
+        width,
+        height,
+        save_dir,
+        backend,
+        background,
+        stats_buffer,
+        submitter,
+        profiler,
+        pellet_count=pellet_count,
+        sparse=sparse
+    )
+    try:
+        manager.play()
+    finally:
+        manager.close()
+        # let the last score finish saving
+        if background is not None:
+            background.shutdown()
+        if stats_buffer is not None:
+            stats_buffer.flush()
 
 
 def main():
     """Main command line entrypoint"""
-    # capture and save the default cursor visibility
-    old_cursor = curses.wrapper(get_old_cursor_visibility)
-
     # command line options
     parser = argparse.ArgumentParser("Snake game.")
     parser.add_argument("-t", "--test", action="store_true")
+    parser.add_argument(
+        "--scores",
+        choices=BACKENDS,
+        default="text",
+        help="where to save the scores: text for text files, sqlite for a "
+            "database that also records the player, game length and board "
+            "size, or binary for a memory-mapped file of sorted records, for "
+            "large score tables (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--submit-url",
+        metavar="URL",
+        help="also send the scores to the leaderboard service at URL, "
+            "started with `python -m scores serve`"
+    )
+    parser.add_argument(
+        "--pellets",
+        metavar="COUNT",
+        type=int,
+        default=1,
+        help="number of pellets on the field at once (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--sparse",
+        action="store_true",
+        help="only keep track of the cells the snake is in, for huge fields"
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="save each game's statistics to stats.bin in the save folder, "
+            "for `python -m scores stats`"
+    )
+    parser.add_argument(
+        "--profile-frames",
+        metavar="PATH",
+        help="time each phase of every game frame, and write a summary to PATH "
+            "on exit. F3 toggles the timings on screen."
+    )
+    parser.add_argument(
+        "--sample-profile",
+        metavar="PATH",
+        help="sample the call stack periodically, and write folded stacks for "
+            "flamegraph tools to PATH on exit"
+    )
+    parser.add_argument(
+        "--sample-interval",
+        metavar="SECONDS",
+        type=float,
+        default=0.01,
+        help="CPU time between stack samples (default: %(default)s)"
+    )
     args = parser.parse_args()
+    if args.pellets < 1:
+        parser.error("--pellets must be at least 1")
+
+    profiler = FrameProfiler() if args.profile_frames else None
+    sampler = None
+    if args.sample_profile:
+        from utils.sampling import SamplingProfiler #pylint: disable=import-outside-toplevel
+        if not SamplingProfiler.available():
+            parser.error("--sample-profile isn't supported on this platform")
+        sampler = SamplingProfiler(args.sample_interval)
+        sampler.start()
+    submitter = None
+    if args.submit_url:
+        from scores.submitter import ScoreSubmitter #pylint: disable=import-outside-toplevel
+        submitter = ScoreSubmitter(args.submit_url)
 
     try:
         curses.wrapper(
             run,
-            **vars(args)
+            test=args.test,
+            profiler=profiler,
+            backend=args.scores,
+            submitter=submitter,
+            pellet_count=args.pellets,
+            sparse=args.sparse,
+            stats=args.stats
         )
     except WindowSizeError as err:
         print(err)
     finally:
-        curses.curs_set(old_cursor)
+        # don't keep the player waiting on a service that's down
+        if submitter is not None and not submitter.close(timeout=2):
+            print("Some scores couldn't be sent to the leaderboard service.")
+        if profiler is not None:
+            profiler.write_summary(args.profile_frames)
+        if sampler is not None:
+            sampler.stop()
+            sampler.write(args.sample_profile)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,56 @@
+"""Storage for the scores of finished games. The stores are only imported
+when they're first used, so starting the game doesn't wait for backends it
+won't use.
+"""
+
+import importlib
+from typing import TYPE_CHECKING
+
+from scores.record import ScoreRecord
+from scores.store import BACKENDS, FILE_NAMES, ScoreStore, open_store
+
+if TYPE_CHECKING:
+    from scores.binary import BinaryStore
+    from scores.journal import JournalStore
+    from scores.sqlite import SqliteStore
+
+_MODULES = {
+    "BinaryStore": "scores.binary",
+    "JournalStore": "scores.journal",
+    "SqliteStore": "scores.sqlite"
+}
+"""Module each store is defined in."""
+
+__all__ = [
+    "BACKENDS",
+    "BinaryStore",
+    "FILE_NAMES",
+    "JournalStore",
+    "ScoreRecord",
+    "ScoreStore",
+    "SqliteStore",
+    "open_store"
+]
+
+
+def __getattr__(name: str) -> type:
+    """Import a store the first time it's used.
+
+    :param name: Name of the store.
+
+    :raises AttributeError: If there's no store with that name.
+
+    :return: The store's class.
+    """
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_MODULES[name]), name)
+
+
+def __dir__() -> list[str]:
+    """List the module's attributes, including the stores that haven't been
+    imported.
+
+    :return: The module's attributes.
+    """
+    return sorted([*globals(), *__all__])
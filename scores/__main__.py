@@ -0,0 +1,181 @@
+"""Command line entrypoint for managing score files.
+
+    python -m scores migrate SAVE_DIR
+    python -m scores merge PATH... [-n COUNT] [-o OUTPUT]
+    python -m scores serve PATH [--backend BACKEND] [--host HOST] [--port PORT]
+    python -m scores stats PATH...
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+
+from scores.binary import BinaryStore
+from scores.merge import merge_ranked, ranked_records, score_files
+from scores.record import format_record
+from scores.service import LeaderboardService
+from scores.stats import read_columns, summarize
+from scores.store import BACKENDS, FILE_NAMES, text_paths
+
+
+def migrate(args: argparse.Namespace) -> int:
+    """Import the text scores of a save directory into its binary score file.
+
+    :param args: The parsed command line arguments.
+
+    :return: 1 if the binary file already has scores, 0 otherwise.
+    """
+    store = BinaryStore(os.path.join(args.save_dir, FILE_NAMES["binary"]))
+    if not store.is_new() and not args.force:
+        print(f"{store.path} already has scores, use --force to add to them")
+        return 1
+
+    imported = store.import_text(*text_paths(args.save_dir))
+    print(f"imported {imported} scores into {store.path}")
+    return 0
+
+
+def merge(args: argparse.Namespace) -> int:
+    """Merge score files into one leaderboard, and write it as a score file.
+
+    :param args: The parsed command line arguments.
+
+    :return: The exit code.
+    """
+    sources = [
+        ranked_records(path, args.count) for path in score_files(args.paths)
+    ]
+    with (
+        open(args.output, "wt", encoding="UTF-8")
+        if args.output != "-" else contextlib.nullcontext(sys.stdout)
+    ) as output:
+        for record in merge_ranked(sources, args.count):
+            output.write(format_record(record))
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    """Run the leaderboard service until interrupted.
+
+    :param args: The parsed command line arguments.
+
+    :return: The exit code.
+    """
+    async def run():
+        service = LeaderboardService(args.backend, args.path, args.page_size)
+        port = await service.start(args.host, args.port)
+        print(f"serving {args.path} on http://{args.host}:{port}")
+        try:
+            await service.server.serve_forever() #type: ignore
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def stats(args: argparse.Namespace) -> int:
+    """Aggregate the game statistics of any number of stats files.
+
+    :param args: The parsed command line arguments.
+
+    :return: The exit code.
+    """
+    columns = read_columns(args.paths[0])
+    for path in args.paths[1:]:
+        for name, column in read_columns(path).items():
+            columns[name].extend(column)
+
+    print(json.dumps(summarize(columns), indent=2))
+    return 0
+
+
+def main() -> int:
+    """Parse the command line and run the chosen command.
+
+    :return: The exit code.
+    """
+    parser = argparse.ArgumentParser("python -m scores")
+    commands = parser.add_subparsers(required=True)
+
+    migrate_parser = commands.add_parser(
+        "migrate",
+        help="import the text scores into the binary score file"
+    )
+    migrate_parser.add_argument("save_dir")
+    migrate_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="import even if the binary file already has scores"
+    )
+    migrate_parser.set_defaults(command=migrate)
+
+    merge_parser = commands.add_parser(
+        "merge",
+        help="merge score files, journals and save directories into one ranking"
+    )
+    merge_parser.add_argument("paths", nargs="+", metavar="PATH")
+    merge_parser.add_argument(
+        "-n",
+        "--count",
+        type=int,
+        default=None,
+        help="only keep the best COUNT scores"
+    )
+    merge_parser.add_argument(
+        "-o",
+        "--output",
+        default="-",
+        help="file to write the merged scores to (default: standard output)"
+    )
+    merge_parser.set_defaults(command=merge)
+
+    serve_parser = commands.add_parser(
+        "serve",
+        help="collect scores over HTTP, and serve the leaderboard"
+    )
+    serve_parser.add_argument("path", help="score file to save the scores to")
+    serve_parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="binary",
+        help="score store to use (default: %(default)s)"
+    )
+    serve_parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="address to listen on (default: %(default)s)"
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=8080,
+        help="port to listen on (default: %(default)s)"
+    )
+    serve_parser.add_argument(
+        "--page-size",
+        type=int,
+        default=10,
+        help="scores on each leaderboard page (default: %(default)s)"
+    )
+    serve_parser.set_defaults(command=serve)
+
+    stats_parser = commands.add_parser(
+        "stats",
+        help="aggregate the game statistics of stats files"
+    )
+    stats_parser.add_argument("paths", nargs="+", metavar="PATH")
+    stats_parser.set_defaults(command=stats)
+
+    args = parser.parse_args()
+    return args.command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Loading and saving scores on a worker thread, off the UI thread."""
+
+import os
+import queue
+import threading
+from typing import Callable, Generic, TypeVar
+
+from scores.record import ScoreRecord
+from scores.store import FILE_NAMES, ScoreStore, open_store
+
+
+T = TypeVar("T")
+
+
+class Task(Generic[T]):
+    """A load or save run on the worker thread. `concurrent.futures` isn't
+    used for this, since importing it slows down starting the game.
+
+    :param work: Does the work, and returns its result.
+    """
+
+    def __init__(self, work: Callable[[], T]):
+        self.work = work
+        self._finished = threading.Event()
+        self._result: T | None = None
+        self._error: Exception | None = None
+
+
+    def run(self):
+        """Do the work, keeping its result or the error it raised. Only called
+        on the worker thread.
+        """
+        try:
+            self._result = self.work()
+        except Exception as err: #pylint: disable=broad-exception-caught
+            self._error = err
+        finally:
+            self._finished.set()
+
+
+    def done(self) -> bool:
+        """Check whether the work has finished, without waiting.
+
+        :return: True once it has finished, or failed.
+        """
+        return self._finished.is_set()
+
+
+    def exception(self) -> Exception | None:
+        """Wait for the work to finish, and get the error it raised.
+
+        :return: The error, or None if it didn't fail.
+        """
+        self._finished.wait()
+        return self._error
+
+
+    def result(self) -> T:
+        """Wait for the work to finish, and get its result.
+
+        :return: What the work returned.
+
+        :raises Exception: The error the work raised, if it failed.
+        """
+        self._finished.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result #type: ignore
+
+
+class BackgroundScores:
+    """Runs every score file operation on a single worker thread, in the order
+    they were requested. The game can start loading the scores as soon as a
+    game starts, and save them once the score screen is showing, without
+    either waiting on the disk.
+
+    The store is only ever opened and used on the worker thread, since the
+    SQLite store can't be shared between threads.
+
+    :param save_dir: Directory the score files are kept in.
+    :param backend: Which score store to use, one of `scores.BACKENDS`.
+    :param max_records: Number of scores to load.
+    """
+
+    def __init__(self, save_dir: str, backend: str = "text", max_records: int = 10):
+        self.save_dir = save_dir
+        self.backend = backend
+        self.max_records = max_records
+        self.path = f"{save_dir}/{FILE_NAMES[backend]}"
+        """Path of the score file."""
+
+        self._tasks: queue.Queue[Task | None] = queue.Queue()
+        self._store: ScoreStore | None = None
+        self._loading: Task[list[ScoreRecord]] | None = None
+        self._thread = threading.Thread(
+            target=self._work_loop,
+            name="scores",
+            daemon=True
+        )
+        self._thread.start()
+
+
+    def preload(self) -> Task[list[ScoreRecord]]:
+        """Start loading the best scores, if they aren't already loading.
+
+        :return: The task loading the scores.
+        """
+        if self._loading is None:
+            self._loading = self._submit(self._load)
+        return self._loading
+
+
+    def take_loaded(self) -> Task[list[ScoreRecord]]:
+        """Get the preloaded scores, starting to load them if they weren't
+        preloaded. The next `preload` starts a fresh load.
+
+        :return: The task loading the scores.
+        """
+        loading = self.preload()
+        self._loading = None
+        return loading
+
+
+    def save(self, record: ScoreRecord) -> Task[None]:
+        """Start saving a game's record. It is saved after any loads that were
+        already started.
+
+        :param record: The record to save.
+
+        :return: The task saving the record.
+        """
+        return self._submit(lambda: self._save(record))
+
+
+    def shutdown(self):
+        """Wait for every load and save to finish, then close the store."""
+        self._submit(self._close)
+        self._tasks.put(None)
+        self._thread.join()
+
+
+    def _submit(self, work: Callable[[], T]) -> Task[T]:
+        """Queue work for the worker thread.
+
+        :param work: Does the work, and returns its result.
+
+        :return: The task doing the work.
+        """
+        task = Task(work)
+        self._tasks.put(task)
+        return task
+
+
+    def _work_loop(self):
+        """Run the tasks in the order they were queued, until shut down. Runs
+        on the worker thread.
+        """
+        while (task := self._tasks.get()) is not None:
+            task.run()
+
+
+    def _open(self) -> ScoreStore:
+        """Open the store, creating the save directory if needed. Only called
+        on the worker thread.
+
+        :return: The store.
+        """
+        if self._store is None:
+            os.makedirs(self.save_dir, exist_ok=True)
+            self._store = open_store(self.backend, self.path, self.max_records)
+        return self._store
+
+
+    def _load(self) -> list[ScoreRecord]:
+        """Load the best scores. Only called on the worker thread.
+
+        :return: The best records.
+        """
+        return self._open().top(self.max_records)
+
+
+    def _save(self, record: ScoreRecord):
+        """Save a record. Only called on the worker thread.
+
+        :param record: The record to save.
+        """
+        self._open().add(record)
+
+
+    def _close(self):
+        """Close the store if it has a connection. Only called on the worker
+        thread.
+        """
+        close = getattr(self._store, "close", None)
+        if close is not None:
+            close()
+        self._store = None
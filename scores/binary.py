@@ -0,0 +1,348 @@
+"""Fixed-width binary score file, accessed through mmap."""
+
+import itertools
+import mmap
+import os
+import struct
+import zlib
+from typing import Iterable
+
+from scores.locking import locked
+from scores.record import ScoreRecord, rank_key
+from scores.topk import iter_records
+from utils.errors import ScoreFileError
+
+
+MAGIC = b"SNKB"
+"""Identifies a binary score file."""
+VERSION = 2
+"""Version of the file format."""
+
+HEADER = struct.Struct("<4sHHIII12x")
+"""Magic, version, record size, record count, record capacity, and the CRC32
+of the fields before it, padded to 32 bytes."""
+HEADER_CHECKED = struct.calcsize("<4sHHII")
+"""Number of bytes at the start of the header covered by its CRC32."""
+FIELDS = struct.Struct("<qdB32s3x")
+"""Score, timestamp, and the game ID as UTF-8, as its length in bytes and up
+to 32 bytes padded with zeroes."""
+RECORD = struct.Struct(f"<{FIELDS.size}sI")
+"""The packed fields of a record, and their CRC32."""
+
+ID_SIZE = 32
+"""Most bytes of a game ID that are stored. IDs from `new_game_id` fit."""
+
+
+def _stored_id(game_id: str) -> bytes:
+    """Encode a game ID the way it's stored, cut off to fit in a record.
+
+    :param game_id: The ID.
+
+    :return: The stored ID.
+    """
+    stored = game_id.encode("UTF-8")[:ID_SIZE]
+    # don't leave half a character on the end of a cut off ID
+    return stored.decode("UTF-8", "ignore").encode("UTF-8")
+
+
+def _pack(record: ScoreRecord) -> bytes:
+    """Pack a record, and its checksum.
+
+    :param record: The record.
+
+    :return: The packed record.
+    """
+    game_id = _stored_id(record.game_id)
+    fields = FIELDS.pack(record.score, record.timestamp, len(game_id), game_id)
+    return RECORD.pack(fields, zlib.crc32(fields))
+
+
+def _unpack(packed: bytes) -> ScoreRecord | None:
+    """Unpack a record packed by `_pack`.
+
+    :param packed: The packed record.
+
+    :return: The record, or None if it failed its checksum.
+    """
+    fields, checksum = RECORD.unpack(packed)
+    if zlib.crc32(fields) != checksum:
+        return None
+    score, timestamp, length, game_id = FIELDS.unpack(fields)
+    if length > ID_SIZE:
+        return None
+    return ScoreRecord(score, timestamp, game_id[:length].decode("UTF-8", "replace"))
+
+
+class BinaryStore:
+    """Stores every score as a fixed-width record, sorted best first, in a
+    single file that is read and written through mmap.
+
+    Reading the best N scores unpacks the first N records, and nothing else.
+    Adding a score finds its place with a binary search, and shifts the worse
+    records along by one record in place. The file grows by doubling, so it's
+    rarely resized. The header and each record hold their own checksum, so
+    reading the best N scores only checks those N records.
+
+    Readers share a lock on the file, and wait while a score is being added,
+    so they never see the records half shifted along.
+
+    :param path: Path of the score file.
+    :param max_records: Default number of scores returned by `top`.
+    """
+
+    def __init__(self, path: str, max_records: int = 10):
+        self.path = path
+        self.max_records = max_records
+
+
+    def is_new(self) -> bool:
+        """Check if the file hasn't been written yet.
+
+        :return: True if the file is missing or empty.
+        """
+        return not os.path.isfile(self.path) or os.path.getsize(self.path) == 0
+
+
+    def top(self, count: int | None = None) -> list[ScoreRecord]:
+        """Get the best scores.
+
+        :param count: Number of scores to get. Defaults to `max_records`.
+
+        :raises ScoreFileError: If the file is corrupt.
+
+        :return: The best records, highest score first.
+        """
+        if count is None:
+            count = self.max_records
+        if self.is_new():
+            return []
+
+        with locked(self.path, shared=True):
+            return self._top(count)
+
+
+    def add(self, record: ScoreRecord):
+        """Insert a game's record in its ranked place.
+
+        :param record: The record to add.
+
+        :raises ScoreFileError: If the file is corrupt.
+        """
+        with locked(self.path):
+            if self.is_new():
+                self._write_all([])
+
+            with open(self.path, "r+b") as file:
+                view = mmap.mmap(file.fileno(), 0)
+                try:
+                    stored, capacity = self._check(view)
+                    if stored == capacity:
+                        view.close()
+                        capacity = max(capacity * 2, 16)
+                        file.truncate(HEADER.size + capacity * RECORD.size)
+                        view = mmap.mmap(file.fileno(), 0)
+
+                    index = self._insert_index(view, stored, rank_key(record))
+                    start = HEADER.size + index * RECORD.size
+                    end = HEADER.size + stored * RECORD.size
+                    view.move(start + RECORD.size, start, end - start)
+                    view[start:start + RECORD.size] = _pack(record)
+                    self._write_header(view, stored + 1, capacity)
+                    view.flush()
+                finally:
+                    view.close()
+
+
+    def import_records(self, records: Iterable[ScoreRecord]) -> int:
+        """Add many records at once, by sorting them with the stored records
+        and writing a new file. This is how old text score files are migrated.
+        Records of games that are already stored are skipped, so importing
+        the same scores twice doesn't add them twice.
+
+        :param records: The records to add.
+
+        :raises ScoreFileError: If the file is corrupt.
+
+        :return: The number of records added.
+        """
+        with locked(self.path):
+            existing = self._top(None)
+            stored_ids = {
+                record.game_id for record in existing if record.game_id
+            }
+            added = [
+                record for record in records
+                if not record.game_id
+                or _stored_id(record.game_id).decode("UTF-8") not in stored_ids
+            ]
+            if added:
+                self._write_all(sorted([*existing, *added], key=rank_key))
+            return len(added)
+
+
+    def import_text(self, snapshot_path: str, journal_path: str) -> int:
+        """Import every score from a text score file and its journal. A game in
+        both files is only imported once.
+
+        :param snapshot_path: Path of the text score file.
+        :param journal_path: Path of its journal.
+
+        :raises ScoreFileError: If the binary file is corrupt.
+
+        :return: The number of imported records, not counting games that were
+            already stored.
+        """
+        seen = set()
+        records = []
+        for record in itertools.chain(
+            iter_records(snapshot_path),
+            iter_records(journal_path)
+        ):
+            if record.game_id:
+                if record.game_id in seen:
+                    continue
+                seen.add(record.game_id)
+            records.append(record)
+
+        if not records:
+            return 0
+        return self.import_records(records)
+
+
+    def __len__(self) -> int:
+        """Number of stored records."""
+        if self.is_new():
+            return 0
+        with locked(self.path, shared=True):
+            with open(self.path, "rb") as file:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    return self._check(view)[0]
+
+
+    def _top(self, count: int | None) -> list[ScoreRecord]:
+        """Get the best scores, while the lock is held.
+
+        :param count: Number of scores to get, or None for every score.
+
+        :raises ScoreFileError: If the file is corrupt.
+
+        :return: The best records, highest score first.
+        """
+        if self.is_new():
+            return []
+
+        with open(self.path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                stored, _ = self._check(view)
+                if count is not None:
+                    stored = min(count, stored)
+                return [self._read(view, index) for index in range(stored)]
+
+
+    def _write_all(self, records: list[ScoreRecord]):
+        """Write a new file with the given records, replacing the old one
+        atomically.
+
+        :param records: The records to write, already sorted best first.
+        """
+        capacity = max(len(records), 16)
+        body = bytearray(HEADER.size + capacity * RECORD.size)
+        for index, record in enumerate(records):
+            start = HEADER.size + index * RECORD.size
+            body[start:start + RECORD.size] = _pack(record)
+        self._write_header(body, len(records), capacity)
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(body)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.path)
+
+
+    def _check(self, view: mmap.mmap) -> tuple[int, int]:
+        """Check the header. The records are checked as they're read.
+
+        :param view: The mapped file.
+
+        :raises ScoreFileError: If the file isn't a binary score file of this
+            version, or the header's checksum doesn't match.
+
+        :return: The number of stored records, and the capacity.
+        """
+        if len(view) < HEADER.size:
+            raise ScoreFileError(f"{self.path} is too short to be a score file")
+
+        magic, version, record_size, stored, capacity, checksum = (
+            HEADER.unpack_from(view, 0)
+        )
+        if magic != MAGIC:
+            raise ScoreFileError(f"{self.path} is not a binary score file")
+        if version != VERSION or record_size != RECORD.size:
+            raise ScoreFileError(
+                f"{self.path} is version {version}, expected {VERSION}"
+            )
+        if zlib.crc32(view[:HEADER_CHECKED]) != checksum:
+            raise ScoreFileError(f"{self.path} failed its checksum")
+        if len(view) < HEADER.size + capacity * RECORD.size or stored > capacity:
+            raise ScoreFileError(f"{self.path} is truncated")
+
+        return stored, capacity
+
+
+    @staticmethod
+    def _write_header(view: mmap.mmap | bytearray, stored: int, capacity: int):
+        """Update the header after the records have changed.
+
+        :param view: The mapped file, or the bytes to write to a new one.
+        :param stored: Number of stored records.
+        :param capacity: Number of records the file has room for.
+        """
+        HEADER.pack_into(view, 0, MAGIC, VERSION, RECORD.size, stored, capacity, 0)
+        checksum = zlib.crc32(view[:HEADER_CHECKED])
+        HEADER.pack_into(
+            view, 0, MAGIC, VERSION, RECORD.size, stored, capacity, checksum
+        )
+
+
+    def _read(self, view: mmap.mmap, index: int) -> ScoreRecord:
+        """Unpack a single record, and check its checksum.
+
+        :param view: The mapped file.
+        :param index: Rank of the record, from 0.
+
+        :raises ScoreFileError: If the record failed its checksum.
+
+        :return: The record.
+        """
+        start = HEADER.size + index * RECORD.size
+        record = _unpack(view[start:start + RECORD.size])
+        if record is None:
+            raise ScoreFileError(f"{self.path} failed its checksum")
+        return record
+
+
+    def _insert_index(
+        self,
+        view: mmap.mmap,
+        stored: int,
+        key: tuple[int, float]
+    ) -> int:
+        """Find where a record belongs, after any records that rank the same.
+
+        :param view: The mapped file.
+        :param stored: Number of stored records.
+        :param key: The record's `rank_key`.
+
+        :raises ScoreFileError: If a record failed its checksum.
+
+        :return: The index to insert the record at.
+        """
+        low, high = 0, stored
+        while low < high:
+            middle = (low + high) // 2
+            if key < rank_key(self._read(view, middle)):
+                high = middle
+            else:
+                low = middle + 1
+        return low
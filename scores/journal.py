@@ -0,0 +1,169 @@
+"""Append-only score journal with a compacted top-N snapshot."""
+
+import itertools
+import os
+from typing import Iterator
+
+from scores.locking import locked
+from scores.record import ScoreRecord, format_record
+from scores.topk import iter_records, top_k
+
+
+class JournalStore:
+    """Stores scores as a short journal of recent games, plus a snapshot of the
+    best scores.
+
+    Each game appends a single line to the journal, so saving a score doesn't
+    depend on how many scores there are. Once the journal has grown long
+    enough, it's compacted: the best scores from the snapshot and journal are
+    written to a new snapshot, which replaces the old one in a single rename,
+    and then the journal is emptied. If the game stops between those two steps,
+    the journal's records are also in the snapshot, and the game IDs are used
+    to drop the duplicates when they're read.
+
+    The snapshot is compatible with the old score files, which only have one
+    score per line.
+
+    Writes from different processes are serialised with an advisory lock, which
+    is only held to append a line or to compact. Compaction re-reads both files
+    while it holds the lock, so it includes every game appended before it,
+    and no game can be appended to a journal that is about to be emptied.
+    Reading doesn't lock: a reader sees each file either before or after it
+    was replaced.
+
+    Both files are streamed through a bounded heap when they're read, so
+    neither is ever loaded whole. Without compaction, the journal is a full
+    history of every game that is only ever appended to, and can grow to
+    millions of games.
+
+    :param snapshot_path: Path of the snapshot of the best scores.
+    :param journal_path: Path of the journal of recent games.
+    :param max_records: Number of scores kept in the snapshot.
+    :param compact_after: Number of journal records that triggers compaction.
+        None to never compact.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: str,
+        journal_path: str,
+        max_records: int = 10,
+        compact_after: int | None = 32
+    ):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.max_records = max_records
+        self.compact_after = compact_after
+
+        self._journal_length = 0
+        """Number of records in the journal when it was last read or written
+        by this store."""
+
+
+    def top(self, count: int | None = None) -> list[ScoreRecord]:
+        """Get the best scores from the snapshot and journal.
+
+        :param count: Number of scores to get. Defaults to `max_records`.
+
+        :return: The best records, highest score first.
+        """
+        if count is None:
+            count = self.max_records
+
+        self._journal_length = 0
+        return top_k(
+            itertools.chain(
+                iter_records(self.snapshot_path),
+                self._count_journal(iter_records(self.journal_path))
+            ),
+            count
+        )
+
+
+    def add(self, record: ScoreRecord):
+        """Append a game's record to the journal, and compact the journal if
+        it's long enough.
+
+        :param record: The record to add.
+        """
+        line = format_record(record)
+        with locked(self.snapshot_path):
+            self._append(self.journal_path, line)
+        self._journal_length += 1
+
+        if (
+            self.compact_after is not None
+            and self._journal_length >= self.compact_after
+        ):
+            self.compact(self.compact_after)
+
+
+    def compact(self, min_length: int = 0):
+        """Rewrite the snapshot with the best scores, then empty the journal.
+
+        :param min_length: Only compact if the journal still has at least this
+            many records once the lock is held. When several processes race to
+            compact, only the first one does.
+        """
+        with locked(self.snapshot_path):
+            best = self.top()
+            if self._journal_length < min_length:
+                return
+
+            self._replace(
+                self.snapshot_path,
+                "".join(format_record(record) for record in best)
+            )
+            self._replace(self.journal_path, "")
+            self._journal_length = 0
+
+
+    def _count_journal(
+        self,
+        records: Iterator[ScoreRecord]
+    ) -> Iterator[ScoreRecord]:
+        """Count the journal's records as they're streamed.
+
+        :param records: The journal's records.
+
+        :return: The same records.
+        """
+        for record in records:
+            self._journal_length += 1
+            yield record
+
+
+    @staticmethod
+    def _append(path: str, line: str):
+        """Append a line to a file, and make sure it's on the disk before
+        returning. If the last line was cut off by a crash, it's ended first so
+        the new line stays readable.
+
+        :param path: The file to append to.
+        :param line: The line to append, including the newline.
+        """
+        data = line.encode("UTF-8")
+        with open(path, "a+b") as file:
+            if file.seek(0, os.SEEK_END) > 0:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    data = b"\n" + data
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+
+    @staticmethod
+    def _replace(path: str, contents: str):
+        """Replace a file's contents atomically, by writing a temporary file
+        and renaming it over the original.
+
+        :param path: The file to replace.
+        :param contents: The new contents.
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wt", encoding="UTF-8") as file:
+            file.write(contents)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
@@ -0,0 +1,33 @@
+"""Advisory locks that serialise score file updates between processes."""
+
+from contextlib import contextmanager
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError: # pragma: no cover
+    # advisory locks aren't available on Windows
+    fcntl = None
+
+
+@contextmanager
+def locked(path: str, shared: bool = False) -> Iterator[None]:
+    """Hold a lock for a score file while in the with statement. The lock is
+    taken on a separate `.lock` file next to it, since the score files
+    themselves are replaced rather than written in place. Without `fcntl`,
+    this doesn't lock anything.
+
+    :param path: Path of the score file to lock.
+    :param shared: Take a shared lock, for reading. Any number of readers can
+        hold it at once, but not while a writer holds the exclusive lock.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(f"{path}.lock", "ab") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
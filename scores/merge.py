@@ -0,0 +1,172 @@
+"""Streaming k-way merge of score files into a single leaderboard."""
+
+import heapq
+import itertools
+import os
+import tempfile
+from typing import IO, Iterable, Iterator
+
+from scores.record import ScoreRecord, format_record, parse_record, rank_key
+from scores.store import FILE_NAMES, journal_path
+from scores.topk import iter_records, top_k
+
+
+CHUNK_SIZE = 10_000
+"""Most records of an unranked file that are held in memory at once."""
+
+
+def ranked_records(
+    path: str,
+    count: int | None = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[ScoreRecord]:
+    """Stream a score file's records best first, in constant memory.
+
+    With a count, the file is read once, keeping only the best records in a
+    bounded heap. Otherwise, it's sorted externally as it's read: the records
+    at the start that are already ranked, which is all of a snapshot, are read
+    straight from the file again, and the rest, like a journal, are sorted
+    `chunk_size` at a time into temporary files that are merged as they're
+    read.
+
+    :param path: The file to read.
+    :param count: Number of records needed. None for all of them.
+    :param chunk_size: Most records to sort in memory at once.
+
+    :return: The records, best first.
+    """
+    if count is not None:
+        return iter(top_k(iter_records(path), count))
+    return _external_sort(path, chunk_size)
+
+
+def score_files(paths: Iterable[str]) -> list[str]:
+    """Expand save directories into the text score files inside them.
+
+    :param paths: Score files, journals, or save directories.
+
+    :return: The files, with each directory replaced by its score file and
+        journal, if they exist.
+    """
+    files = []
+    for path in paths:
+        if not os.path.isdir(path):
+            files.append(path)
+            continue
+
+        snapshot_path = os.path.join(path, FILE_NAMES["text"])
+        for found in (snapshot_path, journal_path(snapshot_path)):
+            if os.path.isfile(found):
+                files.append(found)
+    return files
+
+
+def merge_ranked(
+    sources: Iterable[Iterable[ScoreRecord]],
+    count: int | None = None
+) -> Iterator[ScoreRecord]:
+    """Merge streams of ranked records into one ranked stream, dropping
+    repeats of the same game.
+
+    The same game has the same score and timestamp wherever it was saved, so
+    its copies come out of the merge next to each other. Only the game IDs of
+    the current run of equally ranked records are kept to spot them, so memory
+    doesn't grow with the number of records. Records without a game ID are
+    never dropped.
+
+    :param sources: The streams to merge, each already sorted best first.
+    :param count: Maximum number of records to yield. None for all of them.
+
+    :return: The merged records, best first.
+    """
+    return itertools.islice(_drop_repeats(heapq.merge(*sources, key=rank_key)), count)
+
+
+def _drop_repeats(records: Iterator[ScoreRecord]) -> Iterator[ScoreRecord]:
+    """Drop records with the same game ID as an equally ranked record before
+    them.
+
+    :param records: The merged records, best first.
+
+    :return: The records without repeats.
+    """
+    run_key = None
+    run_ids: set[str] = set()
+    for record in records:
+        key = rank_key(record)
+        if key != run_key:
+            run_key = key
+            run_ids.clear()
+
+        if record.game_id:
+            if record.game_id in run_ids:
+                continue
+            run_ids.add(record.game_id)
+        yield record
+
+
+def _external_sort(path: str, chunk_size: int) -> Iterator[ScoreRecord]:
+    """Sort a score file in one pass, holding at most `chunk_size` records.
+    The ranked records at the start of the file are left where they are, and
+    the rest are split into sorted runs, each written to a temporary file once
+    it's full. Ties keep the order of the file.
+
+    :param path: The file to sort.
+    :param chunk_size: Most records to sort in memory at once.
+
+    :return: The records, best first.
+    """
+    runs: list[IO[str]] = []
+    try:
+        ranked = 0
+        previous = None
+        chunk: list[ScoreRecord] = []
+        for record in iter_records(path):
+            key = rank_key(record)
+            if not runs and not chunk and (previous is None or key >= previous):
+                ranked += 1
+                previous = key
+                continue
+
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                runs.append(_write_run(chunk))
+                chunk = []
+
+        chunk.sort(key=rank_key)
+        yield from heapq.merge(
+            itertools.islice(iter_records(path), ranked),
+            *(_read_run(run) for run in runs),
+            chunk,
+            key=rank_key
+        )
+    finally:
+        for run in runs:
+            run.close()
+
+
+def _write_run(records: list[ScoreRecord]) -> IO[str]:
+    """Sort records into a temporary file.
+
+    :param records: The records. They're sorted in place.
+
+    :return: The file, ready to be read from the start.
+    """
+    records.sort(key=rank_key)
+    run = tempfile.TemporaryFile("w+t", encoding="UTF-8") #pylint: disable=consider-using-with
+    run.writelines(format_record(record) for record in records)
+    run.seek(0)
+    return run
+
+
+def _read_run(run: IO[str]) -> Iterator[ScoreRecord]:
+    """Stream the records of a temporary file written by `_write_run`.
+
+    :param run: The file.
+
+    :return: The records, best first.
+    """
+    for line in run:
+        record = parse_record(line)
+        if record is not None:
+            yield record
@@ -0,0 +1,80 @@
+"""A single game's score, and its line in the score files."""
+
+import os
+from typing import NamedTuple
+
+
+class ScoreRecord(NamedTuple):
+    """One finished game.
+
+    Text score files store records one per line, as the score, the timestamp
+    and the game ID separated by spaces. Lines from older score files only have
+    the score. The other fields are only kept by the database store.
+    """
+
+    score: int
+    """Number of pellets picked up."""
+    timestamp: float = 0.0
+    """When the game finished, in seconds since the epoch. 0 if unknown."""
+    game_id: str = ""
+    """Unique ID of the game, used to spot duplicates. Empty if unknown."""
+    player: str = ""
+    """Name of the user who played the game. Empty if unknown."""
+    ticks: int = 0
+    """Number of times the game updated before it ended."""
+    width: int = 0
+    """Width of the game window."""
+    height: int = 0
+    """Height of the game window."""
+
+
+def new_game_id() -> str:
+    """Make a new unique game ID.
+
+    :return: The ID, as 32 hex digits.
+    """
+    # random like a version 4 UUID, without the slow to import uuid module
+    return os.urandom(16).hex()
+
+
+def format_record(record: ScoreRecord) -> str:
+    """Format a record as a line of a score file.
+
+    :param record: The record to format.
+
+    :return: The line, including the newline.
+    """
+    if not record.game_id:
+        return f"{record.score} {record.timestamp:.3f}\n"
+    return f"{record.score} {record.timestamp:.3f} {record.game_id}\n"
+
+
+def parse_record(line: str) -> ScoreRecord | None:
+    """Parse a line of a score file.
+
+    :param line: The line to parse.
+
+    :return: The record, or None if the line is blank or malformed, e.g. if it
+        was cut off by a crash.
+    """
+    fields = line.split()
+    try:
+        if len(fields) == 1:
+            return ScoreRecord(int(fields[0]))
+        if len(fields) == 2:
+            return ScoreRecord(int(fields[0]), float(fields[1]))
+        if len(fields) == 3:
+            return ScoreRecord(int(fields[0]), float(fields[1]), fields[2])
+    except ValueError:
+        pass
+    return None
+
+
+def rank_key(record: ScoreRecord) -> tuple[int, float]:
+    """Sort key for ranking records: highest score first, then earliest.
+
+    :param record: The record to rank.
+
+    :return: The key, for use with an ascending sort.
+    """
+    return -record.score, record.timestamp
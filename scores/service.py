@@ -0,0 +1,324 @@
+"""Small asyncio HTTP service that collects scores and serves leaderboards.
+
+    POST /scores            JSON list of records to add
+    GET  /leaderboard?page=N  JSON page of the ranked scores, from page 1
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import math
+import os
+from urllib.parse import parse_qs, urlsplit
+
+from scores.record import ScoreRecord
+from scores.store import ScoreStore, open_store
+
+
+MAX_BODY = 1 << 20
+"""Largest request body accepted, in bytes."""
+
+INT_RANGE = range(-(1 << 63), 1 << 63)
+"""Whole numbers a record can hold. The binary and database stores keep them
+as signed 64-bit integers."""
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Content Too Large",
+    500: "Internal Server Error"
+}
+"""Reason phrases of the status codes the service sends."""
+
+
+class RequestError(Exception):
+    """A request the service can't answer, with the status to answer it with.
+
+    :param status: The HTTP status code.
+    :param message: What was wrong with the request.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def record_to_json(record: ScoreRecord, rank: int) -> dict:
+    """Convert a record to a leaderboard entry.
+
+    :param record: The record.
+    :param rank: The record's place on the leaderboard, from 1.
+
+    :return: The record's fields, and its rank.
+    """
+    return {"rank": rank, **record._asdict()}
+
+
+def record_from_json(entry: object) -> ScoreRecord:
+    """Convert a submitted record back into a `ScoreRecord`.
+
+    :param entry: The decoded JSON object.
+
+    :raises RequestError: If it isn't a valid record, or has a number the
+        stores can't keep or rank.
+
+    :return: The record.
+    """
+    if not isinstance(entry, dict) or not isinstance(entry.get("score"), int):
+        raise RequestError(400, "each record needs an integer score")
+
+    fields = {
+        name: entry[name]
+        for name in ScoreRecord._fields
+        if name in entry
+    }
+    for name, value in fields.items():
+        expected = ScoreRecord.__annotations__[name]
+        if expected is float and isinstance(value, int):
+            value = fields[name] = float(value)
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise RequestError(400, f"{name} must be a {expected.__name__}")
+        if expected is int and value not in INT_RANGE:
+            raise RequestError(400, f"{name} must fit in 64 bits")
+        if expected is float and not math.isfinite(value):
+            raise RequestError(400, f"{name} must be finite")
+    return ScoreRecord(**fields)
+
+
+class LeaderboardService:
+    """Collects the scores of games played on many machines into a single
+    score store, and serves the leaderboard a page at a time.
+
+    The best scores are cached for each page size that has been asked for,
+    and the cache is cleared whenever scores are added, so popular pages are
+    served without touching the store. The store is only used on a single
+    worker thread, so the event loop never waits on the disk.
+
+    :param backend: Which score store to use, one of `scores.BACKENDS`.
+    :param path: Path of the score file.
+    :param page_size: Number of scores on each leaderboard page.
+    :param max_pages: Number of pages that can be asked for.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        path: str,
+        page_size: int = 10,
+        max_pages: int = 100
+    ):
+        self.backend = backend
+        self.path = path
+        self.page_size = page_size
+        self.max_pages = max_pages
+
+        self.views: dict[int, list[ScoreRecord]] = {}
+        """The best scores, for each number of scores that has been asked
+        for since the last scores were added."""
+        self.server: asyncio.Server | None = None
+        """The running server."""
+
+        self._generation = 0
+        """Number of times scores have been added. A view is only cached if no
+        scores were added while it was read."""
+        self._executor = ThreadPoolExecutor(1, "leaderboard")
+        self._store: ScoreStore | None = None
+
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        """Start listening for requests.
+
+        :param host: Address to listen on. Defaults to loopback only.
+        :param port: Port to listen on. 0 picks a free port.
+
+        :return: The port being listened on.
+        """
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+
+    async def close(self):
+        """Stop listening, then close the store once the worker is idle."""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        await self._run(self._close_store)
+        self._executor.shutdown(wait=True)
+
+
+    async def top(self, count: int) -> list[ScoreRecord]:
+        """Get the best scores, from the cache if they've been read since the
+        last scores were added.
+
+        :param count: Number of scores to get.
+
+        :return: The best records, highest score first.
+        """
+        view = self.views.get(count)
+        if view is None:
+            generation = self._generation
+            view = await self._run(lambda: self._open().top(count))
+            if generation == self._generation:
+                self.views[count] = view
+        return view
+
+
+    async def add(self, records: list[ScoreRecord]):
+        """Add scores to the store, and clear the cached views.
+
+        :param records: The records to add.
+        """
+        # views read from now on are read after the new scores are added
+        self._generation += 1
+        self.views.clear()
+        await self._run(lambda: self._add_all(records))
+
+
+    async def page(self, number: int) -> list[dict]:
+        """Get a page of the leaderboard.
+
+        :param number: Number of the page, from 1.
+
+        :raises RequestError: If there's no such page.
+
+        :return: The page's leaderboard entries.
+        """
+        if not 1 <= number <= self.max_pages:
+            raise RequestError(404, f"pages go from 1 to {self.max_pages}")
+
+        start = (number - 1) * self.page_size
+        best = await self.top(number * self.page_size)
+        return [
+            record_to_json(record, start + num + 1)
+            for num, record in enumerate(best[start:])
+        ]
+
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ):
+        """Answer a single request, then close the connection.
+
+        :param reader: The connection's input.
+        :param writer: The connection's output.
+        """
+        try:
+            try:
+                status, body = await self._respond(reader)
+            except RequestError as err:
+                status, body = err.status, {"error": str(err)}
+            except (ValueError, asyncio.IncompleteReadError):
+                status, body = 400, {"error": "malformed request"}
+            except Exception: #pylint: disable=broad-exception-caught
+                # still answer if the store fails
+                status, body = 500, {"error": "the scores couldn't be stored"}
+
+            data = json.dumps(body).encode("UTF-8")
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n".encode("ascii") + data
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+    async def _respond(self, reader: asyncio.StreamReader) -> tuple[int, object]:
+        """Read a request and work out the response.
+
+        :param reader: The connection's input.
+
+        :raises RequestError: If the request can't be answered.
+
+        :return: The status code, and the body to send as JSON.
+        """
+        method, target, _ = (await reader.readline()).decode("ascii").split(" ", 2)
+
+        length = 0
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        if length > MAX_BODY:
+            raise RequestError(413, f"bodies are limited to {MAX_BODY} bytes")
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        if url.path == "/leaderboard":
+            if method != "GET":
+                raise RequestError(405, "use GET for the leaderboard")
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            return 200, {"page": page, "scores": await self.page(page)}
+
+        if url.path == "/scores":
+            if method != "POST":
+                raise RequestError(405, "use POST to submit scores")
+            entries = json.loads(body or b"null")
+            if not isinstance(entries, list):
+                raise RequestError(400, "submit a list of records")
+            # check every record before adding any, so a bad record doesn't
+            # leave half of the batch added
+            records = [record_from_json(entry) for entry in entries]
+            await self.add(records)
+            return 200, {"added": len(records)}
+
+        raise RequestError(404, f"{url.path} not found")
+
+
+    async def _run(self, function):
+        """Run a function on the store's worker thread.
+
+        :param function: The function to run.
+
+        :return: What the function returned.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            function
+        )
+
+
+    def _open(self) -> ScoreStore:
+        """Open the store, creating its directory if needed. Only called on
+        the worker thread.
+
+        :return: The store.
+        """
+        if self._store is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # the text store's compaction keeps `max_records` scores, so it
+            # has to keep every score a page can show
+            self._store = open_store(
+                self.backend,
+                self.path,
+                self.page_size * self.max_pages
+            )
+        return self._store
+
+
+    def _add_all(self, records: list[ScoreRecord]):
+        """Add records to the store. Only called on the worker thread.
+
+        :param records: The records to add.
+        """
+        store = self._open()
+        for record in records:
+            store.add(record)
+
+
+    def _close_store(self):
+        """Close the store if it has a connection. Only called on the worker
+        thread.
+        """
+        close = getattr(self._store, "close", None)
+        if close is not None:
+            close()
+        self._store = None
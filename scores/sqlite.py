@@ -0,0 +1,137 @@
+"""SQLite score store, for machines shared by many players."""
+
+import sqlite3
+
+from scores.record import ScoreRecord
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    game_id TEXT UNIQUE,
+    player TEXT NOT NULL DEFAULT '',
+    score INTEGER NOT NULL,
+    ticks INTEGER NOT NULL DEFAULT 0,
+    width INTEGER NOT NULL DEFAULT 0,
+    height INTEGER NOT NULL DEFAULT 0,
+    timestamp REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS games_by_score
+    ON games (score DESC, timestamp);
+CREATE INDEX IF NOT EXISTS games_by_player_score
+    ON games (player, score DESC, timestamp);
+CREATE INDEX IF NOT EXISTS games_by_timestamp
+    ON games (timestamp DESC);
+"""
+"""Tables and indexes. Each query below is answered by walking the start of
+one index, so it stays fast however many games are stored."""
+
+COLUMNS = "score, timestamp, coalesce(game_id, ''), player, ticks, width, height"
+"""Columns selected for a `ScoreRecord`, in field order."""
+
+
+class SqliteStore:
+    """Stores every game in an SQLite database, with the player, the number of
+    ticks and the board size. Game IDs are unique, so adding the same game
+    twice only stores it once.
+
+    :param path: Path of the database file.
+    :param max_records: Default number of scores returned by `top`.
+    """
+
+    def __init__(self, path: str, max_records: int = 10):
+        self.path = path
+        self.max_records = max_records
+
+        self.connection = sqlite3.connect(path, timeout=10)
+        """Connection to the database."""
+        # readers don't block the writer, or each other
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+
+    def add(self, record: ScoreRecord):
+        """Store a game's record.
+
+        :param record: The record to add.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO games "
+                "(score, timestamp, game_id, player, ticks, width, height) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.score,
+                    record.timestamp,
+                    record.game_id or None,
+                    record.player,
+                    record.ticks,
+                    record.width,
+                    record.height
+                )
+            )
+
+
+    def top(self, count: int | None = None) -> list[ScoreRecord]:
+        """Get the best scores of all players.
+
+        :param count: Number of scores to get. Defaults to `max_records`.
+
+        :return: The best records, highest score first.
+        """
+        return self._query(
+            f"SELECT {COLUMNS} FROM games "
+            "ORDER BY score DESC, timestamp LIMIT ?",
+            (self.max_records if count is None else count,)
+        )
+
+
+    def top_for_player(
+        self,
+        player: str,
+        count: int | None = None
+    ) -> list[ScoreRecord]:
+        """Get the best scores of a single player.
+
+        :param player: The player's name.
+        :param count: Number of scores to get. Defaults to `max_records`.
+
+        :return: The player's best records, highest score first.
+        """
+        return self._query(
+            f"SELECT {COLUMNS} FROM games WHERE player = ? "
+            "ORDER BY score DESC, timestamp LIMIT ?",
+            (player, self.max_records if count is None else count)
+        )
+
+
+    def recent(self, count: int | None = None) -> list[ScoreRecord]:
+        """Get the most recent games.
+
+        :param count: Number of games to get. Defaults to `max_records`.
+
+        :return: The most recent records, newest first.
+        """
+        return self._query(
+            f"SELECT {COLUMNS} FROM games ORDER BY timestamp DESC LIMIT ?",
+            (self.max_records if count is None else count,)
+        )
+
+
+    def _query(self, query: str, params: tuple) -> list[ScoreRecord]:
+        """Run a query that selects `COLUMNS`.
+
+        :param query: The SQL query.
+        :param params: The query's parameters.
+
+        :return: The records.
+        """
+        return [
+            ScoreRecord(*row)
+            for row in self.connection.execute(query, params)
+        ]
@@ -0,0 +1,226 @@
+"""Per-game statistics, saved in columnar binary batches."""
+
+from array import array
+import itertools
+import operator
+import os
+import struct
+import sys
+import zlib
+
+from scores.locking import locked
+from state.stats import Death, GameStats
+from utils.errors import ScoreFileError
+
+
+COLUMNS = {
+    "ticks": "q",
+    "pellets": "q",
+    "turns": "q",
+    "paused_ns": "q",
+    "death": "B"
+}
+"""Array type code of each column, in the order they're written."""
+
+MAGIC = b"SNKS"
+"""Starts each batch in a stats file."""
+VERSION = 1
+"""Version of the batch format."""
+BATCH = struct.Struct("<4sHHII")
+"""Magic, version, column count, row count, and the CRC32 of the columns."""
+
+MAX_BYTES = 16 << 20
+"""Default size a stats file is rotated at."""
+
+
+def _empty_columns() -> dict[str, array]:
+    """Make a set of empty columns.
+
+    :return: An empty array for each column.
+    """
+    return {name: array(code) for name, code in COLUMNS.items()}
+
+
+class StatsBuffer:
+    """Collects the statistics of finished games, and appends them to a file
+    in batches.
+
+    Each batch stores every column as one packed little-endian array after a
+    short header, so reading millions of games copies each column straight
+    into an array instead of parsing a line per game.
+
+    Once a batch would take the file past `max_bytes`, the file is renamed
+    with a `.1` extension, replacing the one before, and a new file is
+    started. The stats never take more than about twice `max_bytes`.
+
+    :param path: Path of the stats file.
+    :param batch_size: Number of games to buffer before writing a batch.
+    :param max_bytes: Size the file is rotated at.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self.columns = _empty_columns()
+        """Buffered games that haven't been written yet."""
+
+
+    def __len__(self) -> int:
+        """Number of buffered games."""
+        return len(self.columns["ticks"])
+
+
+    def add(self, stats: GameStats):
+        """Buffer a game's statistics, and write the batch if it's full.
+
+        :param stats: The game's statistics.
+        """
+        for name, value in zip(COLUMNS, stats):
+            self.columns[name].append(value)
+
+        if len(self) >= self.batch_size:
+            self.flush()
+
+
+    def flush(self):
+        """Append the buffered games to the file as a batch."""
+        if not self:
+            return
+
+        data = b"".join(
+            _to_little_endian(column).tobytes()
+            for column in self.columns.values()
+        )
+        header = BATCH.pack(MAGIC, VERSION, len(COLUMNS), len(self), zlib.crc32(data))
+
+        with locked(self.path):
+            try:
+                size = os.path.getsize(self.path)
+            except FileNotFoundError:
+                size = 0
+            if size and size + len(header) + len(data) > self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+
+            with open(self.path, "ab") as file:
+                file.write(header + data)
+                file.flush()
+                os.fsync(file.fileno())
+        self.columns = _empty_columns()
+
+
+def read_columns(path: str) -> dict[str, array]:
+    """Read every batch of a stats file into one array per column. A batch
+    cut off at the end of the file, e.g. by a crash, is skipped.
+
+    :param path: Path of the stats file.
+
+    :raises ScoreFileError: If a batch is corrupt, or from an unknown version.
+
+    :return: The columns. Empty if the file doesn't exist.
+    """
+    columns = _empty_columns()
+    try:
+        with open(path, "rb") as file:
+            data = memoryview(file.read())
+    except FileNotFoundError:
+        return columns
+
+    offset = 0
+    while offset + BATCH.size <= len(data):
+        end = _read_batch(path, data, offset, columns)
+        if end is None:
+            break
+        offset = end
+
+    return columns
+
+
+def _read_batch(
+    path: str,
+    data: memoryview,
+    offset: int,
+    columns: dict[str, array]
+) -> int | None:
+    """Read one batch of a stats file onto the end of the columns.
+
+    :param path: Path of the stats file, for errors.
+    :param data: The file's contents.
+    :param offset: Where the batch starts.
+    :param columns: The columns to extend.
+
+    :raises ScoreFileError: If the batch is corrupt, or from an unknown
+        version.
+
+    :return: Where the next batch starts, or None if the batch was cut off.
+    """
+    magic, version, count, rows, checksum = BATCH.unpack_from(data, offset)
+    if magic != MAGIC:
+        raise ScoreFileError(f"{path} has a bad batch at byte {offset}")
+    if version != VERSION or count != len(COLUMNS):
+        raise ScoreFileError(
+            f"{path} has a version {version} batch, expected {VERSION}"
+        )
+
+    start = offset + BATCH.size
+    end = start + rows * sum(column.itemsize for column in columns.values())
+    if end > len(data):
+        return None
+    if zlib.crc32(data[start:end]) != checksum:
+        raise ScoreFileError(f"{path} failed its checksum at byte {offset}")
+
+    for column in columns.values():
+        batch = array(column.typecode)
+        batch.frombytes(data[start:start + rows * column.itemsize])
+        column.extend(_to_little_endian(batch))
+        start += rows * column.itemsize
+    return end
+
+
+def summarize(columns: dict[str, array]) -> dict[str, object]:
+    """Aggregate the statistics of many games.
+
+    :param columns: The columns, as read by `read_columns`.
+
+    :return: The number of games, the mean of each column, the total paused
+        time, the mean ticks per pellet of the games where a pellet was eaten,
+        and the number of games ended by each death.
+    """
+    games = len(columns["ticks"])
+    if not games:
+        return {"games": 0}
+
+    ate = [pellets > 0 for pellets in columns["pellets"]]
+    ticks_per_pellet = list(
+        map(
+            operator.truediv,
+            itertools.compress(columns["ticks"], ate),
+            itertools.compress(columns["pellets"], ate)
+        )
+    )
+    deaths = columns["death"].tobytes()
+
+    return {
+        "games": games,
+        "mean_ticks": sum(columns["ticks"]) / games,
+        "mean_pellets": sum(columns["pellets"]) / games,
+        "mean_turns": sum(columns["turns"]) / games,
+        "paused_seconds": sum(columns["paused_ns"]) / 1e9,
+        "mean_ticks_per_pellet": (
+            sum(ticks_per_pellet) / len(ticks_per_pellet)
+            if ticks_per_pellet else 0.0
+        ),
+        "deaths": {death.name.lower(): deaths.count(death) for death in Death}
+    }
+
+
+def _to_little_endian(column: array) -> array:
+    """Convert a column between native and little-endian byte order.
+
+    :param column: The column.
+
+    :return: The column, swapped in place on big-endian machines.
+    """
+    if sys.byteorder == "big": # pragma: no cover
+        column.byteswap()
+    return column
@@ -0,0 +1,91 @@
+"""Choosing a score store. Each backend is only imported when it's opened, so
+starting the game doesn't wait for backends it won't use.
+"""
+
+import os
+from typing import Protocol
+
+from scores.record import ScoreRecord
+
+
+class ScoreStore(Protocol):
+    """Any of the score stores."""
+
+    def add(self, record: ScoreRecord):
+        """Save a game's record.
+
+        :param record: The record to add.
+        """
+
+
+    def top(self, count: int | None = None) -> list[ScoreRecord]:
+        """Get the best scores.
+
+        :param count: Number of scores to get. Defaults to the store's
+            `max_records`.
+
+        :return: The best records, highest score first.
+        """
+
+FILE_NAMES = {
+    "text": "hiscore.txt",
+    "sqlite": "hiscore.sqlite3",
+    "binary": "hiscore.bin"
+}
+"""Name of the score file in the save directory, for each backend."""
+
+BACKENDS = tuple(FILE_NAMES)
+"""Names of the available backends."""
+
+
+def journal_path(path: str) -> str:
+    """Get the path of the journal kept next to a text score file.
+
+    :param path: Path of the text score file.
+
+    :return: Path of the journal.
+    """
+    return f"{os.path.splitext(path)[0]}.journal"
+
+
+def text_paths(save_dir: str) -> tuple[str, str]:
+    """Get the paths of the text score file and journal in a save directory.
+
+    :param save_dir: The save directory.
+
+    :return: The score file's path, and the journal's path.
+    """
+    snapshot_path = os.path.join(save_dir, FILE_NAMES["text"])
+    return snapshot_path, journal_path(snapshot_path)
+
+
+def open_store(backend: str, path: str, max_records: int = 10) -> ScoreStore:
+    """Open the score store for a backend.
+
+    :param backend: One of `BACKENDS`.
+    :param path: Path of the score file. The text backend keeps its journal
+        next to it, with a `.journal` extension. A new binary file imports the
+        text scores from the same directory, if there are any.
+    :param max_records: Default number of scores returned by `top`.
+
+    :raises ValueError: If the backend isn't recognised.
+
+    :return: The store.
+    """
+    #pylint: disable=import-outside-toplevel
+    if backend == "text":
+        from scores.journal import JournalStore
+        return JournalStore(path, journal_path(path), max_records)
+    if backend == "sqlite":
+        from scores.sqlite import SqliteStore
+        return SqliteStore(path, max_records)
+    if backend == "binary":
+        from scores.binary import BinaryStore
+        store = BinaryStore(path, max_records)
+        if store.is_new():
+            store.import_text(*text_paths(os.path.dirname(path)))
+        return store
+
+    raise ValueError(
+        f"{backend} is not a valid score backend. Must be one of {BACKENDS}"
+    )
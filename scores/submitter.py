@@ -0,0 +1,135 @@
+"""Sending scores to a leaderboard service without holding up the game."""
+
+from collections import deque
+import json
+import threading
+
+from scores.record import ScoreRecord
+
+
+class ScoreSubmitter:
+    """Sends scores to a `LeaderboardService` from a background thread.
+
+    `submit` only queues the record, so the score screen is never held up by
+    the network. The thread sends every queued record in one request, then
+    waits for more. If the service can't be reached, the records stay queued
+    and are sent with the next batch. Only the newest `max_pending` records
+    are kept while the service is down. Records the service refuses as
+    invalid are dropped.
+
+    :param url: Base URL of the service, like `http://127.0.0.1:8080`.
+    :param timeout: Seconds to wait for the service to answer.
+    :param retry_interval: Seconds to wait before sending again after a
+        failure.
+    :param max_pending: Number of unsent records to keep.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 2.0,
+        retry_interval: float = 5.0,
+        max_pending: int = 1000
+    ):
+        self.url = f"{url.rstrip('/')}/scores"
+        self.timeout = timeout
+        self.retry_interval = retry_interval
+
+        self.pending: deque[ScoreRecord] = deque(maxlen=max_pending)
+        """Records that haven't been sent yet."""
+        self.sent = 0
+        """Number of records the service has accepted."""
+        self.rejected = 0
+        """Number of records the service refused, which are dropped."""
+
+        self._wake = threading.Condition()
+        self._closing = False
+        self._thread = threading.Thread(
+            target=self._send_loop,
+            name="score-submitter",
+            daemon=True
+        )
+        self._thread.start()
+
+
+    def submit(self, record: ScoreRecord):
+        """Queue a record to be sent. Returns straight away.
+
+        :param record: The record to send.
+        """
+        with self._wake:
+            self.pending.append(record)
+            self._wake.notify()
+
+
+    def close(self, timeout: float | None = None) -> bool:
+        """Send the queued records, then stop the thread.
+
+        :param timeout: Seconds to wait for the records to be sent. None to
+            wait for the current attempt, however long it takes.
+
+        :return: True if every record was sent, or refused by the service.
+        """
+        with self._wake:
+            self._closing = True
+            self._wake.notify()
+        self._thread.join(timeout)
+        with self._wake:
+            return not self.pending and not self._thread.is_alive()
+
+
+    def _send_loop(self):
+        """Send batches until closed. Runs on the background thread."""
+        # urllib is slow to import, so it's imported here rather than while
+        # the game is starting
+        import urllib.error #pylint: disable=import-outside-toplevel
+
+        while True:
+            with self._wake:
+                while not self.pending and not self._closing:
+                    self._wake.wait()
+                if not self.pending:
+                    return
+                batch = self.pending
+                self.pending = deque(maxlen=batch.maxlen)
+
+            try:
+                self._send(list(batch))
+            except urllib.error.HTTPError as err:
+                # the service refused the batch, so sending it again won't help
+                if err.code < 500:
+                    self.rejected += len(batch)
+                    continue
+            except (OSError, ValueError):
+                pass
+            else:
+                self.sent += len(batch)
+                continue
+
+            with self._wake:
+                # keep the batch in front of anything submitted while sending
+                batch.extend(self.pending)
+                self.pending = batch
+                if self._closing:
+                    return
+                self._wake.wait(self.retry_interval)
+
+
+    def _send(self, batch: list[ScoreRecord]):
+        """Post a batch of records to the service.
+
+        :param batch: The records to send.
+
+        :raises urllib.error.HTTPError: If the service refuses them.
+        :raises OSError: If the service can't be reached.
+        """
+        import urllib.request #pylint: disable=import-outside-toplevel
+
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps([record._asdict() for record in batch]).encode("UTF-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
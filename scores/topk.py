@@ -0,0 +1,64 @@
+"""Streaming top-K selection over score records."""
+
+import heapq
+from typing import Iterable, Iterator
+
+from scores.record import ScoreRecord, parse_record
+
+
+def top_k(records: Iterable[ScoreRecord], count: int) -> list[ScoreRecord]:
+    """Get the best records from a stream, keeping only the current best in a
+    bounded heap. This takes O(N log K) time and O(K) memory for N records.
+
+    Records are ranked by highest score, then earliest timestamp, then the
+    order they appear in. Records with the same game ID as one already kept are
+    dropped. A duplicate of a record that was pushed out can't get back in,
+    since it can't beat the record that pushed it out.
+
+    :param records: The records to choose from, in any order.
+    :param count: Number of records to keep.
+
+    :return: The best records, highest score first.
+    """
+    if count <= 0:
+        return []
+
+    # the worst kept record is at the top of the heap
+    heap: list[tuple[int, float, int, ScoreRecord]] = []
+    kept_ids: set[str] = set()
+
+    for order, record in enumerate(records):
+        if record.game_id and record.game_id in kept_ids:
+            continue
+
+        entry = (record.score, -record.timestamp, -order, record)
+        if len(heap) < count:
+            heapq.heappush(heap, entry)
+        elif entry[:3] > heap[0][:3]:
+            dropped = heapq.heapreplace(heap, entry)[3]
+            kept_ids.discard(dropped.game_id)
+        else:
+            continue
+
+        if record.game_id:
+            kept_ids.add(record.game_id)
+
+    return [entry[3] for entry in sorted(heap, reverse=True)]
+
+
+def iter_records(path: str) -> Iterator[ScoreRecord]:
+    """Stream the records of a score file a line at a time. A missing file has
+    no records, and malformed lines are skipped.
+
+    :param path: The file to read.
+
+    :return: The records, in file order.
+    """
+    try:
+        with open(path, "rt", encoding="UTF-8") as file:
+            for line in file:
+                record = parse_record(line)
+                if record is not None:
+                    yield record
+    except FileNotFoundError:
+        pass
@@ -1,11 +1,49 @@
-"""The states the game can be in"""
+"""The states the game can be in. Each state is only imported when it's first
+used, so rarely used states don't slow down starting the game.
+"""
 
-from state.game import Game
-from state.hiscore import HighScore
-from state.state_test import StateTest
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from state.game import Game
+    from state.hiscore import HighScore
+    from state.manager import StateManager
+    from state.state_test import StateTest
+
+_MODULES = {
+    "Game": "state.game",
+    "HighScore": "state.hiscore",
+    "StateManager": "state.manager",
+    "StateTest": "state.state_test"
+}
+"""Module each state is defined in."""
 
 __all__ = [
     "Game",
     "HighScore",
+    "StateManager",
     "StateTest"
 ]
+
+
+def __getattr__(name: str) -> type:
+    """Import a state the first time it's used.
+
+    :param name: Name of the state, or of the state manager.
+
+    :raises AttributeError: If there's no state with that name.
+
+    :return: The state's class.
+    """
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_MODULES[name]), name)
+
+
+def __dir__() -> list[str]:
+    """List the states, including the ones that haven't been imported.
+
+    :return: The module's attributes.
+    """
+    return sorted([*globals(), *__all__])
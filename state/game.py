@@ -2,12 +2,26 @@
 
 import curses
 import random
-from entities import Pellet, Facing, Player
+from entities import Pellet, PelletMap, Facing, Player
+from entities.sparse import SparseGrid
+from entities.vacate import VacateGrid
 from state.state import State
+from state.stats import Death, GameStats
+from state.windows import WindowPool
+from utils.clock import Clock
 from utils.curses import printf
+from utils.profiling import FrameProfiler
 
 
-class Game(State):
+SPAWN_ATTEMPTS = 16
+"""Number of random cells tried for a new pellet, when there are many or the
+game is sparse, before listing every free cell."""
+SPARSE_FREE_FRACTION = 0.25
+"""Fraction of the field that must be free for a sparse game to try random
+cells for a new pellet. Below it, random cells are mostly taken, so the free
+cells are listed straight away."""
+
+class Game(State): #pylint: disable=too-many-instance-attributes
     """Core game state. This initializes the field, the snake, the header, etc.
 
     The game ends when the snake has hit a wall or overlapped itself, when the
@@ -17,16 +31,38 @@ class Game(State):
     :param width: Width of the window.
     :param height: Height of the window.
     :param fps: The target number of updates per second.
+    :param profiler: Times each phase of every frame when given.
+    :param clock: The clock frames are timed with. Defaults to the real clock.
+    :param pool: Windows are taken from this pool when given.
+    :param player_type: The class of the snake, e.g. `RunLengthPlayer` for
+        snakes too long to keep a `Segment` for every cell.
+    :param pellet_count: Number of pellets kept on the field at once. With
+        more than one, the snake keeps a `VacateGrid` of the field, so
+        checking a random cell for a new pellet doesn't walk its whole body.
+    :param sparse: Only keep track of the cells the snake and pellets are in,
+        rather than every cell of the field, so huge fields take no more
+        memory or time than small ones until they fill up.
     """
 
-    def __init__(self, width: int, height: int, fps: float):
-        super().__init__(width, height, fps, True)
+    def __init__( #pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        width: int,
+        height: int,
+        fps: float,
+        profiler: FrameProfiler | None = None,
+        clock: Clock | None = None,
+        pool: WindowPool | None = None,
+        player_type: type[Player] = Player,
+        pellet_count: int = 1,
+        sparse: bool = False
+    ):
+        super().__init__(width, height, fps, True, profiler, clock, pool)
 
         self.border = 1
         """Width of the border around the play field."""
         self.header = 1
         """Height of the header with the score readout and help."""
-        self.canvas = curses.newwin(
+        self.canvas = self.new_window(
             height - self.header,
             width,
             self.header,
@@ -35,18 +71,74 @@ class Game(State):
         """Canvas the game field is rendered to."""
         self.windows.append(self.canvas)
 
-        self.player = Player(width // 2, (height - self.header) // 2, 5)
+        self._field_bounds = (0, 0, 0, 0)
+        """Cached left, right, upper, and lower bounds of the playable field.
+        Only recomputed in `layout`."""
+        self.layout()
+
+        self.player = player_type(width // 2, (height - self.header) // 2, 5)
         """Player object for the snake that moves around."""
+        self.sparse = sparse
+        """Whether the snake's cells are kept in a `SparseGrid`."""
+        if sparse:
+            self.player.track(SparseGrid())
+        elif pellet_count > 1:
+            # pellets are placed at random cells, and each try asks if the
+            # snake is in the cell, so that shouldn't walk the whole body
+            self.player.track(VacateGrid(*self._bounds()))
         self.score = 0
         """Number of pellets that the player has picked up."""
+        self.ticks = 0
+        """Number of times the snake has moved."""
 
-        self.pellets: list[Pellet] = []
-        """The pellets currently on the field."""
-        self._new_pellet()
+        self.pellet_count = pellet_count
+        """Number of pellets kept on the field at once."""
+        self.pellet_map = PelletMap()
+        """The pellets currently on the field, by their cell."""
+        self._fill_pellets()
 
         self.paused = False
         """Whether or not the game is paused."""
 
+        self.turns = 0
+        """Number of times the snake has changed direction."""
+        self.paused_ns = 0
+        """Time spent paused before the current pause, in nanoseconds."""
+        self._paused_at = 0
+        """When the current pause started."""
+        self.death = Death.NONE
+        """How the game ended."""
+
+
+    @property
+    def pellets(self) -> list[Pellet]:
+        """The pellets currently on the field. Change them through
+        `pellet_map`, or by setting this to a new list."""
+        return self.pellet_map.pellets
+
+
+    @pellets.setter
+    def pellets(self, pellets: list[Pellet]):
+        self.pellet_map.replace(pellets)
+
+
+    def reset(self):
+        """Start a new game, reusing the windows, the snake and the pellet
+        list.
+        """
+        super().reset()
+
+        self.player.reset(self.width // 2, (self.height - self.header) // 2, 5)
+        self.score = 0
+        self.ticks = 0
+        self.pellet_map.clear()
+        self._fill_pellets()
+
+        self.paused = False
+        self.turns = 0
+        self.paused_ns = 0
+        self.death = Death.NONE
+
 
     def key_pressed(self, key: int):
         """End the game if 'q' is pressed, pauses if 'p' is pressed, and
@@ -55,11 +147,16 @@ class Game(State):
         :param key: The key that has been pressed and needs to be processed.
         """
         if key == ord("q"):
+            self.death = Death.QUIT
             self.end()
             return
 
         if key == ord("p"):
             self.paused = not self.paused
+            if self.paused:
+                self._paused_at = self.clock.now_ns()
+            else:
+                self.paused_ns += self.clock.now_ns() - self._paused_at
 
         # Don't try to turn the snake if the game is paused
         if self.paused:
@@ -84,26 +181,34 @@ class Game(State):
         if self.paused:
             return
 
+        facing = self.player.facing
         self.player.move()
+        self.ticks += 1
+        if self.player.facing != facing:
+            self.turns += 1
 
         # end when the snake is out of bounds, or overlapping itself
         if self.player.check_out_of_bounds(*self._bounds()):
+            self.death = Death.WALL
             self.end()
             return
 
         if self.player.check_body_hit():
+            self.death = Death.BODY
             self.end()
             return
 
-        # consume and generate new pellets
-        for pellet in self.pellets:
-            if self.player.check_pellet(pellet):
-                self.score += 1
-                self.pellets.remove(pellet)
-                self._new_pellet()
+        # consume the pellet under the head, if there is one, and replace it
+        head_x, head_y = next(self.player.cells())
+        pellet = self.pellet_map.at(head_x, head_y)
+        if pellet is not None and self.player.check_pellet(pellet):
+            self.score += 1
+            self.pellet_map.remove_at(head_x, head_y)
+            self._new_pellet()
 
         # end if no pellets could be generated
         if not self.pellets:
+            self.death = Death.FILLED
             self.end()
             return
 
@@ -137,14 +242,27 @@ class Game(State):
                 pellet.draw(self.canvas)
 
 
-    def _bounds(self) -> tuple[int, int, int, int]:
-        """Get the bounds of the playable game field.
+    def stats(self) -> GameStats:
+        """Get the statistics of the game so far. A pause that hasn't ended
+        counts up to now.
 
-        :return: left, right, upper, and lower bounds of the playable field.
+        :return: The statistics.
         """
-        max_y, max_x = self.canvas.getmaxyx()
+        paused_ns = self.paused_ns
+        if self.paused:
+            paused_ns += self.clock.now_ns() - self._paused_at
 
-        return (
+        return GameStats(self.ticks, self.score, self.turns, paused_ns, self.death)
+
+
+    def layout(self):
+        """Fit the canvas under the header, and recompute the bounds of the
+        playable field from its size.
+        """
+        self.canvas.resize(self.height - self.header, self.width)
+
+        max_y, max_x = self.canvas.getmaxyx()
+        self._field_bounds = (
             self.border,
             max_x - self.border,
             self.border,
@@ -152,30 +270,92 @@ class Game(State):
         )
 
 
-    def _new_pellet(self):
+    def _bounds(self) -> tuple[int, int, int, int]:
+        """Get the bounds of the playable game field. These are cached, and
+        only change when the layout is recomputed.
+
+        :return: left, right, upper, and lower bounds of the playable field.
+        """
+        return self._field_bounds
+
+
+    def _fill_pellets(self):
+        """Add pellets until there are `pellet_count`, or the field is full."""
+        while len(self.pellet_map) < self.pellet_count:
+            if not self._new_pellet():
+                return
+
+
+    def _new_pellet(self) -> bool:
         """Adds a new pellet to the game field, if there are unoccupied spaces.
+
+        :return: True if a pellet was added.
         """
         left, right, upper, lower = self._bounds()
 
+        # with many pellets, or a sparse field, a random space is usually
+        # free, which is much quicker than listing them all
+        if self._try_random(left, right, upper, lower):
+            for _ in range(SPAWN_ATTEMPTS):
+                x_pos = random.randrange(left, right)
+                y_pos = random.randrange(upper, lower)
+                if not self._occupied(x_pos, y_pos):
+                    return self.pellet_map.add(Pellet(x_pos, y_pos))
+
         # this is slower than picking a random space and checking if it's
         # valid, but it always results in a valid space, if there is one.
         empty_spaces = [
             (x_pos, y_pos)
             for x_pos in range(left, right)
             for y_pos in range(upper, lower)
-            if not self.player.space_occupied(x_pos, y_pos)
-            if not any(
-                pellet.x_pos == x_pos and pellet.y_pos == y_pos
-                for pellet in self.pellets
-            )
+            if not self._occupied(x_pos, y_pos)
         ]
 
         # don't try to add a pellet if there are no valid spaces
         if not empty_spaces:
-            return
+            return False
 
-        self.pellets.append(
+        return self.pellet_map.add(
             Pellet(
                 *random.choice(empty_spaces)
             )
         )
+
+
+    def _try_random(self, left: int, right: int, upper: int, lower: int) -> bool:
+        """Check if a new pellet should be looked for at random first. A
+        sparse game counts the free cells to decide, as it knows how many
+        cells the snake is in.
+
+        :param left: Position of the leftmost boundary.
+        :param right: Position of the rightmost boundary.
+        :param upper: Position of the uppermost boundary.
+        :param lower: Position of the lowermost boundary.
+
+        :return: True if random cells are likely to be free.
+        """
+        if left >= right or upper >= lower:
+            return False
+
+        if not self.sparse:
+            return self.pellet_count > 1
+
+        area = (right - left) * (lower - upper)
+        free = area - len(self.player.grid) - len(self.pellet_map)
+        return free >= area * SPARSE_FREE_FRACTION
+
+
+    def _occupied(self, x_pos: int, y_pos: int) -> bool:
+        """Check if the snake or a pellet is in a cell. This is a single read
+        when the snake keeps a grid of its cells.
+
+        :param x_pos: X position of the cell.
+        :param y_pos: Y position of the cell.
+
+        :return: True if the cell is taken.
+        """
+        if (x_pos, y_pos) in self.pellet_map:
+            return True
+        if self.player.grid is not None:
+            return self.player.grid.moves_until_free(x_pos, y_pos) > 0
+        return self.player.space_occupied(x_pos, y_pos)
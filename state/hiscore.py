@@ -2,12 +2,24 @@
 historic high scores.
 """
 
+import getpass
 import os
+import time
+from typing import TYPE_CHECKING
+
+from scores import FILE_NAMES, ScoreRecord, ScoreStore, open_store
+from scores.record import new_game_id
 from state.state import State
+from state.windows import WindowPool
+from utils.clock import Clock
 from utils.curses import printf
 
+if TYPE_CHECKING:
+    from scores.background import BackgroundScores, Task
+    from scores.submitter import ScoreSubmitter
+
 
-class HighScore(State):
+class HighScore(State): #pylint: disable=too-many-instance-attributes
     """The high score state.
 
     :param width: Width of the window.
@@ -15,22 +27,40 @@ class HighScore(State):
     :param score: The current score.
     :param dir_name: The name of the directory the high score file should be
         saved to.
+    :param clock: The clock the state's frames are timed with. Defaults to
+        the real clock. Scores are always timestamped with the wall time.
+    :param backend: Which score store to use, one of `scores.BACKENDS`.
+    :param ticks: Number of updates the game lasted, saved with the score.
+    :param background: Loads and saves the scores on a worker thread when
+        given, so the screen is shown without waiting for the disk. The
+        backend and save directory are taken from it instead.
+    :param submitter: Also sends the score to a leaderboard service when
+        given. Sending is queued, so it never holds up the screen.
+    :param pool: Windows are taken from this pool when given.
     """
 
-    def __init__(
+    def __init__( #pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         width: int,
         height: int,
         score: int,
-        save_dir: str | None
+        save_dir: str | None,
+        clock: Clock | None = None,
+        backend: str = "text",
+        ticks: int = 0,
+        background: "BackgroundScores | None" = None,
+        submitter: "ScoreSubmitter | None" = None,
+        pool: WindowPool | None = None
     ):
-        super().__init__(width, height, no_delay=False)
+        super().__init__(width, height, no_delay=False, clock=clock, pool=pool)
 
         self.replay = False
         """True when the game should restart after this screen."""
 
         self.score = score
         """The score from the previous game."""
+        self.ticks = ticks
+        """Number of updates the previous game lasted."""
         self.scores = []
         """The list of high scores."""
         self.max_highscores = 10
@@ -39,14 +69,53 @@ class HighScore(State):
         self.save_dir = save_dir
         """Resolved save directory path."""
         self.file_path = None
-        """Resolved path to the high score file."""
-        self._get_file_path("hiscore.txt")
-        self._get_saved_scores()
+        """Resolved path to the high score snapshot file."""
+        self.backend = backend
+        """Name of the score store's backend."""
+        self.store: ScoreStore | None = None
+        """Store the scores are saved to and read from."""
+
+        self.background = background
+        """Worker that loads and saves the scores, if they're done in the
+        background."""
+        self._loading: "Task[list[ScoreRecord]] | None" = None
+        self._saving: "Task[None] | None" = None
+        self._saved = False
+        """True once the save has finished, and any error has been shown."""
+        self.error: str | None = None
+        """Why the scores couldn't be loaded or saved, if they couldn't."""
+        self.submitter = submitter
+        """Sends the score to a leaderboard service, if there is one."""
+
+        self._show_score()
+
+
+    def reset(self, score: int = 0, ticks: int = 0):
+        """Show the score of another game, reusing the window and the store.
+
+        :param score: The score from the game.
+        :param ticks: Number of updates the game lasted.
+        """
+        super().reset()
+        self.replay = False
+        self.score = score
+        self.ticks = ticks
+        self.scores = []
+        self._loading = None
+        self._saving = None
+        self._saved = False
+        self.error = None
+        self._show_score()
 
-        self.scores.append(score)
 
-        self._sort_scores()
-        self._save_scores()
+    def close(self):
+        """Close the store if it has a connection, and give the window back.
+        """
+        close = getattr(self.store, "close", None)
+        if close is not None:
+            close()
+        self.store = None
+        super().close()
 
 
     def key_pressed(self, key: int):
@@ -62,6 +131,42 @@ class HighScore(State):
             self.end()
 
 
+    def update(self):
+        """When the scores are handled in the background, start saving this
+        game's score once the screen has been shown, and show the saved scores
+        once they've loaded. If loading or saving fails, say why.
+        """
+        if self.background is None:
+            return
+
+        if self._saving is None:
+            record = self._record()
+            self._submit(record)
+            self._saving = self.background.save(record)
+
+        if self._loading is not None and self._loading.done():
+            error = self._loading.exception()
+            if error is None:
+                self.scores = [
+                    record.score for record in self._loading.result()
+                ]
+                self.scores.append(self.score)
+                self._sort_scores()
+            else:
+                self.error = f"Unable to load scores: {error}"
+            self._loading = None
+
+        if not self._saved and self._saving.done():
+            error = self._saving.exception()
+            if error is not None:
+                self.error = f"Unable to save this score: {error}"
+            self._saved = True
+
+        # stop redrawing once there's nothing left to wait for
+        if self._loading is None and self._saved:
+            self.window.timeout(-1)
+
+
     def draw(self):
         """Draw the high score screen."""
 
@@ -75,6 +180,8 @@ class HighScore(State):
                 self.width,
                 "left"
             )
+        elif self.error is not None:
+            printf(self.window, self.error, 0, 0, self.width, "left")
 
         printf(
             self.window,
@@ -106,34 +213,91 @@ class HighScore(State):
             )
 
 
+    def _show_score(self):
+        """Add this game's score to the high scores, and save it. In the
+        background, this only starts loading the scores; the score is saved
+        once the screen is shown.
+        """
+        if self.background is not None:
+            self.file_path = self.background.path
+            self.scores.append(self.score)
+            self._loading = self.background.take_loaded()
+            # redraw while the scores load, rather than waiting for a key
+            self.window.timeout(100)
+            return
+
+        if self.store is None:
+            self._get_file_path(FILE_NAMES[self.backend])
+        self._get_saved_scores()
+
+        self.scores.append(self.score)
+
+        self._sort_scores()
+        self._save_scores()
+
+
     def _get_saved_scores(self):
-        """Read the high scores from the high score file."""
+        """Read the high scores from the snapshot and the journal."""
         # don't operate on a file if the save folder isn't found.
-        if self.file_path is None:
+        if self.store is None:
             return
 
-        with open(self.file_path, "rt", encoding="UTF-8") as file:
-            self.scores = [
-                int(line)
-                for line in file.readlines()
-            ]
+        self.scores = [
+            record.score
+            for record in self.store.top(self.max_highscores)
+        ]
 
 
     def _save_scores(self):
-        """Save the high scores back to the file."""
-        if self.file_path is None:
+        """Add this game's score to the store, and queue it for the
+        leaderboard service. For the text store, this is appended to the
+        journal, and the snapshot of the best scores is only
+        rewritten when the journal is compacted.
+        """
+        record = self._record()
+        self._submit(record)
+        if self.store is None:
             return
 
-        with open(self.file_path, "wt", encoding="UTF-8") as file:
-            file.writelines(
-                f"{score}\n"
-                for score in self.scores
-            )
+        self.store.add(record)
+
+
+    def _submit(self, record: ScoreRecord):
+        """Queue this game's record to be sent to the leaderboard service.
+
+        :param record: The record to send.
+        """
+        if self.submitter is not None:
+            self.submitter.submit(record)
+
+
+    def _record(self) -> ScoreRecord:
+        """Make the record of this game.
+
+        :return: The record, timestamped with the wall time. Not the state's
+            clock, which might be virtual.
+        """
+        try:
+            player = getpass.getuser()
+        except (OSError, KeyError):
+            # no login name, e.g. in a container without USER set
+            player = ""
+        return ScoreRecord(
+            self.score,
+            time.time(),
+            new_game_id(),
+            player,
+            self.ticks,
+            self.width,
+            self.height
+        )
 
 
     def _get_file_path(self, file_path: str):
         """Get the path of the file to save the high scores to, and create it
-        if it doesn't exist.
+        if it doesn't exist. Then open the store for it. The text store's
+        journal is kept next to it, with the same name and a `.journal`
+        extension.
         """
         if self.save_dir is None:
             return
@@ -146,6 +310,8 @@ class HighScore(State):
             with open(self.file_path, "wt", encoding="UTF-8"):
                 pass
 
+        self.store = open_store(self.backend, self.file_path, self.max_highscores)
+
 
     def _sort_scores(self):
         """Sort the scores in descending order, and only keep the maximum
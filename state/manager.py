@@ -0,0 +1,155 @@
+"""Runs the states of a session, reusing them from one game to the next."""
+
+from typing import TYPE_CHECKING
+
+from state.game import Game
+from state.hiscore import HighScore
+from state.windows import WindowPool
+from utils.clock import Clock
+from utils.profiling import FrameProfiler
+
+if TYPE_CHECKING:
+    from scores.background import BackgroundScores
+    from scores.stats import StatsBuffer
+    from scores.submitter import ScoreSubmitter
+
+
+class StateManager: #pylint: disable=too-many-instance-attributes
+    """Owns the game and high score states, and the pool their windows come
+    from, for a whole session.
+
+    Each state is made the first time it's needed, and reset for every replay
+    after that, so going from one screen to the next doesn't make new windows,
+    snakes or pellet lists. While a game is played, the high scores for the
+    screen after it are loaded in the background.
+
+    :param width: Width of the game window.
+    :param height: Height of the game window.
+    :param save_dir: Directory the scores are saved to. None if there isn't
+        one.
+    :param backend: Which score store to use, one of `scores.BACKENDS`.
+    :param background: Loads and saves the scores on a worker thread when
+        given.
+    :param stats: Collects the statistics of each game when given.
+    :param submitter: Also sends the scores to a leaderboard service when
+        given.
+    :param profiler: Times the frames of each game when given.
+    :param clock: The clock the states are timed with. Defaults to the real
+        clock.
+    :param pellet_count: Number of pellets kept on the field at once.
+    :param sparse: Whether the games only keep track of the occupied cells.
+    """
+
+    def __init__( #pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        width: int,
+        height: int,
+        save_dir: str | None = None,
+        backend: str = "text",
+        background: "BackgroundScores | None" = None,
+        stats: "StatsBuffer | None" = None,
+        submitter: "ScoreSubmitter | None" = None,
+        profiler: FrameProfiler | None = None,
+        clock: Clock | None = None,
+        pellet_count: int = 1,
+        sparse: bool = False
+    ):
+        self.width = width
+        self.height = height
+        self.save_dir = save_dir
+        self.backend = backend
+        self.background = background
+        self.stats = stats
+        self.submitter = submitter
+        self.profiler = profiler
+        self.clock = clock
+        self.pellet_count = pellet_count
+        self.sparse = sparse
+
+        self.pool = WindowPool()
+        """Windows shared by the states."""
+        self.game: Game | None = None
+        """The game state, once it's been made."""
+        self.high_score: HighScore | None = None
+        """The high score state, once it's been made."""
+
+
+    def play(self):
+        """Play games until the player quits from the high score screen."""
+        replay = True
+        while replay:
+            self.preload()
+
+            game = self.next_game()
+            game.run()
+            if self.stats is not None:
+                self.stats.add(game.stats())
+
+            high_score = self.next_high_score(game.score, game.ticks)
+            high_score.run()
+            replay = high_score.replay
+
+
+    def preload(self):
+        """Start loading the high scores for the screen after the next game,
+        if they're loaded in the background.
+        """
+        if self.background is not None:
+            self.background.preload()
+
+
+    def next_game(self) -> Game:
+        """Get the game state, ready for a new game.
+
+        :return: The game state.
+        """
+        if self.game is None:
+            self.game = Game(
+                self.width,
+                self.height,
+                10,
+                self.profiler,
+                self.clock,
+                self.pool,
+                pellet_count=self.pellet_count,
+                sparse=self.sparse
+            )
+        else:
+            self.game.reset()
+        return self.game
+
+
+    def next_high_score(self, score: int, ticks: int) -> HighScore:
+        """Get the high score state, showing a game's score.
+
+        :param score: The game's score.
+        :param ticks: Number of updates the game lasted.
+
+        :return: The high score state.
+        """
+        if self.high_score is None:
+            self.high_score = HighScore(
+                self.width,
+                self.height,
+                score,
+                self.save_dir,
+                self.clock,
+                self.backend,
+                ticks,
+                self.background,
+                self.submitter,
+                self.pool
+            )
+        else:
+            self.high_score.reset(score, ticks)
+        return self.high_score
+
+
+    def close(self):
+        """Close the states, giving their windows back to the pool."""
+        if self.game is not None:
+            self.game.close()
+            self.game = None
+        if self.high_score is not None:
+            self.high_score.close()
+            self.high_score = None
@@ -3,27 +3,45 @@
 import curses
 import time
 
+from state.windows import WindowPool
+from utils.clock import Clock
 from utils.curses import printf
+from utils.profiling import FrameProfiler
 
 
-class State:
+class State: #pylint: disable=too-many-instance-attributes
     """Base class for game states. This has the base functionality needed for
     control flow etc.
 
+    Screen geometry is computed once, in :meth:`layout`, and cached. It is only
+    recomputed when a resize is signalled with :meth:`notify_resize`.
+
     :param width: Width of the window.
     :param height: Height of the window.
     :param fps: Number of frames per second in no-delay mode. Ignored
         otherwise.
     :param no_delay: Whether to enable no-delay mode in curses. in no-delay
         mode, 0+ keys can be pressed per update, and updates happen on a timer.
+    :param profiler: Times each phase of every frame when given. The loop
+        isn't instrumented at all otherwise.
+    :param clock: The clock frames are timed with. Defaults to the real clock;
+        a `VirtualClock` makes the loop run as fast as possible.
+    :param pool: Windows are taken from this pool when given, and given back
+        by `close`. Otherwise new windows are made.
     """
 
-    def __init__(
+    active: "State | None" = None
+    """The state whose loop is currently running, if any."""
+
+    def __init__( #pylint: disable=too-many-arguments,too-many-positional-arguments
         self,
         width: int,
         height: int,
         fps: float = 10,
-        no_delay: bool = True
+        no_delay: bool = True,
+        profiler: FrameProfiler | None = None,
+        clock: Clock | None = None,
+        pool: WindowPool | None = None
     ):
         # window properties
         self.width = width
@@ -31,19 +49,85 @@ class State:
         self.no_delay = no_delay
 
         # curses windows
-        self.window = curses.newwin(height, width)
+        self.pool = pool
+        self.window = self.new_window(height, width)
         self.window.keypad(True)
-        if no_delay:
-            self.window.nodelay(True)
+        # a pooled window keeps the mode its last state left it in
+        self.window.nodelay(no_delay)
         self.windows = [self.window]
 
         # input and control flow
         self.done = False
         self._keys_pressed = []
 
+        # frame timing instrumentation, off when None
+        self.profiler = profiler
+
+        # geometry is recomputed at the start of the next frame when set
+        self._relayout_pending = False
+
         # time and frame information
+        self.clock = clock if clock is not None else Clock()
         self.__frame_time = int(1_000_000_000 // fps)
-        self.__last_frame = time.time_ns()
+        self.__last_frame = self.clock.now_ns()
+
+
+    def new_window(
+        self,
+        height: int,
+        width: int,
+        begin_y: int = 0,
+        begin_x: int = 0
+    ) -> curses.window:
+        """Make a window for this state, from the pool if there is one. Add it
+        to `windows` to have it drawn and given back by `close`.
+
+        :param height: Height of the window.
+        :param width: Width of the window.
+        :param begin_y: Row of the window's top edge.
+        :param begin_x: Column of the window's left edge.
+
+        :return: The window.
+        """
+        if self.pool is not None:
+            return self.pool.acquire(height, width, begin_y, begin_x)
+        return curses.newwin(height, width, begin_y, begin_x)
+
+
+    def reset(self):
+        """Get ready to run again, keeping the windows. The layout is
+        recomputed, in case the terminal was resized while another state was
+        running. States with more to reset should extend this.
+        """
+        self.done = False
+        del self._keys_pressed[:]
+        self.relayout()
+        self.__last_frame = self.clock.now_ns()
+
+
+    def close(self):
+        """Give the windows back to the pool. The state can't be run after
+        this.
+        """
+        if self.pool is not None:
+            for window in self.windows:
+                self.pool.release(window)
+        self.windows = []
+
+
+    @classmethod
+    def notify_resize(cls):
+        """Signal that the terminal has been resized. The running state will
+        recompute its layout before its next update. This only sets a flag, so
+        it is safe to call from a signal handler.
+        """
+        if cls.active is not None:
+            cls.active.request_relayout()
+
+
+    def request_relayout(self):
+        """Recompute the layout at the start of the next frame."""
+        self._relayout_pending = True
 
 
     def run(self):
@@ -52,6 +136,11 @@ class State:
         """
 
         self.done = False
+        State.active = self
+
+        if self.profiler is not None:
+            self._run_profiled(self.profiler)
+            return
 
         # Render a frame before any inputs. Otherwise, delay mode won't render any frames
         self._frame()
@@ -59,9 +148,62 @@ class State:
             self._scankeys()
             for key in self._keys_pressed:
                 self.key_pressed(key)
+            if self._relayout_pending:
+                self.relayout()
             self.update()
             self._frame()
 
+        if State.active is self:
+            State.active = None
+
+
+    def _run_profiled(self, profiler: FrameProfiler):
+        """The same loop as `run`, timing each phase of every frame.
+
+        :param profiler: The profiler to record the timings to.
+        """
+        clock = time.perf_counter_ns
+
+        self._frame()
+        while not self.done:
+            start = clock()
+            self._scankeys()
+            if profiler.toggle_key in self._keys_pressed:
+                profiler.toggle_hud()
+                self._keys_pressed[:] = [
+                    key for key in self._keys_pressed
+                    if key != profiler.toggle_key
+                ]
+            scanned = clock()
+            for key in self._keys_pressed:
+                self.key_pressed(key)
+            pressed = clock()
+            if self._relayout_pending:
+                self.relayout()
+            self.update()
+            updated = clock()
+
+            self._preframe()
+            self.draw()
+            if profiler.show_hud:
+                # the last window is refreshed last, so nothing covers it
+                profiler.draw_hud(self.windows[-1])
+            drawn = clock()
+            self._present()
+            presented = clock()
+            self._wait()
+            slept = clock()
+
+            profiler.record("scankeys", scanned - start)
+            profiler.record("key_pressed", pressed - scanned)
+            profiler.record("update", updated - pressed)
+            profiler.record("draw", drawn - updated)
+            profiler.record("refresh", presented - drawn)
+            profiler.record("sleep", slept - presented)
+
+        if State.active is self:
+            State.active = None
+
 
     def key_pressed(self, key: int):
         """Default function when keys are pressed. Press 'q' to quit."""
@@ -88,6 +230,22 @@ class State:
         )
 
 
+    def relayout(self):
+        """Resize every window back to its place in the layout, then recompute
+        the cached geometry.
+        """
+        self._relayout_pending = False
+        self.window.resize(self.height, self.width)
+        self.layout()
+
+
+    def layout(self):
+        """Compute and cache any geometry derived from the window sizes. This
+        is a placeholder; states with extra windows or cached bounds should
+        resize and recompute them here.
+        """
+
+
     def end(self):
         """End the game loop on the next iteration."""
         self.done = True
@@ -139,13 +297,24 @@ class State:
         """Layers the buffered frames onto the output and display it. In
         nodelay mode, wait until it's time for the next frame to be drawn.
         """
+        self._present()
+        self._wait()
+
+
+    def _present(self):
+        """Layers the buffered frames onto the output and display it."""
         for window in self.windows:
             window.noutrefresh()
         curses.doupdate()
 
+
+    def _wait(self):
+        """In nodelay mode, wait until it's time for the next frame to be
+        drawn.
+        """
         if self.no_delay:
             expected_frame = self.__last_frame + self.__frame_time
-            naptime = (expected_frame - time.time_ns()) // 1_000_000 # ns to ms
+            naptime = (expected_frame - self.clock.now_ns()) // 1_000_000 # ns to ms
             if naptime > 0:
-                curses.napms(naptime)
-            self.__last_frame = time.time_ns()
+                self.clock.sleep_ms(naptime)
+            self.__last_frame = self.clock.now_ns()
@@ -0,0 +1,41 @@
+"""How a game went, recorded by the game and saved by the scores package."""
+
+from enum import IntEnum
+from typing import NamedTuple
+
+
+class Death(IntEnum):
+    """How a game ended."""
+
+    NONE = 0
+    """The game hasn't ended."""
+    QUIT = 1
+    """The player quit."""
+    WALL = 2
+    """The snake ran into the wall."""
+    BODY = 3
+    """The snake ran into itself."""
+    FILLED = 4
+    """The snake filled the field, so no more pellets could be placed."""
+
+
+class GameStats(NamedTuple):
+    """Statistics of one finished game."""
+
+    ticks: int
+    """Number of times the snake moved."""
+    pellets: int
+    """Number of pellets eaten."""
+    turns: int
+    """Number of times the snake changed direction."""
+    paused_ns: int
+    """Time spent paused, in nanoseconds."""
+    death: Death
+    """How the game ended."""
+
+
+    @property
+    def ticks_per_pellet(self) -> float:
+        """Mean number of ticks taken to reach each pellet. 0 if none were
+        eaten."""
+        return self.ticks / self.pellets if self.pellets else 0.0
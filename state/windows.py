@@ -0,0 +1,54 @@
+"""Pool of curses windows shared by the states."""
+
+import curses
+
+
+class WindowPool:
+    """Keeps the windows of closed states, so the next state with a window at
+    the same place and size reuses it instead of making a new one.
+
+    A reused window keeps whatever modes its last owner set, so owners should
+    set the modes they need, like `nodelay`, whenever they take a window.
+    """
+
+    def __init__(self):
+        self.free: dict[tuple[int, int, int, int], list[curses.window]] = {}
+        """Unused windows, by height, width, top and left."""
+        self.created = 0
+        """Number of windows the pool has had to make."""
+
+
+    def acquire(
+        self,
+        height: int,
+        width: int,
+        begin_y: int = 0,
+        begin_x: int = 0
+    ) -> curses.window:
+        """Take a window, reusing a free one when there is one.
+
+        :param height: Height of the window.
+        :param width: Width of the window.
+        :param begin_y: Row of the window's top edge.
+        :param begin_x: Column of the window's left edge.
+
+        :return: The window, cleared.
+        """
+        free = self.free.get((height, width, begin_y, begin_x))
+        if free:
+            window = free.pop()
+            window.clear()
+            return window
+
+        self.created += 1
+        return curses.newwin(height, width, begin_y, begin_x)
+
+
+    def release(self, window: curses.window):
+        """Give a window back to the pool, for the next state to use.
+
+        :param window: The window. It shouldn't be used after this.
+        """
+        height, width = window.getmaxyx()
+        begin_y, begin_x = window.getbegyx()
+        self.free.setdefault((height, width, begin_y, begin_x), []).append(window)
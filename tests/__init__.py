@@ -2,6 +2,7 @@
 
 import curses
 import signal
+import socket
 import threading
 import time
 from contextlib import contextmanager
@@ -50,6 +51,31 @@ class MockWindow: #pylint: disable=too-few-public-methods
                 setattr(self, attr, getattr(window, attr))
 
 
+class ScriptedWindow(MockWindow): #pylint: disable=too-few-public-methods
+    """Window whose key presses are read from a script instead of the keyboard.
+    Once the script runs out, every other call returns the last key, so a state
+    that ends on a key ends even if it's scanned more often than expected.
+    Only -1 stops a no-delay scan, so the calls in between return it.
+
+    :param window: The window to pass everything else through to.
+    :param keys: The values getch returns, in order. -1 is no key.
+    """
+
+    def __init__(self, window, keys: list[int]) -> None:
+        super().__init__(window)
+        self.keys = keys
+        self.calls = 0
+
+
+    def getch(self) -> int:
+        """Return the next scripted key."""
+        self.calls += 1
+        overflow = self.calls - len(self.keys)
+        if overflow <= 0:
+            return self.keys[self.calls - 1]
+        return self.keys[-1] if overflow % 2 else -1
+
+
 def window_to_list(window: curses.window, no_chr: bool = False) -> list[list[str | int]]:
     """Convert the window object to a list of lists of strings"""
     border_chr_map = {
@@ -78,3 +104,29 @@ def window_to_list(window: curses.window, no_chr: bool = False) -> list[list[str
         ]
         for y in range(max_y)
     ]
+
+
+def compose(windows: list[curses.window], height: int, width: int) -> list[str]:
+    """Layer windows onto a screen in the order they're refreshed, the way
+    `State` presents them.
+
+    :param windows: The windows, bottom first.
+    :param height: Height of the screen.
+    :param width: Width of the screen.
+
+    :return: Each row of the screen.
+    """
+    screen = curses.newwin(height, width, 0, 0)
+    for window in windows:
+        window.overwrite(screen)
+    return ["".join(row) for row in window_to_list(screen)]
+
+
+def free_port() -> int:
+    """Find a loopback port nothing is listening on.
+
+    :return: The port.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
@@ -0,0 +1,98 @@
+"""Test the benchmark cases"""
+
+import curses
+import unittest
+
+from benchmarks.cases import (
+    CASES,
+    Case,
+    field,
+    fits,
+    free_rows,
+    laid_out_game,
+    serpentine,
+    sizes
+)
+from benchmarks.harness import measure
+
+
+class TestLayout(unittest.TestCase):
+    """Test laying the snake out on the field"""
+
+    def test_field(self):
+        """The field is inside the border and under the header"""
+        self.assertTupleEqual(field(80, 24), (1, 79, 1, 22))
+
+
+    def test_serpentine(self):
+        """Rows alternate direction, and the head is on the last row"""
+        self.assertListEqual(
+            serpentine(7, 5, 8),
+            [
+                (1, 3),
+                (1, 2), (2, 2), (3, 2),
+                (3, 1), (2, 1), (1, 1)
+            ]
+        )
+        self.assertEqual(free_rows(7, 5, 8), 1)
+
+
+    def test_fits(self):
+        """The snake has to fit in half the field, with free rows below"""
+        self.assertTrue(fits(7, 5, 8))
+        self.assertFalse(fits(8, 5, 8))
+        self.assertFalse(fits(10_000, 80, 24))
+
+
+    def test_sizes(self):
+        """Sizes are filtered by fit and work"""
+        def setup(*_):
+            pass
+
+        self.assertListEqual(
+            sizes(Case("test", setup), (5, 1_000), ((80, 24), (200, 60))),
+            [(5, 80, 24), (5, 200, 60), (1_000, 200, 60)]
+        )
+        self.assertListEqual(
+            sizes(
+                Case("test", setup, max_work=100_000),
+                (5, 1_000),
+                ((80, 24), (200, 60))
+            ),
+            [(5, 80, 24), (5, 200, 60)]
+        )
+        self.assertListEqual(
+            sizes(
+                Case("test", setup, uses_length=False),
+                (5, 1_000),
+                ((80, 24), (200, 60))
+            ),
+            [(5, 80, 24), (5, 200, 60)]
+        )
+
+
+class TestCases(unittest.TestCase):
+    """Run every case once at a small size"""
+
+    def setUp(self):
+        curses.initscr()
+
+
+    def test_laid_out_game(self):
+        """The snake is laid out, and the pellet is out of its way"""
+        game = laid_out_game(10, 20, 10)
+
+        self.assertListEqual(
+            [(segment.x_pos, segment.y_pos) for segment in game.player.segments],
+            serpentine(10, 20, 10)
+        )
+        self.assertEqual(len(game.pellets), 1)
+        self.assertFalse(game.player.space_occupied(18, 7))
+
+
+    def test_run_cases(self):
+        """Every case runs without ending the game or erroring"""
+        for case in CASES:
+            timed = case.setup(10, 20, 10)
+            result = measure(timed.run, timed.reset, timed.batch, min_time=0)
+            self.assertEqual(result["calls"], timed.batch)
@@ -0,0 +1,40 @@
+"""Test the benchmark timing harness"""
+
+import unittest
+
+from benchmarks.harness import measure
+
+
+class TestMeasure(unittest.TestCase):
+    """Test timing functions in rounds"""
+
+    def test_rounds(self):
+        """Reset before every round, and time the batch of calls"""
+        calls = []
+
+        result = measure(
+            lambda: calls.append("run"),
+            lambda: calls.append("reset"),
+            batch=2,
+            min_time=1,
+            max_rounds=3
+        )
+
+        self.assertListEqual(
+            calls,
+            ["reset", "run", "run"] * 3
+        )
+        self.assertEqual(result["calls"], 6)
+        self.assertGreater(result["mean_ns"], 0)
+        self.assertLessEqual(result["best_ns"], result["mean_ns"])
+        self.assertAlmostEqual(result["ops_per_sec"], 1e9 / result["mean_ns"])
+
+
+    def test_at_least_one_round(self):
+        """A single round is timed, even with no time to spend"""
+        calls = []
+
+        result = measure(lambda: calls.append("run"), min_time=0)
+
+        self.assertListEqual(calls, ["run"])
+        self.assertEqual(result["calls"], 1)
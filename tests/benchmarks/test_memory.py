@@ -0,0 +1,51 @@
+"""Test measuring the memory of each snake"""
+
+import unittest
+
+from benchmarks.memory import (
+    BODIES,
+    GRIDS,
+    measure_bodies,
+    measure_grids,
+    retained_bytes
+)
+
+
+class TestMemory(unittest.TestCase):
+    """Test the memory benchmark"""
+
+    def test_retained_bytes(self):
+        """Only what's kept is counted"""
+        kept = retained_bytes(lambda: bytearray(100_000))
+        temporary = retained_bytes(lambda: len(bytearray(100_000)))
+
+        self.assertGreaterEqual(kept, 100_000)
+        self.assertLess(temporary, 1_000)
+
+
+    def test_bodies_smaller(self):
+        """The arrays and runs take far less memory than a segment per cell"""
+        usage = {
+            usage.body: usage
+            for usage in measure_bodies((1_000,), ((200, 60),))
+        }
+
+        self.assertSetEqual(set(usage), set(BODIES))
+        self.assertEqual(usage["runs"].length, 1_000)
+        for body in ("compact", "runs"):
+            self.assertLess(
+                usage[body].bytes_per_segment * 10,
+                usage["segments"].bytes_per_segment
+            )
+
+
+    def test_sparse_grid_smaller(self):
+        """A sparse grid takes memory for the snake, not the field"""
+        usage = {
+            usage.body: usage
+            for usage in measure_grids((1_000,), ((1_000, 1_000),))
+        }
+
+        self.assertSetEqual(set(usage), set(GRIDS))
+        self.assertGreaterEqual(usage["dense"].bytes, 8 * 998 * 996)
+        self.assertLess(usage["sparse"].bytes * 10, usage["dense"].bytes)
@@ -0,0 +1,95 @@
+"""Test running, saving and comparing benchmark results"""
+
+import curses
+import os
+import tempfile
+import unittest
+
+from benchmarks.cases import CASES
+from benchmarks.results import (
+    compare,
+    format_comparison,
+    load,
+    result_key,
+    run_cases,
+    save
+)
+
+
+def make_run(times: dict[str, float]) -> dict:
+    """Make a run with the given best times for the move case"""
+    return {
+        "meta": {},
+        "results": [
+            {
+                "name": "player.move",
+                "params": {"length": length, "width": 80, "height": 24},
+                "best_ns": best_ns
+            }
+            for length, best_ns in times.items()
+        ]
+    }
+
+
+class TestResults(unittest.TestCase):
+    """Test the results of a run"""
+
+    def test_result_key(self):
+        """Keys include the sorted parameters"""
+        self.assertEqual(
+            result_key(make_run({5: 1.0})["results"][0]),
+            "player.move[height=24,length=5,width=80]"
+        )
+
+
+    def test_run_cases(self):
+        """Run the filtered cases, and report each result"""
+        curses.initscr()
+        reported = []
+
+        run = run_cases(
+            CASES,
+            lengths=(5,),
+            boards=((20, 10),),
+            min_time=0,
+            name_filter="player.",
+            progress=reported.append
+        )
+
+        self.assertIn("python", run["meta"])
+        self.assertListEqual(
+            [result["name"] for result in run["results"]],
+            ["player.move", "player.check_body_hit", "player.space_occupied"]
+        )
+        self.assertListEqual(reported, run["results"])
+
+
+    def test_save_load(self):
+        """Results survive a round trip through JSON"""
+        run = make_run({5: 10.0})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "results.json")
+            save(run, path)
+            self.assertDictEqual(load(path), run)
+
+
+    def test_compare(self):
+        """Only shared results are compared, and slow ones are flagged"""
+        baseline = make_run({5: 100.0, 100: 100.0, 1_000: 100.0})
+        current = make_run({5: 105.0, 100: 120.0, 10_000: 1.0})
+
+        rows = compare(baseline, current, threshold=0.1)
+
+        self.assertListEqual(
+            rows,
+            [
+                ("player.move[height=24,length=5,width=80]", 100.0, 105.0, 1.05, False),
+                ("player.move[height=24,length=100,width=80]", 100.0, 120.0, 1.2, True)
+            ]
+        )
+
+        table = format_comparison(rows).split("\n")
+        self.assertEqual(len(table), 3)
+        self.assertFalse(table[1].endswith("REGRESSION"))
+        self.assertTrue(table[2].endswith("REGRESSION"))
@@ -0,0 +1,70 @@
+"""Test timing the game's start-up"""
+
+import unittest
+
+from benchmarks.startup import (
+    ImportTime,
+    imported_modules,
+    parse_importtime,
+    slowest,
+    total_us
+)
+
+
+REPORT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:        40 |         40 |       itertools
+import time:      1500 |       1540 |     enum
+not part of the report
+import time:       900 |       2560 | main
+"""
+
+
+class TestStartup(unittest.TestCase):
+    """Test parsing and measuring import times"""
+
+    def test_parse(self):
+        """Every import is read with its nesting, the header is skipped"""
+        self.assertListEqual(
+            parse_importtime(REPORT),
+            [
+                ImportTime("_io", 120, 120, 1),
+                ImportTime("itertools", 40, 40, 3),
+                ImportTime("enum", 1500, 1540, 2),
+                ImportTime("main", 900, 2560, 0)
+            ]
+        )
+
+
+    def test_totals(self):
+        """Cumulative time of a module, and the slowest imports"""
+        times = parse_importtime(REPORT)
+
+        self.assertEqual(total_us(times, "main"), 2560)
+        self.assertEqual(total_us(times, "missing"), 0)
+        self.assertListEqual(
+            [time.module for time in slowest(times, 2)],
+            ["enum", "main"]
+        )
+
+
+    def test_lazy_imports(self):
+        """Rarely used states and stores aren't imported with the game"""
+        modules = imported_modules("main")
+
+        self.assertIn("state.game", modules)
+        self.assertIn("scores.store", modules)
+        for lazy in [
+            "state.state_test",
+            "scores.sqlite",
+            "scores.binary",
+            "scores.service",
+            "scores.background",
+            "scores.stats",
+            "scores.submitter",
+            "concurrent.futures",
+            "urllib.request",
+            "utils.sampling"
+        ]:
+            self.assertNotIn(lazy, modules)
@@ -0,0 +1,250 @@
+"""Test the bitboard game core"""
+
+import curses
+import random
+import unittest
+
+from engine.bitboard import Bitboard, BitGame, nth_bit
+from entities.pellet import Pellet
+from entities.player import Facing
+from state.game import Game
+from state.stats import Death
+
+
+class TestBitboard(unittest.TestCase):
+    """Test mapping cells to bits"""
+
+    def test_cells(self):
+        """Each row has a spare bit after it"""
+        board = Bitboard(1, 4, 1, 3)
+
+        self.assertEqual(board.cells, 0b0111_0111)
+        self.assertEqual(board.index(1, 1), 0)
+        self.assertEqual(board.index(3, 2), 6)
+        self.assertIsNone(board.index(4, 1))
+        self.assertEqual(board.bit(0, 1), 0)
+        self.assertTupleEqual(board.position(6), (3, 2))
+        self.assertListEqual(
+            list(board.positions(board.cells)),
+            [(1, 1), (2, 1), (3, 1), (1, 2), (2, 2), (3, 2)]
+        )
+
+
+    def test_neighbours(self):
+        """Neighbours don't wrap onto the next row"""
+        board = Bitboard(0, 3, 0, 3)
+
+        self.assertSetEqual(
+            set(board.positions(board.neighbours(board.bit(2, 0)))),
+            {(1, 0), (2, 1)}
+        )
+        self.assertSetEqual(
+            set(board.positions(board.neighbours(board.bit(0, 1)))),
+            {(0, 0), (0, 2), (1, 1)}
+        )
+
+
+    def test_flood(self):
+        """The flood stops at cells that aren't free"""
+        board = Bitboard(0, 5, 0, 3)
+        wall = board.bit(2, 0) | board.bit(2, 1) | board.bit(2, 2)
+        free = board.cells & ~wall
+
+        region = board.flood(board.bit(0, 0), free)
+        self.assertEqual(region.bit_count(), 6)
+        self.assertFalse(region & board.bit(3, 0))
+        self.assertEqual(board.flood(board.bit(2, 0), free), 0)
+
+
+    def test_nth_bit(self):
+        """Set bits are counted from the lowest"""
+        bits = 0b1011_0100
+        self.assertListEqual(
+            [nth_bit(bits, num) for num in range(4)],
+            [2, 4, 5, 7]
+        )
+
+
+class TestBitGame(unittest.TestCase):
+    """Test playing on bitboards"""
+
+    def setUp(self):
+        curses.initscr()
+
+
+    def test_from_game(self):
+        """The game is copied"""
+        game = Game(20, 10, 10)
+        game.pellets = [Pellet(3, 3)]
+        game.player.add_facing_to_buffer(Facing.UP)
+        game.score = 4
+
+        bit_game = BitGame.from_game(game)
+
+        self.assertTupleEqual(bit_game.head(), (10, 4))
+        self.assertEqual(bit_game.body.bit_count(), 5)
+        self.assertTrue(bit_game.occupied(14, 4))
+        self.assertFalse(bit_game.occupied(15, 4))
+        self.assertEqual(bit_game.pellets, bit_game.board.bit(3, 3))
+        self.assertEqual(bit_game.score, 4)
+        bit_game.step()
+        self.assertTupleEqual(bit_game.head(), (10, 3))
+
+
+    def test_layout_off_field(self):
+        """Snakes have to be on the field, and in one piece"""
+        with self.assertRaises(ValueError):
+            BitGame(0, 5, 0, 5).layout([(0, 0), (-1, 0)])
+        with self.assertRaises(ValueError):
+            BitGame(0, 5, 0, 5).layout([(0, 0), (1, 1)])
+
+
+    def test_clone(self):
+        """Playing a clone doesn't change the original"""
+        bit_game = BitGame(0, 8, 0, 8)
+        bit_game.layout([(4, 4), (5, 4), (6, 4), (6, 4)])
+        bit_game.add_pellet(0, 0)
+        bit_game.add_facing_to_buffer(Facing.UP)
+
+        twin = bit_game.clone()
+        self.assertIs(twin.board, bit_game.board)
+        twin.add_facing_to_buffer(Facing.RIGHT)
+        for _ in range(3):
+            twin.step()
+
+        self.assertListEqual(twin.cells(), [(6, 3), (5, 3), (4, 3), (4, 4)])
+        self.assertEqual(twin.ticks, 3)
+        self.assertListEqual(
+            bit_game.cells(),
+            [(4, 4), (5, 4), (6, 4), (6, 4)]
+        )
+        self.assertEqual(bit_game.ticks, 0)
+        bit_game.step()
+        self.assertTupleEqual(bit_game.head(), (4, 3))
+
+
+    def test_clone_rng(self):
+        """Clones place pellets in the same places, without sharing a
+        generator"""
+        bit_game = BitGame(0, 8, 0, 8, random.Random(3))
+        bit_game.layout([(4, 4), (5, 4)])
+        bit_game.add_pellet(3, 4)
+
+        twins = [bit_game.clone(), bit_game.clone()]
+        bit_game.step()
+        for twin in twins:
+            self.assertIsNot(twin.rng, bit_game.rng)
+            twin.step()
+            self.assertEqual(twin.pellets, bit_game.pellets)
+            self.assertEqual(twin.score, 1)
+
+
+    def test_matches_game(self):
+        """Random games play out the same as `Game.update`"""
+        deaths = set()
+        for seed in range(10):
+            with self.subTest(seed=seed):
+                random.seed(seed)
+                game = Game(12, 9, 10, pellet_count=10)
+                bit_game = BitGame.from_game(game, random.Random(seed))
+
+                while not game.done:
+                    # mostly keep off the walls, so the snake gets long
+                    x_pos, y_pos = bit_game.head()
+                    facing = random.choice([
+                        facing for facing in Facing
+                        if bit_game.board.bit(x_pos + facing.x, y_pos + facing.y)
+                    ])
+                    game.player.add_facing_to_buffer(facing)
+                    bit_game.add_facing_to_buffer(facing)
+
+                    game.update()
+                    alive = bit_game.step()
+
+                    self.assertEqual(alive, not game.done)
+                    self.assertEqual(bit_game.death, game.death)
+                    self.assertEqual(bit_game.score, game.score)
+                    if alive:
+                        self.assertEqual(
+                            bit_game.body,
+                            BitGame.from_game(game).body
+                        )
+                        self.assertListEqual(
+                            bit_game.cells(),
+                            list(game.player.cells())
+                        )
+                        # only the body cells behind the head have links
+                        low, high = bit_game.links
+                        self.assertEqual(
+                            (low | high) & ~bit_game.body,
+                            0
+                        )
+                        self.assertEqual((low | high) >> bit_game.head_index & 1, 0)
+                        # pellets are placed by different generators
+                        bit_game.pellets = BitGame.from_game(game).pellets
+                deaths.add(game.death)
+
+        self.assertIn(Death.BODY, deaths)
+
+
+    def test_reachable(self):
+        """Only the free cells on the head's side of the body are counted"""
+        bit_game = BitGame(0, 5, 0, 3)
+        bit_game.layout([(1, 0), (2, 0), (2, 1), (2, 2)])
+
+        self.assertEqual(bit_game.reachable(), 5)
+
+
+    def test_eat_and_fill(self):
+        """Eating the last free cell's pellet ends the game"""
+        bit_game = BitGame(0, 3, 0, 1)
+        bit_game.layout([(1, 0), (2, 0), (2, 0)])
+        bit_game.add_pellet(0, 0)
+
+        self.assertFalse(bit_game.step())
+        self.assertEqual(bit_game.score, 1)
+        self.assertEqual(bit_game.growth, 1)
+        self.assertEqual(bit_game.death, Death.FILLED)
+        self.assertFalse(bit_game.step())
+
+
+    def test_hit(self):
+        """The snake can follow its tail, but not run into its body"""
+        bit_game = BitGame(0, 4, 0, 4)
+        bit_game.layout([(1, 1), (2, 1), (2, 2), (1, 2)])
+        bit_game.add_pellet(3, 3)
+        bit_game.facing = Facing.DOWN
+
+        self.assertTrue(bit_game.step())
+        self.assertTupleEqual(bit_game.head(), (1, 2))
+
+        bit_game.layout([(1, 1), (2, 1), (2, 2), (1, 2), (0, 2)])
+        self.assertFalse(bit_game.step())
+        self.assertEqual(bit_game.death, Death.BODY)
+        self.assertTupleEqual(bit_game.head(), (1, 1))
+
+
+    def test_many_moves(self):
+        """Moving many times at once is the same as moving once at a time,
+        including queued turns, eating and dying"""
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                random.seed(seed)
+                bit_game = BitGame.from_game(
+                    Game(12, 9, 10, pellet_count=10),
+                    random.Random(seed)
+                )
+                rng = random.Random(seed)
+                while not bit_game.death:
+                    for facing in rng.sample(list(Facing), 2):
+                        bit_game.add_facing_to_buffer(facing)
+                    once = bit_game.clone()
+                    moves = rng.randint(1, 6)
+                    for _ in range(moves):
+                        once.step()
+
+                    self.assertEqual(bit_game.step(moves), not once.death)
+                    self.assertDictEqual(
+                        {**bit_game.__dict__, "rng": None},
+                        {**once.__dict__, "rng": None}
+                    )
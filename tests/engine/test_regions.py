@@ -0,0 +1,163 @@
+"""Test keeping the free regions of the field up to date"""
+
+import copy
+import curses
+import random
+import unittest
+
+from engine.bitboard import Bitboard
+from engine.regions import FreeRegions, SafetyGrid, components
+from entities.pellet import Pellet
+from entities.player import Facing, Player
+from state.game import Game
+
+
+def occupancy(board: Bitboard, player: Player) -> int:
+    """Get the cells a snake is in as a bitboard."""
+    bits = 0
+    for x_pos, y_pos in player.cells():
+        bits |= board.bit(x_pos, y_pos)
+    return bits
+
+
+class TestFreeRegions(unittest.TestCase):
+    """Test the regions by themselves"""
+
+    def test_components(self):
+        """Cells split into groups at a wall"""
+        board = Bitboard(0, 5, 0, 3)
+        wall = board.bit(2, 0) | board.bit(2, 1) | board.bit(2, 2)
+
+        groups = components(board, board.cells & ~wall)
+        self.assertListEqual(
+            sorted(group.bit_count() for group in groups),
+            [6, 6]
+        )
+
+
+    def test_fill(self):
+        """Filling a cell only splits its region if it cuts it in two"""
+        board = Bitboard(0, 5, 0, 3)
+        regions = FreeRegions(board, board.bit(2, 0) | board.bit(2, 2))
+        self.assertEqual(len(regions), 1)
+
+        # the corners around the cell join its neighbours
+        regions.fill(board.bit(0, 1))
+        self.assertEqual(len(regions), 1)
+
+        regions.fill(board.bit(2, 1))
+        self.assertEqual(len(regions), 2)
+
+        regions.free(board.bit(2, 1))
+        self.assertEqual(len(regions), 1)
+        self.assertEqual(regions.regions[0].bit_count(), 12)
+
+
+    def test_matches_components(self):
+        """Random fills and frees give the same regions as working them out
+        from scratch"""
+        random.seed(2)
+        board = Bitboard(0, 7, 0, 6)
+        regions = FreeRegions(board)
+        occupied = 0
+
+        for _ in range(2_000):
+            x_pos = random.randrange(7)
+            y_pos = random.randrange(6)
+            bit = board.bit(x_pos, y_pos)
+            if occupied & bit:
+                regions.free(bit)
+            else:
+                regions.fill(bit)
+            occupied ^= bit
+
+            self.assertListEqual(
+                sorted(regions.regions),
+                sorted(components(board, board.cells & ~occupied))
+            )
+
+
+class TestSafetyGrid(unittest.TestCase):
+    """Test answering questions about moves as the snake moves"""
+
+    def setUp(self):
+        curses.initscr()
+
+
+    def test_attach(self):
+        """The grid covers the game's field"""
+        game = Game(12, 9, 10)
+        grid = SafetyGrid.attach(game)
+
+        self.assertIs(game.player.grid, grid)
+        self.assertEqual(len(grid.free_regions), 1)
+        self.assertEqual(grid.reachable(Facing.LEFT), 10 * 6 - 5)
+        self.assertEqual(grid.reachable(Facing.RIGHT), 0)
+        self.assertFalse(grid.splits(Facing.UP))
+
+
+    def test_split(self):
+        """Moving into a gap splits the field"""
+        grid = SafetyGrid(0, 5, 0, 2)
+        grid.layout([(2, 0), (3, 0), (4, 0), (4, 1)])
+
+        # the tail leaves (4, 1) as the head moves down
+        self.assertTrue(grid.splits(Facing.DOWN))
+        self.assertEqual(grid.reachable(Facing.DOWN), 6)
+        self.assertFalse(grid.splits(Facing.LEFT))
+
+
+    def test_matches_flood(self):
+        """Every answer agrees with flooding the field after the move"""
+        split = False
+        for seed in range(10):
+            random.seed(seed)
+            player = Player(5, 3, 4)
+            grid = SafetyGrid(0, 8, 0, 6)
+            player.track(grid)
+            board = grid.board
+
+            while True:
+                for facing in Facing:
+                    future = copy.deepcopy(player)
+                    future.grid = None
+                    future.facing = facing
+                    future.move()
+
+                    expected = []
+                    if not (
+                        future.check_out_of_bounds(0, 8, 0, 6)
+                        or future.check_body_hit()
+                    ):
+                        head = board.bit(*next(future.cells()))
+                        expected = [
+                            region
+                            for region in components(
+                                board,
+                                board.cells & ~occupancy(board, future)
+                            )
+                            if region & board.neighbours(head)
+                        ]
+
+                    self.assertListEqual(
+                        sorted(grid.regions_after(facing)),
+                        sorted(expected)
+                    )
+                    split = split or len(expected) > 1
+
+                safe = [facing for facing in Facing if grid.reachable(facing)]
+                if not safe:
+                    break
+                player.add_facing_to_buffer(random.choice(safe))
+                player.move()
+                if random.random() < 0.3:
+                    player.check_pellet(Pellet(*next(player.cells())))
+                if player.check_body_hit():
+                    break
+
+                self.assertListEqual(
+                    sorted(grid.free_regions.regions),
+                    sorted(components(board, board.cells & ~occupancy(board, player)))
+                )
+
+        self.assertTrue(split)
@@ -0,0 +1,197 @@
+"""Test Zobrist hashing and the small field solver"""
+
+import random
+import unittest
+
+from engine.solver import (
+    OPPOSITES,
+    Entry,
+    Solver,
+    TranspositionTable,
+    ZobristGame,
+    mix
+)
+from entities.player import Facing
+from state.stats import Death
+
+
+def brute_force(game: ZobristGame, depth: int) -> int:
+    """Find the best score within a number of moves by trying every move,
+    without a table or stopping early.
+
+    :param game: The state.
+    :param depth: Number of moves to look ahead.
+
+    :return: The best score.
+    """
+    if depth == 0 or game.death != Death.NONE:
+        return game.score
+
+    best = -1
+    for facing in Facing:
+        if facing is OPPOSITES[game.facing]:
+            continue
+        future = game.clone()
+        future.turn(facing)
+        future.step()
+        best = max(best, brute_force(future, depth - 1))
+    return best
+
+
+def start(seed: int, cells: list[tuple[int, int]]) -> ZobristGame:
+    """Make a 5x5 game with a pellet placed by the seed.
+
+    :param seed: Picks where pellets go.
+    :param cells: The snake, from the head to the tail.
+
+    :return: The game.
+    """
+    game = ZobristGame(0, 5, 0, 5, seed=seed)
+    game.layout(cells)
+    game.spawn_pellet()
+    return game
+
+
+class TestZobristGame(unittest.TestCase):
+    """Test keeping the key up to date"""
+
+    def test_matches_rehash(self):
+        """The key kept up to date as the game is played is the same as the
+        key worked out from scratch"""
+        rng = random.Random(4)
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                game = start(seed, [(2, 1), (1, 1), (1, 1)])
+                key = game.key
+                game.rehash()
+                self.assertEqual(game.key, key)
+                while game.death == Death.NONE:
+                    game.turn(rng.choice(list(Facing)))
+                    game.step()
+                    key = game.key
+                    game.rehash()
+                    self.assertEqual(game.key, key)
+
+
+    def test_transposition(self):
+        """Two orders of moves that end in the same state get the same key,
+        and a different state gets a different key"""
+        first = start(0, [(1, 1)])
+        second = first.clone()
+        third = first.clone()
+        for facing in (Facing.RIGHT, Facing.DOWN, Facing.RIGHT):
+            first.turn(facing)
+            first.step()
+        for facing in (Facing.DOWN, Facing.RIGHT, Facing.RIGHT):
+            second.turn(facing)
+            second.step()
+        for facing in (Facing.RIGHT, Facing.RIGHT, Facing.DOWN):
+            third.turn(facing)
+            third.step()
+
+        self.assertEqual(first.key, second.key)
+        self.assertNotEqual(first.key, third.key)
+
+
+    def test_seed(self):
+        """Games with different seeds never share keys, and place pellets
+        the same way for the same seed and score"""
+        first = start(1, [(1, 1)])
+        second = start(1, [(1, 1)])
+        other = start(2, [(1, 1)])
+
+        self.assertEqual(first.key, second.key)
+        self.assertEqual(first.pellets, second.pellets)
+        self.assertNotEqual(first.key, other.key)
+        self.assertNotEqual(mix(0), mix(1))
+
+
+class TestTranspositionTable(unittest.TestCase):
+    """Test keeping searched states"""
+
+    def test_get(self):
+        """States are found by key and depth"""
+        table = TranspositionTable(4)
+        table.put(Entry(9, 3, 2, Facing.UP, 10))
+
+        self.assertEqual(table.get(9, 3).score, 2)
+        self.assertIsNone(table.get(9, 2))
+        self.assertIsNone(table.get(5, 3))
+        self.assertEqual(table.hits, 1)
+        self.assertEqual(table.lookups, 3)
+
+
+    def test_replacement(self):
+        """The first slot keeps the most work, and the second takes the
+        newest state"""
+        table = TranspositionTable(4)
+        costly = Entry(1, 3, 2, Facing.UP, 100)
+        table.put(costly)
+        table.put(Entry(5, 3, 1, Facing.UP, 10))
+        table.put(Entry(9, 3, 1, Facing.UP, 20))
+
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.get(1, 3), costly)
+        self.assertIsNone(table.get(5, 3))
+        self.assertEqual(table.get(9, 3).work, 20)
+
+        table.put(Entry(13, 3, 1, Facing.UP, 200))
+        self.assertEqual(table.get(13, 3).work, 200)
+        self.assertIsNone(table.get(1, 3))
+
+        table.clear()
+        self.assertEqual(len(table), 0)
+        self.assertEqual(table.lookups, 0)
+
+
+class TestSolver(unittest.TestCase):
+    """Test searching for the best score"""
+
+    def test_matches_brute_force(self):
+        """The best score is the same as trying every move, and the move
+        found reaches it"""
+        for seed in range(4):
+            with self.subTest(seed=seed):
+                game = start(seed, [(2, 2), (1, 2)])
+                solver = Solver(6)
+                found = solver.best(game)
+
+                self.assertEqual(found.score, brute_force(game, 6))
+                future = game.clone()
+                future.turn(found.move)
+                future.step()
+                self.assertEqual(Solver(5).best(future).score, found.score)
+                self.assertGreater(solver.table.hits, 0)
+
+
+    def test_small_table(self):
+        """The best score is the same however few states are kept"""
+        game = start(5, [(2, 2), (1, 2)])
+
+        self.assertEqual(
+            Solver(6, TranspositionTable(1)).best(game).score,
+            Solver(6).best(game).score
+        )
+
+
+    def test_over(self):
+        """There's no move once the game is over"""
+        game = start(0, [(0, 1)])
+        game.turn(Facing.LEFT)
+        game.step()
+
+        found = Solver(3).best(game)
+        self.assertIsNone(found.move)
+        self.assertEqual(found.score, 0)
+
+
+    def test_play(self):
+        """Playing out a game eats pellets, and doesn't change the game
+        played from"""
+        game = start(3, [(2, 2)])
+        key = game.key
+
+        end = Solver(6).play(game, 100)
+        self.assertGreater(end.score, 2)
+        self.assertEqual(game.key, key)
+        self.assertEqual(game.score, 0)
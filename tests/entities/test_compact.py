@@ -0,0 +1,166 @@
+"""Test the snake stored in arrays"""
+
+import curses
+import random
+import unittest
+
+from entities.compact import CompactPlayer, SegmentView
+from entities.pellet import Pellet
+from entities.player import Facing, Player
+from entities.segment import Segment, icon_at
+from tests import window_to_list
+
+
+# we are deliberately accesssing protected members to test their functionality
+#pylint: disable=protected-access
+class TestCompactPlayer(unittest.TestCase):
+    """Test the compact snake against the segment list"""
+
+    def test_creation(self):
+        """Make a snake, with views of its segments"""
+        player = CompactPlayer(3, 3, 3)
+
+        self.assertEqual(player.facing, Facing.LEFT)
+        self.assertEqual(len(player), 3)
+        self.assertEqual(
+            player.segments,
+            [Segment(3, 3), Segment(4, 3), Segment(5, 3)]
+        )
+        self.assertIsInstance(player.head(), SegmentView)
+        self.assertEqual(player.head(), Segment(3, 3))
+        self.assertEqual(player.tail(), Segment(5, 3))
+        self.assertEqual(player.segments[-1], Segment(5, 3))
+        self.assertListEqual(player.segments[1:], [Segment(4, 3), Segment(5, 3)])
+        with self.assertRaises(IndexError):
+            player.segments[3] #pylint: disable=pointless-statement
+
+
+    def test_views(self):
+        """Views follow their place in the snake, and write to the arrays"""
+        player = CompactPlayer(3, 3, 3)
+        head = player.head()
+
+        player.move()
+        self.assertEqual(head, Segment(2, 3))
+
+        head.move(7, 8)
+        self.assertEqual(player.xs[player.start], 7)
+        self.assertEqual(player.ys[player.start], 8)
+        self.assertEqual(head.icon, icon_at(0, player.icon_seed))
+
+
+    def test_growth(self):
+        """New segments go under the tail, and the arrays grow when full"""
+        player = CompactPlayer(5, 5, 2)
+        player.move()
+
+        self.assertFalse(player.check_pellet(Pellet(6, 5)))
+        self.assertTrue(player.check_pellet(Pellet(4, 5)))
+        self.assertTrue(player.check_pellet(Pellet(4, 5)))
+
+        self.assertEqual(
+            player.segments,
+            [Segment(4, 5), Segment(5, 5), Segment(5, 5), Segment(5, 5)]
+        )
+        self.assertEqual(len(player.xs), 4)
+
+        player.move()
+        player.move()
+
+        self.assertEqual(
+            player.segments,
+            [Segment(2, 5), Segment(3, 5), Segment(4, 5), Segment(5, 5)]
+        )
+
+
+    def test_no_random_icons(self):
+        """Only making the snake draws a random number, not each segment"""
+        player = CompactPlayer(5, 5, 1_000)
+        state = random.getstate()
+
+        for _ in range(100):
+            player._new_segment()
+        player.segments[1:] #pylint: disable=pointless-statement
+
+        self.assertEqual(random.getstate(), state)
+
+
+    def test_matches_player(self):
+        """Wander both snakes around the same way, and compare them"""
+        random.seed(3)
+        player = Player(20, 20, 5)
+        compact = CompactPlayer(20, 20, 5)
+
+        for _ in range(2_000):
+            facing = random.choice(list(Facing))
+            player.add_facing_to_buffer(facing)
+            compact.add_facing_to_buffer(facing)
+            player.move()
+            compact.move()
+
+            if random.random() < 0.2:
+                pellet = Pellet(player.head().x_pos, player.head().y_pos)
+                self.assertTrue(player.check_pellet(pellet))
+                self.assertTrue(compact.check_pellet(pellet))
+
+            x_pos = random.randrange(0, 40)
+            y_pos = random.randrange(0, 40)
+            self.assertEqual(
+                compact.space_occupied(x_pos, y_pos),
+                player.space_occupied(x_pos, y_pos)
+            )
+            self.assertEqual(compact.check_body_hit(), player.check_body_hit())
+            self.assertEqual(
+                compact.check_out_of_bounds(0, 40, 0, 40),
+                player.check_out_of_bounds(0, 40, 0, 40)
+            )
+            self.assertEqual(compact.tail(), player.tail())
+
+        self.assertEqual(compact.segments, player.segments)
+        self.assertListEqual(
+            list(compact.cells()),
+            [(segment.x_pos, segment.y_pos) for segment in player.segments]
+        )
+
+
+    def test_segments_setter(self):
+        """Copy a list of segments into the arrays"""
+        player = CompactPlayer(0, 0, 1)
+        segments = [Segment(2, 1), Segment(2, 2), Segment(1, 2)]
+
+        player.segments = segments
+        player.move()
+
+        self.assertEqual(
+            player.segments,
+            [Segment(1, 1), Segment(2, 1), Segment(2, 2)]
+        )
+
+
+    def test_reset(self):
+        """Put a moved snake back at the start, in the same arrays"""
+        player = CompactPlayer(3, 3, 3)
+        player.move()
+        player._new_segment()
+        player._new_segment()
+        xs = player.xs
+
+        player.reset(5, 4, 2)
+
+        self.assertEqual(player.facing, Facing.LEFT)
+        self.assertEqual(player.segments, [Segment(5, 4), Segment(6, 4)])
+        self.assertIs(player.xs, xs)
+
+
+    def test_draw(self):
+        """Draw the segments with the icons for their places"""
+        curses.initscr()
+        window = curses.newwin(3, 5)
+        player = CompactPlayer(1, 1, 3)
+
+        player.draw(window)
+
+        self.assertListEqual(
+            window_to_list(window)[1],
+            [" "] + [icon_at(num, player.icon_seed) for num in range(3)] + [" "]
+        )
@@ -0,0 +1,59 @@
+"""Test the map of pellets by cell"""
+
+import unittest
+
+from entities.pellet import Pellet
+from entities.pellet_map import PelletMap
+
+
+class TestPelletMap(unittest.TestCase):
+    """Test adding, finding and removing pellets"""
+
+    def test_add(self):
+        """Pellets are found by their cell, one to a cell"""
+        pellets = PelletMap([Pellet(1, 1), Pellet(2, 1)])
+
+        self.assertTrue(pellets.add(Pellet(3, 3)))
+        self.assertFalse(pellets.add(Pellet(1, 1)))
+
+        self.assertEqual(len(pellets), 3)
+        self.assertIn((3, 3), pellets)
+        self.assertNotIn((3, 1), pellets)
+        self.assertEqual(pellets.at(2, 1), Pellet(2, 1))
+        self.assertIsNone(pellets.at(0, 0))
+        self.assertListEqual(
+            list(pellets),
+            [Pellet(1, 1), Pellet(2, 1), Pellet(3, 3)]
+        )
+
+
+    def test_remove(self):
+        """The last pellet takes the place of a removed one"""
+        pellets = PelletMap([Pellet(1, 1), Pellet(2, 1), Pellet(3, 1)])
+        first = pellets.at(1, 1)
+
+        self.assertIs(pellets.remove_at(1, 1), first)
+        self.assertIsNone(pellets.remove_at(1, 1))
+
+        self.assertListEqual(pellets.pellets, [Pellet(3, 1), Pellet(2, 1)])
+        self.assertEqual(pellets.at(3, 1), Pellet(3, 1))
+        self.assertEqual(pellets.remove_at(2, 1), Pellet(2, 1))
+        self.assertEqual(pellets.remove_at(3, 1), Pellet(3, 1))
+        self.assertEqual(len(pellets), 0)
+
+
+    def test_replace(self):
+        """Replacing keeps the list, even when given it"""
+        pellets = PelletMap([Pellet(1, 1)])
+        items = pellets.pellets
+
+        pellets.replace(items)
+        self.assertListEqual(items, [Pellet(1, 1)])
+
+        pellets.replace([Pellet(2, 2), Pellet(2, 2)])
+        self.assertIs(pellets.pellets, items)
+        self.assertListEqual(items, [Pellet(2, 2)])
+        self.assertNotIn((1, 1), pellets)
+
+        pellets.clear()
+        self.assertListEqual(items, [])
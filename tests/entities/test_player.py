@@ -64,6 +64,23 @@ class TestPlayer(unittest.TestCase):
         )
 
 
+    def test_reset(self):
+        """Put a moved player back at the start, reusing its segments"""
+        player = Player(3, 3, 3)
+        player.add_facing_to_buffer(Facing.UP)
+        player.move()
+        player._new_segment()
+        segments = list(player.segments)
+
+        player.reset(5, 4, 2)
+
+        self.assertEqual(player.facing, Facing.LEFT)
+        self.assertEqual(player._facing_buffer, deque())
+        self.assertListEqual(player.segments, [Segment(5, 4), Segment(6, 4)])
+        self.assertIs(player.segments[0], segments[0])
+        self.assertIs(player.segments[1], segments[1])
+
+
     def test_head(self):
         """Get the snake's head segment"""
 
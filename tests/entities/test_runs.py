@@ -0,0 +1,200 @@
+"""Test the run-length encoded snake"""
+
+import curses
+import random
+import unittest
+
+from entities.pellet import Pellet
+from entities.player import Facing, Player
+from entities.runs import Run, RunLengthPlayer
+from entities.segment import ICONS, Segment, icon_at
+from tests import window_to_list
+
+
+def positions(segments: list[Segment]) -> list[tuple[int, int]]:
+    """Get the position of each segment"""
+    return [(segment.x_pos, segment.y_pos) for segment in segments]
+
+
+# we are deliberately accesssing protected members to test their functionality
+#pylint: disable=protected-access
+class TestRun(unittest.TestCase):
+    """Test a single run of the body"""
+
+    def test_cells(self):
+        """List the cells of runs in each direction"""
+        self.assertListEqual(
+            list(Run(3, 3, Facing.LEFT, 3).cells()),
+            [(3, 3), (4, 3), (5, 3)]
+        )
+        self.assertListEqual(
+            list(Run(3, 3, Facing.DOWN, 2).cells()),
+            [(3, 3), (3, 2)]
+        )
+        self.assertListEqual(list(Run(3, 3, None, 1).cells()), [(3, 3)])
+        self.assertTupleEqual(Run(3, 3, Facing.UP, 3).end(), (3, 5))
+
+
+    def test_contains(self):
+        """Check positions on and off a run"""
+        run = Run(3, 3, Facing.RIGHT, 3)
+
+        self.assertTrue(run.contains(3, 3))
+        self.assertTrue(run.contains(1, 3))
+        self.assertFalse(run.contains(0, 3))
+        self.assertFalse(run.contains(4, 3))
+        self.assertFalse(run.contains(2, 4))
+        self.assertFalse(run.contains(3, 3, skip=1))
+        self.assertTrue(run.contains(2, 3, skip=1))
+        self.assertFalse(Run(3, 3, None, 1).contains(3, 3, skip=1))
+
+
+class TestRunLengthPlayer(unittest.TestCase):
+    """Test the run-length encoded snake against the segment list"""
+
+    def test_creation(self):
+        """Make a snake with a single run"""
+        player = RunLengthPlayer(3, 3, 3)
+
+        self.assertEqual(player.facing, Facing.LEFT)
+        self.assertEqual(len(player.runs), 1)
+        self.assertEqual(len(player), 3)
+        self.assertListEqual(
+            player.segments,
+            [Segment(3, 3), Segment(4, 3), Segment(5, 3)]
+        )
+        self.assertEqual(player.head(), Segment(3, 3))
+        self.assertEqual(player.tail(), Segment(5, 3))
+
+
+    def test_turns(self):
+        """Each turn adds a run, and the tail drops them again"""
+        player = RunLengthPlayer(5, 5, 3)
+
+        player.add_facing_to_buffer(Facing.UP)
+        player.move()
+        player.add_facing_to_buffer(Facing.RIGHT)
+        player.move()
+
+        self.assertListEqual(positions(player.segments), [(6, 4), (5, 4), (5, 5)])
+        self.assertEqual(len(player.runs), 2)
+
+        player.move()
+        player.move()
+
+        self.assertListEqual(positions(player.segments), [(8, 4), (7, 4), (6, 4)])
+        self.assertEqual(len(player.runs), 1)
+
+
+    def test_growth(self):
+        """Eaten pellets wait under the tail until the snake moves off them"""
+        player = RunLengthPlayer(5, 5, 2)
+
+        self.assertFalse(player.check_pellet(Pellet(6, 5)))
+        self.assertTrue(player.check_pellet(Pellet(5, 5)))
+        self.assertListEqual(positions(player.segments), [(5, 5), (6, 5), (6, 5)])
+
+        player.move()
+
+        self.assertListEqual(positions(player.segments), [(4, 5), (5, 5), (6, 5)])
+        self.assertEqual(player._growth, 0)
+
+
+    def test_segments_setter(self):
+        """Lay the snake over a list of segments"""
+        player = RunLengthPlayer(0, 0, 1)
+        laid_out = [(2, 1), (2, 2), (1, 2), (0, 2), (0, 2)]
+
+        player.segments = [Segment(x_pos, y_pos) for x_pos, y_pos in laid_out]
+
+        self.assertListEqual(positions(player.segments), laid_out)
+        self.assertEqual(len(player.runs), 2)
+        self.assertEqual(player._growth, 1)
+
+
+    def test_body_hit(self):
+        """Hit the body after turning back on it"""
+        player = RunLengthPlayer(5, 5, 5)
+        self.assertFalse(player.check_body_hit())
+
+        for facing in (Facing.UP, Facing.RIGHT, Facing.DOWN):
+            player.add_facing_to_buffer(facing)
+            player.move()
+
+        self.assertTrue(player.check_body_hit())
+        self.assertTrue(player.space_occupied(6, 5))
+        self.assertFalse(player.space_occupied(5, 6))
+
+
+    def test_matches_player(self):
+        """Wander both snakes around the same way, and compare them"""
+        random.seed(3)
+        player = Player(20, 20, 5)
+        runs = RunLengthPlayer(20, 20, 5)
+
+        for _ in range(2_000):
+            facing = random.choice(list(Facing))
+            player.add_facing_to_buffer(facing)
+            runs.add_facing_to_buffer(facing)
+            player.move()
+            runs.move()
+
+            if random.random() < 0.2:
+                pellet = Pellet(player.head().x_pos, player.head().y_pos)
+                self.assertTrue(player.check_pellet(pellet))
+                self.assertTrue(runs.check_pellet(pellet))
+
+            x_pos = random.randrange(0, 40)
+            y_pos = random.randrange(0, 40)
+            self.assertEqual(
+                runs.space_occupied(x_pos, y_pos),
+                player.space_occupied(x_pos, y_pos)
+            )
+            self.assertEqual(runs.check_body_hit(), player.check_body_hit())
+            self.assertEqual(
+                runs.check_out_of_bounds(0, 40, 0, 40),
+                player.check_out_of_bounds(0, 40, 0, 40)
+            )
+            self.assertEqual(runs.tail(), player.tail())
+
+        self.assertListEqual(positions(runs.segments), positions(player.segments))
+        self.assertEqual(len(runs), len(player.segments))
+
+
+    def test_reset(self):
+        """Put a moved snake back at the start"""
+        player = RunLengthPlayer(3, 3, 3)
+        player.add_facing_to_buffer(Facing.UP)
+        player.move()
+        player._new_segment()
+
+        player.reset(5, 4, 2)
+
+        self.assertEqual(player.facing, Facing.LEFT)
+        self.assertListEqual(player.segments, [Segment(5, 4), Segment(6, 4)])
+        self.assertEqual(len(player), 2)
+
+
+    def test_draw(self):
+        """Draw the segments with the icons for their places"""
+        curses.initscr()
+        window = curses.newwin(3, 5)
+        player = RunLengthPlayer(1, 1, 3)
+
+        player.draw(window)
+
+        self.assertListEqual(
+            window_to_list(window)[1],
+            [" ", icon_at(0), icon_at(1), icon_at(2), " "]
+        )
+
+
+    def test_icons(self):
+        """Icons stay with the segment's place, and every icon is used"""
+        player = RunLengthPlayer(10, 10, 5)
+        icons = [segment.icon for segment in player.segments]
+
+        player.move()
+
+        self.assertListEqual([segment.icon for segment in player.segments], icons)
+        self.assertSetEqual({icon_at(index) for index in range(100)}, set(ICONS))
@@ -5,7 +5,7 @@ import random
 import unittest
 
 from entities.pellet import Pellet
-from entities.segment import Segment
+from entities.segment import ICONS, Segment, icon_at
 from tests import window_to_list
 
 
@@ -134,3 +134,15 @@ class TestCurses(unittest.TestCase):
                 [" ", " ", " ", " ", " "]
             ]
         )
+
+
+class TestIconAt(unittest.TestCase):
+    """Test picking icons from a segment's place"""
+
+    def test_icon_at(self):
+        """Icons are the same for the same place and seed, and vary by seed"""
+        icons = [icon_at(index, 5) for index in range(100)]
+
+        self.assertListEqual([icon_at(index, 5) for index in range(100)], icons)
+        self.assertNotEqual([icon_at(index, 6) for index in range(100)], icons)
+        self.assertSetEqual(set(icons), set(ICONS))
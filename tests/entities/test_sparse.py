@@ -0,0 +1,95 @@
+"""Test the vacate grid that only stores the snake's cells"""
+
+import random
+import unittest
+
+from entities.compact import CompactPlayer
+from entities.player import Player
+from entities.sparse import SparseGrid, pack, unpack
+from entities.vacate import NEVER, VacateGrid
+from tests.entities.test_vacate import assert_matches_segments, random_walk
+
+
+class TestPack(unittest.TestCase):
+    """Test packing positions into keys"""
+
+    def test_unique(self):
+        """Every position nearby gets its own key, including negative ones"""
+        keys = {
+            pack(x_pos, y_pos)
+            for x_pos in range(-5, 6)
+            for y_pos in range(-5, 6)
+        }
+        self.assertEqual(len(keys), 121)
+        self.assertNotEqual(pack(2**31 - 1, 0), pack(-2**31, 1))
+
+
+    def test_unpack(self):
+        """Keys unpack to the position they were packed from"""
+        for position in ((0, 0), (-1, 0), (0, -1), (-2**31, 5), (2**31 - 1, -7)):
+            self.assertTupleEqual(unpack(pack(*position)), position)
+
+
+class TestSparseGrid(unittest.TestCase):
+    """Test the grid by itself"""
+
+    def test_layout(self):
+        """Only the snake's cells are stored"""
+        grid = SparseGrid()
+        grid.layout([(3, 2), (2, 2), (1, 2), (1, 2)])
+
+        self.assertEqual(len(grid), 3)
+        self.assertEqual(grid.growth, 1)
+        self.assertEqual(grid.entry(1, 2), 0)
+        self.assertEqual(grid.entry(3, 2), 2)
+        self.assertEqual(grid.entry(4, 2), NEVER)
+        self.assertEqual(grid.moves_until_free(3, 2), 4)
+
+
+    def test_unbounded(self):
+        """Cells far outside any window are stored"""
+        grid = SparseGrid()
+        grid.layout([(-10**6, 10**6), (-10**6 + 1, 10**6)])
+        grid.advance(-10**6, 10**6 - 1)
+
+        self.assertEqual(grid.moves_until_free(-10**6, 10**6 - 1), 2)
+        self.assertEqual(grid.moves_until_free(-10**6 + 1, 10**6), 0)
+
+
+    def test_forgets(self):
+        """Cells are dropped once the tail leaves them, but not if the head
+        went back into them"""
+        grid = SparseGrid()
+        grid.layout([(2, 0), (1, 0), (0, 0)])
+
+        grid.advance(3, 0)
+        self.assertEqual(len(grid), 3)
+        self.assertEqual(grid.entry(0, 0), NEVER)
+
+        grid.advance(3, 1)
+        grid.advance(2, 1)
+        grid.advance(2, 0)
+        self.assertEqual(len(grid), 3)
+        self.assertEqual(grid.moves_until_free(2, 0), 3)
+        self.assertEqual(len(grid.path), 3)
+
+
+    def test_matches_dense(self):
+        """The grid agrees with a dense grid and the segments, and stays the
+        size of the snake"""
+        for player_type in (Player, CompactPlayer):
+            with self.subTest(player_type=player_type.__name__):
+                random.seed(6)
+                player = player_type(10, 10, 5)
+                dense = VacateGrid(-100, 120, -100, 120)
+                player.track(SparseGrid())
+                other = player_type(10, 10, 5)
+                other.track(dense)
+
+                for _ in random_walk([player, other], 500):
+                    self.assertEqual(player.grid.hit, dense.hit)
+                    self.assertEqual(
+                        len(player.grid),
+                        len(set(player.cells()))
+                    )
+                    assert_matches_segments(self, player)
@@ -0,0 +1,157 @@
+"""Test the grid of when the snake leaves each cell"""
+
+import random
+import unittest
+from typing import Iterator
+
+from entities.compact import CompactPlayer
+from entities.pellet import Pellet
+from entities.player import Facing, Player
+from entities.runs import RunLengthPlayer
+from entities.vacate import NEVER, VacateGrid
+
+
+def moves_until_free(player: Player, x_pos: int, y_pos: int) -> int:
+    """Work out when the snake leaves a cell from its segments: the segment
+    nearest the head leaves last."""
+    cells = list(player.cells())
+    if (x_pos, y_pos) not in cells:
+        return 0
+    return len(cells) - cells.index((x_pos, y_pos))
+
+
+def random_walk(players: list[Player], moves: int) -> Iterator[None]:
+    """Move snakes the same random way, sometimes eating a pellet under the
+    first one's head.
+
+    :param players: The snakes, starting in the same place.
+    :param moves: Number of moves.
+
+    :return: Nothing, after each move.
+    """
+    for _ in range(moves):
+        facing = random.choice(list(Facing))
+        for snake in players:
+            snake.add_facing_to_buffer(facing)
+            snake.move()
+
+        if random.random() < 0.2:
+            head = players[0].head()
+            pellet = Pellet(head.x_pos, head.y_pos)
+            for snake in players:
+                snake.check_pellet(pellet)
+        yield
+
+
+def assert_matches_segments(test: unittest.TestCase, player: Player):
+    """Check the snake's grid agrees with its segments near the start.
+
+    :param test: The test to fail.
+    :param player: The tracked snake.
+    """
+    for x_pos in range(0, 20, 3):
+        for y_pos in range(0, 20, 3):
+            test.assertEqual(
+                player.grid.moves_until_free(x_pos, y_pos),
+                moves_until_free(player, x_pos, y_pos)
+            )
+
+
+class TestVacateGrid(unittest.TestCase):
+    """Test the grid by itself"""
+
+    def test_layout(self):
+        """Cells are entered in order from the tail"""
+        grid = VacateGrid(1, 5, 1, 4)
+        grid.layout([(3, 2), (2, 2), (1, 2), (1, 2)])
+
+        self.assertEqual(grid.tick, 2)
+        self.assertEqual(grid.tail, 0)
+        self.assertEqual(grid.growth, 1)
+        self.assertListEqual(
+            list(grid.entries),
+            [
+                NEVER, NEVER, NEVER, NEVER,
+                0, 1, 2, NEVER,
+                NEVER, NEVER, NEVER, NEVER
+            ]
+        )
+        self.assertEqual(grid.moves_until_free(3, 2), 4)
+        self.assertEqual(grid.moves_until_free(1, 2), 2)
+        self.assertEqual(grid.moves_until_free(4, 2), 0)
+        self.assertEqual(grid.moves_until_free(9, 9), 0)
+
+
+    def test_advance(self):
+        """The tail waits for the segments under it, then follows the head"""
+        grid = VacateGrid(0, 5, 0, 5)
+        grid.layout([(2, 0), (1, 0), (0, 0)])
+        grid.grow()
+
+        grid.advance(3, 0)
+        self.assertTrue(grid.free_in(0, 0, 1))
+        self.assertFalse(grid.free_in(0, 0, 0))
+        self.assertFalse(grid.hit)
+
+        grid.advance(4, 0)
+        grid.advance(4, 1)
+        grid.advance(3, 1)
+        self.assertTrue(grid.free_in(0, 0, 0))
+        self.assertEqual(grid.moves_until_free(4, 1), 3)
+        self.assertFalse(grid.hit)
+
+        # the tail leaves the cell as the head enters it
+        grid.advance(3, 0)
+        self.assertFalse(grid.hit)
+
+        # turn back onto the neck
+        grid.advance(4, 0)
+        grid.advance(3, 0)
+        self.assertTrue(grid.hit)
+
+
+    def test_outside(self):
+        """Cells outside the grid are never stored"""
+        grid = VacateGrid(0, 3, 0, 3)
+        grid.layout([(0, 0), (-1, 0)])
+        grid.advance(0, -1)
+
+        self.assertFalse(grid.hit)
+        self.assertEqual(grid.moves_until_free(0, -1), 0)
+        self.assertEqual(grid.moves_until_free(0, 0), 1)
+
+
+class TestTracking(unittest.TestCase):
+    """Test snakes keeping a grid up to date"""
+
+    def test_matches_segments(self):
+        """The grid agrees with the segments after every move"""
+        for player_type in (Player, CompactPlayer, RunLengthPlayer):
+            with self.subTest(player_type=player_type.__name__):
+                random.seed(4)
+                player = player_type(10, 10, 5)
+                untracked = player_type(10, 10, 5)
+                # big enough that the snake never wanders off it
+                player.track(VacateGrid(-100, 120, -100, 120))
+
+                for _ in random_walk([player, untracked], 500):
+                    self.assertEqual(
+                        player.check_body_hit(),
+                        untracked.check_body_hit()
+                    )
+                    assert_matches_segments(self, player)
+
+
+    def test_reset(self):
+        """Resetting the snake lays the grid out again"""
+        player = Player(3, 3, 3)
+        grid = VacateGrid(0, 10, 0, 10)
+        player.track(grid)
+        player.move()
+
+        player.reset(5, 5, 2)
+
+        self.assertIs(player.grid, grid)
+        self.assertEqual(grid.moves_until_free(5, 5), 2)
+        self.assertEqual(grid.moves_until_free(6, 5), 1)
+        self.assertEqual(grid.moves_until_free(2, 3), 0)
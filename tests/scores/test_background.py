@@ -0,0 +1,95 @@
+"""Test loading and saving scores in the background"""
+
+import os
+import tempfile
+import threading
+import unittest
+
+from scores.background import BackgroundScores, Task
+from scores.record import ScoreRecord
+
+
+# we are deliberately accesssing protected members to test their functionality
+#pylint: disable=protected-access
+class TestBackgroundScores(unittest.TestCase):
+    """Test the worker thread"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory() #pylint: disable=consider-using-with
+        self.save_dir = os.path.join(self.temp_dir.name, "test")
+
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+    def test_path(self):
+        """The score file depends on the backend"""
+        self.assertEqual(
+            BackgroundScores(self.save_dir).path,
+            f"{self.save_dir}/hiscore.txt"
+        )
+        self.assertEqual(
+            BackgroundScores(self.save_dir, "sqlite").path,
+            f"{self.save_dir}/hiscore.sqlite3"
+        )
+
+
+    def test_preload(self):
+        """Preloading starts a single load, which is handed over once"""
+        background = BackgroundScores(self.save_dir)
+
+        loading = background.preload()
+        self.assertIs(background.preload(), loading)
+        self.assertIs(background.take_loaded(), loading)
+        self.assertIsNot(background.take_loaded(), loading)
+
+        self.assertListEqual(loading.result(), [])
+        background.shutdown()
+
+
+    def test_save_then_load(self):
+        """Saves and loads happen in the order they were asked for"""
+        for backend in ["text", "sqlite"]:
+            background = BackgroundScores(self.save_dir, backend)
+
+            background.save(ScoreRecord(5, 1.0, "a"))
+            background.save(ScoreRecord(9, 2.0, "b"))
+            loaded = background.take_loaded().result()
+
+            self.assertListEqual([record.score for record in loaded], [9, 5])
+            background.shutdown()
+            self.assertIsNone(background._store)
+
+
+    def test_worker_thread(self):
+        """The store is only used on the worker thread"""
+        background = BackgroundScores(self.save_dir, "sqlite")
+        threads = []
+
+        original = background._load
+        def load():
+            threads.append(threading.current_thread())
+            return original()
+        background._load = load #type: ignore
+
+        background.preload().result()
+        background.shutdown()
+
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+
+    def test_failed_task(self):
+        """An error on the worker thread is kept for the thread waiting on
+        it"""
+        def fail():
+            raise OSError("corrupt")
+        task = Task(fail)
+        self.assertFalse(task.done())
+
+        task.run()
+        self.assertTrue(task.done())
+        self.assertIsInstance(task.exception(), OSError)
+        with self.assertRaises(OSError):
+            task.result()
@@ -0,0 +1,217 @@
+"""Test the memory-mapped binary score store"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from scores.binary import HEADER, ID_SIZE, RECORD, BinaryStore
+from scores.locking import fcntl, locked
+from scores.record import ScoreRecord, new_game_id
+from utils.errors import ScoreFileError
+
+
+class TestBinaryStore(unittest.TestCase):
+    """Test inserting, reading and checking records"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory() #pylint: disable=consider-using-with
+        self.path = os.path.join(self.temp_dir.name, "hiscore.bin")
+        self.store = BinaryStore(self.path, 2)
+
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+    def test_empty(self):
+        """A missing or empty file has no scores"""
+        self.assertTrue(self.store.is_new())
+        self.assertListEqual(self.store.top(), [])
+        self.assertEqual(len(self.store), 0)
+
+        with open(self.path, "wb"):
+            pass
+
+        self.assertTrue(self.store.is_new())
+        self.assertListEqual(self.store.top(), [])
+
+
+    def test_insert_ranked(self):
+        """Records are kept best first, oldest first on a tie"""
+        for record in [
+            ScoreRecord(10, 1.0, "a"),
+            ScoreRecord(30, 2.0, "b"),
+            ScoreRecord(20, 3.0),
+            ScoreRecord(30, 4.0, "d")
+        ]:
+            self.store.add(record)
+
+        self.assertFalse(self.store.is_new())
+        self.assertEqual(len(self.store), 4)
+        self.assertListEqual(
+            self.store.top(),
+            [ScoreRecord(30, 2.0, "b"), ScoreRecord(30, 4.0, "d")]
+        )
+        self.assertListEqual(
+            [record.score for record in self.store.top(10)],
+            [30, 30, 20, 10]
+        )
+
+
+    def test_game_ids(self):
+        """IDs come back the same, whatever characters they're made of, and
+        long IDs are cut off without splitting a character"""
+        game_id = new_game_id()
+        self.store.add(ScoreRecord(1, 1.0, game_id))
+        self.store.add(ScoreRecord(2, 2.0, "short"))
+        self.store.add(ScoreRecord(3, 3.0, "cafe"))
+        self.store.add(ScoreRecord(4, 4.0, "é" * ID_SIZE))
+
+        self.assertListEqual(
+            [record.game_id for record in self.store.top(4)],
+            ["é" * (ID_SIZE // 2), "cafe", "short", game_id]
+        )
+
+
+    def test_grow(self):
+        """The file doubles in size when it's full"""
+        for num in range(40):
+            self.store.add(ScoreRecord(num, float(num)))
+
+        self.assertEqual(len(self.store), 40)
+        self.assertEqual(
+            os.path.getsize(self.path),
+            HEADER.size + 64 * RECORD.size
+        )
+        self.assertListEqual(
+            [record.score for record in self.store.top(40)],
+            list(range(39, -1, -1))
+        )
+
+
+    def test_import(self):
+        """Imported records are merged with the stored ones"""
+        self.store.add(ScoreRecord(15, 1.0, "a"))
+        self.store.import_records(
+            [ScoreRecord(10, 2.0, "b"), ScoreRecord(20, 3.0, "c")]
+        )
+
+        self.assertListEqual(
+            [record.game_id for record in self.store.top(10)],
+            ["c", "a", "b"]
+        )
+
+
+    def test_import_twice(self):
+        """Importing the same games again doesn't store them twice"""
+        snapshot = f"{self.temp_dir.name}/hiscore.txt"
+        journal = f"{self.temp_dir.name}/hiscore.journal"
+        with open(snapshot, "wt", encoding="UTF-8") as file:
+            file.write("20 1.000 a\n10 2.000 b\n")
+        with open(journal, "wt", encoding="UTF-8") as file:
+            file.write("15 3.000 c\n")
+
+        self.assertEqual(self.store.import_text(snapshot, journal), 3)
+        self.assertEqual(self.store.import_text(snapshot, journal), 0)
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(self.store.import_records([ScoreRecord(5, 4.0, "d" * 40)]), 1)
+        self.assertEqual(self.store.import_records([ScoreRecord(5, 4.0, "d" * 40)]), 0)
+        self.assertEqual(len(self.store), 4)
+
+
+    def test_bad_magic(self):
+        """Files that aren't binary score files are an error"""
+        with open(self.path, "wt", encoding="UTF-8") as file:
+            file.write("10\n20\n30\n40\n50\n60\n70\n80\n90\n100\n")
+
+        with self.assertRaises(ScoreFileError):
+            self.store.top()
+
+
+    def test_bad_version(self):
+        """Files from another version are an error"""
+        self.store.add(ScoreRecord(10))
+        with open(self.path, "r+b") as file:
+            file.seek(4)
+            file.write(b"\x09\x00")
+
+        with self.assertRaises(ScoreFileError):
+            self.store.top()
+
+
+    def test_bad_checksum(self):
+        """Changed records are an error"""
+        self.store.add(ScoreRecord(10))
+        with open(self.path, "r+b") as file:
+            file.seek(HEADER.size)
+            file.write(b"\x0b")
+
+        with self.assertRaises(ScoreFileError):
+            self.store.top()
+        with self.assertRaises(ScoreFileError):
+            self.store.add(ScoreRecord(20))
+
+
+    def test_bad_header(self):
+        """A changed header is an error"""
+        self.store.add(ScoreRecord(10))
+        with open(self.path, "r+b") as file:
+            file.seek(8)
+            file.write(b"\x05")
+
+        with self.assertRaises(ScoreFileError):
+            self.store.top()
+
+
+    def test_reads_only_top(self):
+        """Only the records that are read are checked"""
+        for num in range(3):
+            self.store.add(ScoreRecord(num, float(num)))
+        with open(self.path, "r+b") as file:
+            file.seek(HEADER.size + 2 * RECORD.size)
+            file.write(b"\x0b")
+
+        self.assertListEqual(
+            [record.score for record in self.store.top(2)],
+            [2, 1]
+        )
+        with self.assertRaises(ScoreFileError):
+            self.store.top(3)
+
+
+    @unittest.skipIf(fcntl is None, "no advisory locks on this platform")
+    def test_reader_waits(self):
+        """Reading waits for a score being added to be written"""
+        self.store.add(ScoreRecord(10))
+        read = []
+
+        def reader():
+            read.append(len(self.store))
+            read.append(self.store.top())
+
+        with locked(self.path):
+            thread = threading.Thread(target=reader)
+            thread.start()
+            time.sleep(0.05)
+            self.assertListEqual(read, [])
+        thread.join()
+
+        self.assertListEqual(read, [1, [ScoreRecord(10)]])
+
+
+    def test_truncated(self):
+        """Cut off files are an error"""
+        self.store.add(ScoreRecord(10))
+        with open(self.path, "r+b") as file:
+            file.truncate(HEADER.size + RECORD.size)
+
+        with self.assertRaises(ScoreFileError):
+            self.store.top()
+
+        with open(self.path, "r+b") as file:
+            file.truncate(HEADER.size - 1)
+
+        with self.assertRaises(ScoreFileError):
+            self.store.top()
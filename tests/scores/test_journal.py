@@ -0,0 +1,189 @@
+"""Test the journal score store"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+
+from scores.journal import JournalStore
+from scores.locking import fcntl
+from scores.record import ScoreRecord
+
+
+def add_scores(snapshot: str, journal: str, writer: int, count: int) -> float:
+    """Add scores from a separate process, compacting often.
+
+    :return: The longest time a single add took, in seconds.
+    """
+    store = JournalStore(snapshot, journal, max_records=10_000, compact_after=5)
+    slowest = 0.0
+    for num in range(count):
+        start = time.perf_counter()
+        store.add(ScoreRecord(num, time.time(), f"{writer}-{num}"))
+        slowest = max(slowest, time.perf_counter() - start)
+    return slowest
+
+
+# we are deliberately accesssing protected members to test their functionality
+#pylint: disable=protected-access
+class TestJournalStore(unittest.TestCase):
+    """Test appending, reading and compacting"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory() #pylint: disable=consider-using-with
+        self.snapshot = os.path.join(self.temp_dir.name, "hiscore.txt")
+        self.journal = os.path.join(self.temp_dir.name, "hiscore.journal")
+
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+    def read_lines(self, path: str) -> list[str]:
+        """Read the lines of a file"""
+        with open(path, "rt", encoding="UTF-8") as file:
+            return file.readlines()
+
+
+    def test_missing_files(self):
+        """Missing files have no scores"""
+        store = JournalStore(self.snapshot, self.journal)
+
+        self.assertListEqual(store.top(), [])
+
+
+    def test_add(self):
+        """Adding appends to the journal, and leaves the snapshot alone"""
+        with open(self.snapshot, "wt", encoding="UTF-8") as file:
+            file.write("20\n5\n")
+        store = JournalStore(self.snapshot, self.journal)
+
+        store.add(ScoreRecord(10, 1.0, "a"))
+        store.add(ScoreRecord(30, 2.0, "b"))
+
+        self.assertListEqual(self.read_lines(self.snapshot), ["20\n", "5\n"])
+        self.assertListEqual(
+            self.read_lines(self.journal),
+            ["10 1.000 a\n", "30 2.000 b\n"]
+        )
+        self.assertListEqual(
+            store.top(),
+            [
+                ScoreRecord(30, 2.0, "b"),
+                ScoreRecord(20),
+                ScoreRecord(10, 1.0, "a"),
+                ScoreRecord(5)
+            ]
+        )
+        self.assertListEqual(
+            [record.score for record in store.top(2)],
+            [30, 20]
+        )
+
+
+    def test_compact(self):
+        """The journal is folded into the snapshot once it's long enough"""
+        store = JournalStore(self.snapshot, self.journal, max_records=2, compact_after=3)
+
+        store.add(ScoreRecord(1, 1.0, "a"))
+        store.add(ScoreRecord(3, 2.0, "b"))
+        self.assertEqual(len(self.read_lines(self.journal)), 2)
+        self.assertFalse(os.path.exists(self.snapshot))
+
+        store.add(ScoreRecord(2, 3.0, "c"))
+
+        self.assertListEqual(self.read_lines(self.journal), [])
+        self.assertListEqual(
+            self.read_lines(self.snapshot),
+            ["3 2.000 b\n", "2 3.000 c\n"]
+        )
+        self.assertFalse(os.path.exists(f"{self.snapshot}.tmp"))
+
+
+    def test_compact_race(self):
+        """A compaction that lost the race to another process is skipped"""
+        store = JournalStore(self.snapshot, self.journal, compact_after=2)
+        other = JournalStore(self.snapshot, self.journal, compact_after=2)
+
+        store.add(ScoreRecord(1, 1.0, "a"))
+        other.add(ScoreRecord(2, 2.0, "b"))
+        store._journal_length = 2
+
+        # the other process compacted first, there's nothing left to do
+        other.compact()
+        store.add(ScoreRecord(3, 3.0, "c"))
+
+        self.assertListEqual(self.read_lines(self.journal), ["3 3.000 c\n"])
+        self.assertEqual(len(self.read_lines(self.snapshot)), 2)
+
+
+    @unittest.skipIf(fcntl is None, "no advisory locks on this platform")
+    def test_concurrent_writers(self):
+        """No scores are lost when many processes add and compact at once"""
+        writers = 8
+        count = 25
+
+        with multiprocessing.Pool(writers) as pool:
+            slowest = pool.starmap(
+                add_scores,
+                [
+                    (self.snapshot, self.journal, writer, count)
+                    for writer in range(writers)
+                ]
+            )
+
+        store = JournalStore(self.snapshot, self.journal, max_records=10_000)
+        self.assertSetEqual(
+            {record.game_id for record in store.top()},
+            {
+                f"{writer}-{num}"
+                for writer in range(writers)
+                for num in range(count)
+            }
+        )
+        self.assertLess(max(slowest), 2.0)
+
+
+    def test_interrupted_compaction(self):
+        """Records in both the snapshot and journal are only counted once"""
+        with open(self.snapshot, "wt", encoding="UTF-8") as file:
+            file.write("3 2.000 b\n")
+        with open(self.journal, "wt", encoding="UTF-8") as file:
+            file.write("3 2.000 b\n1 1.000 a\n")
+
+        store = JournalStore(self.snapshot, self.journal)
+
+        self.assertListEqual(
+            store.top(),
+            [ScoreRecord(3, 2.0, "b"), ScoreRecord(1, 1.0, "a")]
+        )
+
+
+    def test_append_after_torn_line(self):
+        """A line cut off by a crash is skipped, and doesn't break the next"""
+        with open(self.journal, "wt", encoding="UTF-8") as file:
+            file.write("3 2.000 b\n4 3.0")
+
+        store = JournalStore(self.snapshot, self.journal)
+        store.add(ScoreRecord(5, 4.0, "c"))
+
+        self.assertListEqual(
+            store.top(),
+            [ScoreRecord(5, 4.0, "c"), ScoreRecord(4, 3.0), ScoreRecord(3, 2.0, "b")]
+        )
+
+
+    def test_no_compaction(self):
+        """Without compaction, the journal is only ever appended to"""
+        store = JournalStore(self.snapshot, self.journal, max_records=2, compact_after=None)
+
+        for num in range(50):
+            store.add(ScoreRecord(num % 7, float(num), f"{num}"))
+
+        self.assertEqual(len(self.read_lines(self.journal)), 50)
+        self.assertFalse(os.path.exists(self.snapshot))
+        self.assertListEqual(
+            store.top(),
+            [ScoreRecord(6, 6.0, "6"), ScoreRecord(6, 13.0, "13")]
+        )
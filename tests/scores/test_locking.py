@@ -0,0 +1,69 @@
+"""Test the advisory score file lock"""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from scores.locking import fcntl, locked
+
+
+@unittest.skipIf(fcntl is None, "no advisory locks on this platform")
+class TestLocked(unittest.TestCase):
+    """Test holding the lock"""
+
+    def test_lock_file(self):
+        """The lock is taken on a separate file"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "hiscore.txt")
+
+            with locked(path):
+                self.assertTrue(os.path.isfile(f"{path}.lock"))
+            self.assertFalse(os.path.exists(path))
+
+
+    def test_exclusive(self):
+        """A second holder waits for the first to release the lock"""
+        events = []
+
+        def hold(path: str):
+            with locked(path):
+                events.append("second")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "hiscore.txt")
+
+            with locked(path):
+                thread = threading.Thread(target=hold, args=[path])
+                thread.start()
+                time.sleep(0.05)
+                events.append("first")
+            thread.join()
+
+        self.assertListEqual(events, ["first", "second"])
+
+
+    def test_shared(self):
+        """Readers share the lock with each other, but wait for a writer"""
+        events = []
+
+        def read(path: str):
+            with locked(path, shared=True):
+                events.append("reader")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "hiscore.txt")
+
+            with locked(path, shared=True):
+                read(path)
+                events.append("first")
+
+            with locked(path):
+                thread = threading.Thread(target=read, args=[path])
+                thread.start()
+                time.sleep(0.05)
+                events.append("writer")
+            thread.join()
+
+        self.assertListEqual(events, ["reader", "first", "writer", "reader"])
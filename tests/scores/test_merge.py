@@ -0,0 +1,150 @@
+"""Test merging score files"""
+
+import os
+import tempfile
+import unittest
+
+from scores.merge import merge_ranked, ranked_records, score_files
+from scores.record import ScoreRecord
+
+
+class TestMerge(unittest.TestCase):
+    """Test the k-way merge and its inputs"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory() #pylint: disable=consider-using-with
+
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+    def write(self, name: str, contents: str) -> str:
+        """Write a file in the temporary directory.
+
+        :param name: Path of the file, relative to the directory.
+        :param contents: The file's contents.
+
+        :return: The file's full path.
+        """
+        path = os.path.join(self.temp_dir.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wt", encoding="UTF-8") as file:
+            file.write(contents)
+        return path
+
+
+    def test_merge_ranked(self):
+        """Streams are interleaved best first, ties keep their input order"""
+        merged = merge_ranked(
+            [
+                [ScoreRecord(30, 1.0), ScoreRecord(10, 1.0)],
+                [ScoreRecord(30, 1.0), ScoreRecord(20, 1.0)],
+                []
+            ]
+        )
+
+        self.assertListEqual(
+            [record.score for record in merged],
+            [30, 30, 20, 10]
+        )
+
+
+    def test_drop_repeats(self):
+        """The same game from several hosts is only ranked once"""
+        merged = merge_ranked(
+            [
+                [ScoreRecord(30, 2.0, "a"), ScoreRecord(10, 1.0, "b")],
+                [ScoreRecord(30, 2.0, "c"), ScoreRecord(10, 1.0, "b")],
+                [ScoreRecord(30, 2.0, "a"), ScoreRecord(10, 1.0)]
+            ]
+        )
+
+        self.assertListEqual(
+            list(merged),
+            [
+                ScoreRecord(30, 2.0, "a"),
+                ScoreRecord(30, 2.0, "c"),
+                ScoreRecord(10, 1.0, "b"),
+                ScoreRecord(10, 1.0)
+            ]
+        )
+
+
+    def test_count(self):
+        """Only the best records are merged"""
+        merged = merge_ranked(
+            [iter([ScoreRecord(3), ScoreRecord(1)]), iter([ScoreRecord(2)])],
+            2
+        )
+
+        self.assertListEqual([record.score for record in merged], [3, 2])
+
+
+    def test_ranked_records(self):
+        """Journals are sorted, snapshots are streamed as they are"""
+        snapshot = self.write("hiscore.txt", "30 1.000\n20 1.000\n20 2.000\n")
+        journal = self.write("hiscore.journal", "10 1.000\n40 2.000\n")
+
+        self.assertListEqual(
+            [record.score for record in ranked_records(journal)],
+            [40, 10]
+        )
+        self.assertListEqual(
+            [record.score for record in ranked_records(snapshot)],
+            [30, 20, 20]
+        )
+        self.assertListEqual(
+            list(ranked_records(os.path.join(self.temp_dir.name, "missing"))),
+            []
+        )
+
+
+    def test_external_sort(self):
+        """Files bigger than a chunk are sorted through temporary files, ties
+        keep the order of the file, and a ranked start is kept"""
+        scores = [50, 40, 40, 7, 3, 9, 40, 1, 8, 8, 2, 6, 5, 4]
+        path = self.write(
+            "hiscore.journal",
+            "".join(f"{score} 1.000 {num}\n" for num, score in enumerate(scores))
+        )
+
+        expected = sorted(enumerate(scores), key=lambda entry: -entry[1])
+        for chunk_size in (1, 3, 100):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertListEqual(
+                    [
+                        (int(record.game_id), record.score)
+                        for record in ranked_records(path, chunk_size=chunk_size)
+                    ],
+                    expected
+                )
+
+
+    def test_ranked_records_count(self):
+        """Only the best records are kept when a count is given"""
+        path = self.write("hiscore.journal", "10 1.000\n40 2.000\n30 3.000\n")
+
+        self.assertListEqual(
+            [record.score for record in ranked_records(path, 2)],
+            [40, 30]
+        )
+
+
+    def test_score_files(self):
+        """Save directories are replaced by the files inside them"""
+        first = self.write("host1/hiscore.txt", "10\n")
+        journal = self.write("host1/hiscore.journal", "")
+        second = self.write("host2/hiscore.journal", "")
+        other = self.write("other.txt", "")
+
+        self.assertListEqual(
+            score_files(
+                [
+                    os.path.dirname(first),
+                    os.path.dirname(second),
+                    other
+                ]
+            ),
+            [first, journal, second, other]
+        )
@@ -0,0 +1,73 @@
+"""Test score records and their lines"""
+
+import unittest
+
+from scores.record import (
+    ScoreRecord,
+    format_record,
+    new_game_id,
+    parse_record,
+    rank_key
+)
+
+
+class TestScoreRecord(unittest.TestCase):
+    """Test formatting, parsing and ranking records"""
+
+    def test_defaults(self):
+        """Only the score is required"""
+        record = ScoreRecord(5)
+
+        self.assertEqual(record.score, 5)
+        self.assertEqual(record.timestamp, 0.0)
+        self.assertEqual(record.game_id, "")
+
+
+    def test_new_game_id(self):
+        """IDs are unique hex strings"""
+        first = new_game_id()
+
+        self.assertEqual(len(first), 32)
+        int(first, 16)
+        self.assertNotEqual(first, new_game_id())
+
+
+    def test_format_record(self):
+        """Records are a single line"""
+        self.assertEqual(
+            format_record(ScoreRecord(12, 1.5, "abc")),
+            "12 1.500 abc\n"
+        )
+        self.assertEqual(
+            format_record(ScoreRecord(12, 1.5)),
+            "12 1.500\n"
+        )
+
+
+    def test_parse_record(self):
+        """Parse new and old lines, and skip broken ones"""
+        self.assertEqual(parse_record("12 1.500 abc\n"), ScoreRecord(12, 1.5, "abc"))
+        self.assertEqual(parse_record("12 1.500\n"), ScoreRecord(12, 1.5))
+        self.assertEqual(parse_record("12\n"), ScoreRecord(12))
+
+        self.assertIsNone(parse_record("\n"))
+        self.assertIsNone(parse_record("twelve\n"))
+        self.assertIsNone(parse_record("12 1.500 abc13 2.0 def\n"))
+
+
+    def test_rank_key(self):
+        """Highest scores first, then the earliest"""
+        records = [
+            ScoreRecord(5, 2.0),
+            ScoreRecord(10, 3.0),
+            ScoreRecord(5, 1.0)
+        ]
+
+        self.assertListEqual(
+            sorted(records, key=rank_key),
+            [
+                ScoreRecord(10, 3.0),
+                ScoreRecord(5, 1.0),
+                ScoreRecord(5, 2.0)
+            ]
+        )
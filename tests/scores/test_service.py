@@ -0,0 +1,211 @@
+"""Test the leaderboard service on a loopback port"""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from scores.record import ScoreRecord
+from scores.service import LeaderboardService, RequestError, record_from_json
+
+
+class TestRecordFromJson(unittest.TestCase):
+    """Test checking submitted records"""
+
+    def test_valid(self):
+        """Missing fields get their defaults, whole timestamps are allowed"""
+        self.assertEqual(
+            record_from_json({"score": 5, "timestamp": 2, "player": "ann"}),
+            ScoreRecord(5, 2.0, player="ann")
+        )
+
+
+    def test_invalid(self):
+        """Records need a score, and every field needs the right type"""
+        for entry in [
+            5,
+            {"timestamp": 1.0},
+            {"score": "5"},
+            {"score": 5, "ticks": 1.5},
+            {"score": 5, "game_id": True},
+            {"score": 1 << 63},
+            {"score": 5, "width": -(1 << 63) - 1},
+            {"score": 5, "timestamp": float("nan")},
+            {"score": 5, "timestamp": float("inf")}
+        ]:
+            with self.assertRaises(RequestError):
+                record_from_json(entry)
+
+
+class TestLeaderboardService(unittest.IsolatedAsyncioTestCase):
+    """Submit scores and read pages over HTTP"""
+
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory() #pylint: disable=consider-using-with
+        self.service = LeaderboardService(
+            "text",
+            os.path.join(self.temp_dir.name, "hiscore.txt"),
+            page_size=2,
+            max_pages=3
+        )
+        self.port = await self.service.start()
+
+
+    async def asyncTearDown(self):
+        await self.service.close()
+        self.temp_dir.cleanup()
+
+
+    async def request(
+        self,
+        method: str,
+        target: str,
+        body: object = None
+    ) -> tuple[int, dict]:
+        """Send a request to the service.
+
+        :param method: The HTTP method.
+        :param target: The path and query.
+        :param body: Sent as JSON when given.
+
+        :return: The status code, and the decoded body.
+        """
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        data = b"" if body is None else json.dumps(body).encode("UTF-8")
+        writer.write(
+            f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode("ascii") + data
+        )
+        response = await reader.read()
+        writer.close()
+        await writer.wait_closed()
+
+        head, _, content = response.partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(content)
+
+
+    async def test_pages(self):
+        """Scores are ranked, and split into pages"""
+        status, body = await self.request(
+            "POST",
+            "/scores",
+            [{"score": score, "timestamp": float(score)} for score in range(5)]
+        )
+        self.assertEqual(status, 200)
+        self.assertDictEqual(body, {"added": 5})
+
+        _, first = await self.request("GET", "/leaderboard")
+        _, third = await self.request("GET", "/leaderboard?page=3")
+
+        self.assertListEqual(
+            [(entry["rank"], entry["score"]) for entry in first["scores"]],
+            [(1, 4), (2, 3)]
+        )
+        self.assertListEqual(
+            [(entry["rank"], entry["score"]) for entry in third["scores"]],
+            [(5, 0)]
+        )
+
+
+    async def test_pages_past_compaction(self):
+        """Pages past the default number of kept scores survive the text
+        store compacting its journal"""
+        await self.service.close()
+        self.service = LeaderboardService(
+            "text",
+            os.path.join(self.temp_dir.name, "hiscore.txt"),
+            page_size=10,
+            max_pages=4
+        )
+        self.port = await self.service.start()
+
+        await self.request(
+            "POST",
+            "/scores",
+            [{"score": score, "timestamp": float(score)} for score in range(40)]
+        )
+        _, second = await self.request("GET", "/leaderboard?page=2")
+        _, fourth = await self.request("GET", "/leaderboard?page=4")
+
+        self.assertListEqual(
+            [entry["score"] for entry in second["scores"]],
+            list(range(29, 19, -1))
+        )
+        self.assertListEqual(
+            [(entry["rank"], entry["score"]) for entry in fourth["scores"]],
+            [(rank, 40 - rank) for rank in range(31, 41)]
+        )
+
+
+    async def test_cache(self):
+        """Views are cached until scores are added"""
+        await self.request("POST", "/scores", [{"score": 10}])
+        await self.request("GET", "/leaderboard")
+        self.assertListEqual(self.service.views[2], [ScoreRecord(10)])
+
+        # served from the cache, even if the file changes underneath
+        self.service.views[2] = [ScoreRecord(99)]
+        _, body = await self.request("GET", "/leaderboard")
+        self.assertEqual(body["scores"][0]["score"], 99)
+
+        await self.request("POST", "/scores", [{"score": 20}])
+        self.assertDictEqual(self.service.views, {})
+
+        _, body = await self.request("GET", "/leaderboard")
+        self.assertListEqual(
+            [entry["score"] for entry in body["scores"]],
+            [20, 10]
+        )
+
+
+    async def test_stale_view(self):
+        """A view read while scores are added isn't cached"""
+        await self.service.add([ScoreRecord(10)])
+        reading = asyncio.ensure_future(self.service.top(2))
+        await asyncio.sleep(0)
+        await self.service.add([ScoreRecord(20)])
+        await reading
+
+        self.assertNotIn(2, self.service.views)
+
+
+    async def test_errors(self):
+        """Bad requests are answered with an error"""
+        for method, target, body, status in [
+            ("GET", "/nowhere", None, 404),
+            ("POST", "/leaderboard", None, 405),
+            ("GET", "/scores", None, 405),
+            ("GET", "/leaderboard?page=4", None, 404),
+            ("GET", "/leaderboard?page=x", None, 400),
+            ("POST", "/scores", {"score": 1}, 400),
+            ("POST", "/scores", [{"score": "1"}], 400)
+        ]:
+            with self.subTest(target=target, body=body):
+                answer, response = await self.request(method, target, body)
+                self.assertEqual(answer, status)
+                self.assertIn("error", response)
+
+
+    async def test_bad_batch(self):
+        """A batch with a bad record isn't added at all"""
+        answer, _ = await self.request(
+            "POST",
+            "/scores",
+            [{"score": 5}, {"score": 1 << 64}]
+        )
+
+        self.assertEqual(answer, 400)
+        self.assertListEqual(await self.service.top(2), [])
+
+
+    async def test_store_failure(self):
+        """A store that fails is answered with an error, not a dropped
+        connection"""
+        def fail(records: list[ScoreRecord]):
+            raise OSError(f"disk full, {len(records)} not added")
+        self.service._add_all = fail #type: ignore #pylint: disable=protected-access
+
+        answer, response = await self.request("POST", "/scores", [{"score": 5}])
+        self.assertEqual(answer, 500)
+        self.assertIn("error", response)
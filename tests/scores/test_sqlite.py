@@ -0,0 +1,93 @@
+"""Test the SQLite score store"""
+
+import os
+import tempfile
+import unittest
+
+from scores.record import ScoreRecord
+from scores.sqlite import SqliteStore
+
+
+class TestSqliteStore(unittest.TestCase):
+    """Test adding and querying games"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory() #pylint: disable=consider-using-with
+        self.store = SqliteStore(os.path.join(self.temp_dir.name, "hiscore.sqlite3"), 2)
+
+        for record in [
+            ScoreRecord(10, 1.0, "a", "ann", 100, 80, 24),
+            ScoreRecord(30, 2.0, "b", "bob", 300, 80, 24),
+            ScoreRecord(20, 3.0, "c", "ann", 200, 40, 20),
+            ScoreRecord(5, 4.0, "", "", 0, 0, 0)
+        ]:
+            self.store.add(record)
+
+
+    def tearDown(self):
+        self.store.close()
+        self.temp_dir.cleanup()
+
+
+    def test_top(self):
+        """Best scores of all players"""
+        self.assertListEqual(
+            self.store.top(),
+            [
+                ScoreRecord(30, 2.0, "b", "bob", 300, 80, 24),
+                ScoreRecord(20, 3.0, "c", "ann", 200, 40, 20)
+            ]
+        )
+        self.assertListEqual(
+            [record.score for record in self.store.top(10)],
+            [30, 20, 10, 5]
+        )
+
+
+    def test_top_for_player(self):
+        """Best scores of one player"""
+        self.assertListEqual(
+            [record.game_id for record in self.store.top_for_player("ann", 10)],
+            ["c", "a"]
+        )
+        self.assertListEqual(self.store.top_for_player("nobody"), [])
+
+
+    def test_recent(self):
+        """Newest games first"""
+        self.assertListEqual(
+            [record.score for record in self.store.recent(3)],
+            [5, 20, 30]
+        )
+
+
+    def test_duplicate_game_id(self):
+        """The same game is only stored once, games without an ID always are"""
+        self.store.add(ScoreRecord(30, 2.0, "b", "bob", 300, 80, 24))
+        self.store.add(ScoreRecord(5, 4.0))
+
+        self.assertListEqual(
+            [record.score for record in self.store.top(10)],
+            [30, 20, 10, 5, 5]
+        )
+
+
+    def test_indexed_queries(self):
+        """Each query is answered from an index rather than a full scan"""
+        for query, params in [
+            ("SELECT * FROM games ORDER BY score DESC, timestamp LIMIT ?", (1,)),
+            (
+                "SELECT * FROM games WHERE player = ? "
+                "ORDER BY score DESC, timestamp LIMIT ?",
+                ("ann", 1)
+            ),
+            ("SELECT * FROM games ORDER BY timestamp DESC LIMIT ?", (1,))
+        ]:
+            plan = " ".join(
+                row[-1]
+                for row in self.store.connection.execute(
+                    f"EXPLAIN QUERY PLAN {query}", params
+                )
+            )
+            self.assertIn("USING INDEX", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
@@ -0,0 +1,129 @@
+"""Test saving and aggregating game statistics"""
+
+import os
+import tempfile
+import unittest
+
+from scores.stats import BATCH, StatsBuffer, read_columns, summarize
+from state.stats import Death, GameStats
+from utils.errors import ScoreFileError
+
+
+GAMES = [
+    GameStats(100, 4, 10, 0, Death.WALL),
+    GameStats(30, 0, 2, 5_000_000_000, Death.QUIT),
+    GameStats(300, 20, 50, 0, Death.BODY)
+]
+
+
+class TestStats(unittest.TestCase):
+    """Test writing batches and reading the columns back"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory() #pylint: disable=consider-using-with
+        self.path = os.path.join(self.temp_dir.name, "stats.bin")
+
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+    def test_ticks_per_pellet(self):
+        """Games without pellets don't divide by zero"""
+        self.assertEqual(GAMES[0].ticks_per_pellet, 25.0)
+        self.assertEqual(GAMES[1].ticks_per_pellet, 0.0)
+
+
+    def test_batches(self):
+        """Games are written once a batch is full, and when flushed"""
+        buffer = StatsBuffer(self.path, batch_size=2)
+        for stats in GAMES:
+            buffer.add(stats)
+
+        self.assertEqual(len(buffer), 1)
+        self.assertEqual(len(read_columns(self.path)["ticks"]), 2)
+
+        buffer.flush()
+        buffer.flush()
+
+        self.assertEqual(len(buffer), 0)
+        columns = read_columns(self.path)
+        self.assertListEqual(
+            list(zip(*(columns[name] for name in GameStats._fields))),
+            [tuple(stats) for stats in GAMES]
+        )
+
+
+    def test_rotate(self):
+        """A full file is moved aside, replacing the one moved aside before"""
+        buffer = StatsBuffer(self.path, batch_size=1, max_bytes=60)
+        for stats in GAMES:
+            buffer.add(stats)
+
+        self.assertListEqual(list(read_columns(self.path)["ticks"]), [300])
+        self.assertListEqual(list(read_columns(f"{self.path}.1")["ticks"]), [30])
+
+
+    def test_missing(self):
+        """A missing file has no games"""
+        self.assertEqual(len(read_columns(self.path)["death"]), 0)
+        self.assertDictEqual(summarize(read_columns(self.path)), {"games": 0})
+
+
+    def test_torn_batch(self):
+        """A batch cut off by a crash is skipped"""
+        buffer = StatsBuffer(self.path)
+        buffer.add(GAMES[0])
+        buffer.flush()
+        buffer.add(GAMES[1])
+        buffer.flush()
+
+        with open(self.path, "r+b") as file:
+            file.truncate(os.path.getsize(self.path) - 1)
+
+        self.assertListEqual(list(read_columns(self.path)["ticks"]), [100])
+
+
+    def test_corrupt(self):
+        """Changed data and unknown formats are an error"""
+        buffer = StatsBuffer(self.path)
+        buffer.add(GAMES[0])
+        buffer.flush()
+
+        with open(self.path, "r+b") as file:
+            file.seek(BATCH.size)
+            file.write(b"\xff")
+        with self.assertRaises(ScoreFileError):
+            read_columns(self.path)
+
+        with open(self.path, "r+b") as file:
+            file.write(b"XXXX")
+        with self.assertRaises(ScoreFileError):
+            read_columns(self.path)
+
+
+    def test_summarize(self):
+        """Aggregate the columns"""
+        buffer = StatsBuffer(self.path)
+        for stats in GAMES:
+            buffer.add(stats)
+        buffer.flush()
+
+        self.assertDictEqual(
+            summarize(read_columns(self.path)),
+            {
+                "games": 3,
+                "mean_ticks": 430 / 3,
+                "mean_pellets": 8.0,
+                "mean_turns": 62 / 3,
+                "paused_seconds": 5.0,
+                "mean_ticks_per_pellet": 20.0,
+                "deaths": {
+                    "none": 0,
+                    "quit": 1,
+                    "wall": 1,
+                    "body": 1,
+                    "filled": 0
+                }
+            }
+        )
@@ -0,0 +1,65 @@
+"""Test choosing a score store"""
+
+import os
+import tempfile
+import unittest
+
+from scores.binary import BinaryStore
+from scores.journal import JournalStore
+from scores.record import ScoreRecord
+from scores.sqlite import SqliteStore
+from scores.store import BACKENDS, FILE_NAMES, open_store
+
+
+class TestOpenStore(unittest.TestCase):
+    """Open each backend"""
+
+    def test_backends(self):
+        """Every backend has a file name"""
+        self.assertTupleEqual(BACKENDS, tuple(FILE_NAMES))
+
+
+    def test_text(self):
+        """The journal goes next to the snapshot"""
+        store = open_store("text", "/tmp/test/hiscore.txt", 5)
+
+        self.assertIsInstance(store, JournalStore)
+        self.assertEqual(store.snapshot_path, "/tmp/test/hiscore.txt")
+        self.assertEqual(store.journal_path, "/tmp/test/hiscore.journal")
+        self.assertEqual(store.max_records, 5)
+
+
+    def test_sqlite(self):
+        """Open a database"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            store = open_store("sqlite", os.path.join(temp_dir, "hiscore.sqlite3"))
+
+            self.assertIsInstance(store, SqliteStore)
+            store.close() #type: ignore
+
+
+    def test_binary(self):
+        """A new binary file imports the text scores once"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "hiscore.txt"), "wt", encoding="UTF-8") as file:
+                file.write("10\n30 2.000 b\n")
+            with open(os.path.join(temp_dir, "hiscore.journal"), "wt", encoding="UTF-8") as file:
+                file.write("30 2.000 b\n20 3.000 c\n")
+
+            path = os.path.join(temp_dir, "hiscore.bin")
+            store = open_store("binary", path, 10)
+
+            self.assertIsInstance(store, BinaryStore)
+            self.assertListEqual(
+                store.top(),
+                [ScoreRecord(30, 2.0, "b"), ScoreRecord(20, 3.0, "c"), ScoreRecord(10)]
+            )
+
+            store.add(ScoreRecord(5, 4.0, "d"))
+            self.assertEqual(len(open_store("binary", path, 10).top()), 4)
+
+
+    def test_invalid(self):
+        """Unknown backends are an error"""
+        with self.assertRaises(ValueError):
+            open_store("punch cards", "/tmp/test/hiscore.txt")
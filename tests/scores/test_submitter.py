@@ -0,0 +1,87 @@
+"""Test sending scores to the leaderboard service"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import unittest
+
+from scores.record import ScoreRecord
+from scores.service import LeaderboardService
+from scores.submitter import ScoreSubmitter
+from tests import free_port
+
+
+class TestScoreSubmitter(unittest.TestCase):
+    """Run the service on a loopback port in another thread"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory() #pylint: disable=consider-using-with
+        self.service = LeaderboardService(
+            "text",
+            os.path.join(self.temp_dir.name, "hiscore.txt")
+        )
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever)
+        self.thread.start()
+        self.port = self.call(self.service.start())
+
+
+    def tearDown(self):
+        self.call(self.service.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.temp_dir.cleanup()
+
+
+    def call(self, coroutine):
+        """Run a coroutine on the service's loop, and wait for it.
+
+        :param coroutine: The coroutine to run.
+
+        :return: What it returned.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(5)
+
+
+    def test_submit(self):
+        """Submitted records are sent before closing"""
+        submitter = ScoreSubmitter(f"http://127.0.0.1:{self.port}/")
+        for score in range(5):
+            submitter.submit(ScoreRecord(score, float(score), f"game{score}"))
+
+        self.assertTrue(submitter.close(5))
+        self.assertEqual(submitter.sent, 5)
+        self.assertListEqual(
+            [record.score for record in self.call(self.service.top(10))],
+            [4, 3, 2, 1, 0]
+        )
+
+
+    def test_service_down(self):
+        """Records are kept while the service can't be reached"""
+        submitter = ScoreSubmitter(
+            f"http://127.0.0.1:{free_port()}",
+            retry_interval=0.01,
+            max_pending=2
+        )
+        for score in range(3):
+            submitter.submit(ScoreRecord(score))
+
+        self.assertFalse(submitter.close(5))
+        self.assertEqual(submitter.sent, 0)
+        self.assertListEqual(
+            [record.score for record in submitter.pending],
+            [1, 2]
+        )
+
+
+    def test_rejected(self):
+        """Records the service refuses are dropped"""
+        submitter = ScoreSubmitter(f"http://127.0.0.1:{self.port}")
+        submitter.submit(ScoreRecord(True)) #type: ignore
+
+        self.assertTrue(submitter.close(5))
+        self.assertEqual(submitter.rejected, 1)
+        self.assertEqual(submitter.sent, 0)
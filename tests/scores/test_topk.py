@@ -0,0 +1,79 @@
+"""Test streaming top-K selection"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from scores.record import ScoreRecord, rank_key
+from scores.topk import iter_records, top_k
+
+
+class TestTopK(unittest.TestCase):
+    """Test the bounded heap"""
+
+    def test_top_k(self):
+        """Same result as sorting everything"""
+        rng = random.Random(0)
+        records = [
+            ScoreRecord(rng.randrange(1000), rng.random(), f"{num:x}")
+            for num in range(10_000)
+        ]
+
+        self.assertListEqual(
+            top_k(iter(records), 10),
+            sorted(records, key=rank_key)[:10]
+        )
+
+
+    def test_ties(self):
+        """Ties go to the earliest timestamp, then the first seen"""
+        records = [
+            ScoreRecord(5, 2.0, "a"),
+            ScoreRecord(5),
+            ScoreRecord(5, 1.0, "b"),
+            ScoreRecord(5)
+        ]
+
+        self.assertListEqual(
+            top_k(records, 3),
+            [ScoreRecord(5), ScoreRecord(5), ScoreRecord(5, 1.0, "b")]
+        )
+        self.assertListEqual(top_k(records, 0), [])
+
+
+    def test_duplicates(self):
+        """Records with the same game ID are only kept once"""
+        records = [
+            ScoreRecord(5, 1.0, "a"),
+            ScoreRecord(3, 1.0, "b"),
+            ScoreRecord(5, 1.0, "a"),
+            ScoreRecord(1, 1.0, "c"),
+            ScoreRecord(4, 1.0, "d"),
+            ScoreRecord(3, 1.0, "b")
+        ]
+
+        self.assertListEqual(
+            [record.game_id for record in top_k(records, 2)],
+            ["a", "d"]
+        )
+        self.assertListEqual(
+            [record.game_id for record in top_k(records, 10)],
+            ["a", "d", "b", "c"]
+        )
+
+
+    def test_iter_records(self):
+        """Stream a file's records, skipping the broken lines"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "hiscore.txt")
+
+            self.assertListEqual(list(iter_records(path)), [])
+
+            with open(path, "wt", encoding="UTF-8") as file:
+                file.write("5\n\nnot a score\n3 1.000 a\n")
+
+            self.assertListEqual(
+                list(iter_records(path)),
+                [ScoreRecord(5), ScoreRecord(3, 1.0, "a")]
+            )
@@ -6,16 +6,24 @@ import unittest
 from collections import deque
 
 from entities.pellet import Pellet
+from entities.compact import CompactPlayer
 from entities.player import Facing, Player
+from entities.runs import RunLengthPlayer
 from entities.segment import Segment
+from entities.sparse import SparseGrid
+from entities.vacate import VacateGrid
 from state.game import Game
+from state.hiscore import HighScore
 from state.state import State
-from tests import window_to_list
+from state.stats import Death, GameStats
+from tests import MockWindow, ScriptedWindow, compose, window_to_list
+from utils.clock import VirtualClock
+from utils.profiling import PHASES, FrameProfiler
 
 
 # we are deliberately accesssing protected members to test their functionality
 #pylint: disable=protected-access
-class TestGame(unittest.TestCase):
+class TestGame(unittest.TestCase): #pylint: disable=too-many-public-methods
     """Test Game methods"""
 
     def setUp(self):
@@ -39,6 +47,7 @@ class TestGame(unittest.TestCase):
 
         self.assertIsInstance(game.player, Player)
         self.assertEqual(game.score,  0)
+        self.assertEqual(game.ticks, 0)
 
         self.assertIsInstance(game.pellets, list)
         self.assertEqual(len(game.pellets), 1)
@@ -91,6 +100,7 @@ class TestGame(unittest.TestCase):
 
         game.key_pressed(ord("q"))
         self.assertTrue(game.done)
+        self.assertEqual(game.death, Death.QUIT)
 
 
     def test_update_pause_move(self):
@@ -103,10 +113,13 @@ class TestGame(unittest.TestCase):
         game.update()
         self.assertTrue(game.player.head(), Segment(2, 2))
 
+        self.assertEqual(game.ticks, 0)
+
         # update moves the snake
         game.paused = False
         game.update()
         self.assertTrue(game.player.head(), Segment(1, 2))
+        self.assertEqual(game.ticks, 1)
 
 
     def test_update_out_of_bounds(self):
@@ -125,6 +138,7 @@ class TestGame(unittest.TestCase):
 
         # game has ended
         self.assertTrue(game.done)
+        self.assertEqual(game.death, Death.WALL)
         # Head segment is out of bounds
         self.assertListEqual(
             game.player.segments,
@@ -153,6 +167,7 @@ class TestGame(unittest.TestCase):
 
         # game has ended
         self.assertTrue(game.done)
+        self.assertEqual(game.death, Death.BODY)
         # head now overlaps tail
         self.assertListEqual(
             game.player.segments,
@@ -220,6 +235,7 @@ class TestGame(unittest.TestCase):
         game.update()
 
         self.assertTrue(game.done)
+        self.assertEqual(game.death, Death.FILLED)
         self.assertListEqual(game.pellets, [])
         # not self-overlapped
         self.assertFalse(game.player.check_body_hit())
@@ -227,6 +243,167 @@ class TestGame(unittest.TestCase):
         self.assertFalse(game.player.check_out_of_bounds(*game._bounds()))
 
 
+    def test_stats(self):
+        """Count turns and time spent paused"""
+        clock = VirtualClock()
+        game = Game(20, 20, 10, clock=clock)
+        game.pellets = [Pellet(1, 1)]
+
+        game.key_pressed(ord("w"))
+        game.update()
+        game.key_pressed(ord("w"))
+        game.update()
+        game.key_pressed(ord("d"))
+        game.update()
+
+        game.key_pressed(ord("p"))
+        clock.advance(2_000)
+        game.key_pressed(ord("p"))
+        game.key_pressed(ord("p"))
+        clock.advance(500)
+
+        self.assertEqual(game.death, Death.NONE)
+        self.assertEqual(
+            game.stats(),
+            GameStats(3, 0, 2, 2_500, Death.NONE)
+        )
+
+
+    def test_reset(self):
+        """Reset a finished game, keeping its window, snake and pellet list"""
+        game = Game(20, 20, 10, clock=VirtualClock())
+        window = game.window
+        player = game.player
+        pellets = game.pellets
+        random.seed(0)
+
+        game.key_pressed(ord("p"))
+        game.score = 4
+        game.ticks = 12
+        game.player._new_segment()
+        game.key_pressed(ord("q"))
+
+        game.reset()
+
+        self.assertFalse(game.done)
+        self.assertFalse(game.paused)
+        self.assertEqual(game.stats(), GameStats(0, 0, 0, 0, Death.NONE))
+        self.assertIs(game.window, window)
+        self.assertIs(game.player, player)
+        self.assertIs(game.pellets, pellets)
+        self.assertEqual(len(game.pellets), 1)
+        self.assertListEqual(
+            game.player.segments,
+            Player(10, (20 - game.header) // 2, 5).segments
+        )
+
+
+    def test_player_types(self):
+        """Play with the body stored as runs, and in arrays"""
+        for player_type in (RunLengthPlayer, CompactPlayer):
+            with self.subTest(player_type=player_type.__name__):
+                game = Game(
+                    20,
+                    20,
+                    10,
+                    clock=VirtualClock(),
+                    player_type=player_type
+                )
+                head = game.player.head()
+                game.pellets = [Pellet(head.x_pos - 1, head.y_pos)]
+
+                game.update()
+                game.update()
+                game.draw()
+
+                self.assertIsInstance(game.player, player_type)
+                self.assertEqual(game.score, 1)
+                self.assertEqual(len(game.player), 6)
+                self.assertFalse(game.done)
+
+
+    def test_many_pellets(self):
+        """Keep many pellets on the field, replacing each one eaten"""
+        random.seed(0)
+        game = Game(20, 20, 10, pellet_count=50)
+
+        # random cells are checked against a grid, not the whole body
+        self.assertIsInstance(game.player.grid, VacateGrid)
+        self.assertEqual(len(game.pellets), 50)
+        self.assertEqual(len({(p.x_pos, p.y_pos) for p in game.pellets}), 50)
+        self.assertFalse(
+            any(game.player.space_occupied(p.x_pos, p.y_pos) for p in game.pellets)
+        )
+
+        # swap a pellet for one in front of the snake
+        head = game.player.head()
+        front = Pellet(head.x_pos - 1, head.y_pos)
+        game.pellets = [p for p in game.pellets if p != front][:49] + [front]
+        game.update()
+
+        self.assertEqual(game.score, 1)
+        self.assertEqual(len(game.pellets), 50)
+        self.assertNotIn((head.x_pos, head.y_pos), game.pellet_map)
+        self.assertFalse(
+            any(game.player.space_occupied(p.x_pos, p.y_pos) for p in game.pellets)
+        )
+
+        game.reset()
+        self.assertEqual(len(game.pellets), 50)
+
+
+    def test_many_pellets_fill(self):
+        """Stop adding pellets when the field is full"""
+        game = Game(5, 5, 10, pellet_count=100)
+
+        # 3x2 field, and the snake starts with 2 segments on it
+        self.assertEqual(len(game.pellets), 4)
+
+
+    def test_sparse(self):
+        """A sparse game keeps its snake in a sparse grid, and plays the same
+        as any other"""
+        random.seed(0)
+        game = Game(20, 20, 10, pellet_count=20, sparse=True)
+
+        self.assertIsInstance(game.player.grid, SparseGrid)
+        self.assertEqual(len(game.player.grid), 5)
+        self.assertEqual(len(game.pellets), 20)
+        self.assertFalse(
+            any(game.player.space_occupied(p.x_pos, p.y_pos) for p in game.pellets)
+        )
+
+        head = game.player.head()
+        front = Pellet(head.x_pos - 1, head.y_pos)
+        game.pellets = [p for p in game.pellets if p != front][:19] + [front]
+        game.update()
+        self.assertEqual(game.score, 1)
+        self.assertEqual(len(game.pellets), 20)
+
+        # turn back onto the body
+        game.player.add_facing_to_buffer(Facing.UP)
+        game.player.add_facing_to_buffer(Facing.RIGHT)
+        game.update()
+        game.update()
+        game.player.add_facing_to_buffer(Facing.DOWN)
+        game.update()
+        self.assertEqual(game.death, Death.BODY)
+
+        game.reset()
+        self.assertEqual(len(game.player.grid), 5)
+        self.assertEqual(len(game.pellets), 20)
+
+
+    def test_sparse_fill(self):
+        """A nearly full sparse game lists the free cells"""
+        game = Game(5, 5, 10, pellet_count=100, sparse=True)
+
+        self.assertEqual(len(game.pellets), 4)
+        self.assertFalse(
+            any(game.player.space_occupied(p.x_pos, p.y_pos) for p in game.pellets)
+        )
+
+
     def test_draw_header(self):
         """Make sure the header draws in the window"""
 
@@ -309,6 +486,38 @@ class TestGame(unittest.TestCase):
         )
 
 
+    def test_bounds_cached(self):
+        """The bounds don't query the canvas until the layout changes"""
+
+        class MockWindowGetmaxyx(MockWindow): #pylint: disable=too-few-public-methods
+            """Count the calls to getmaxyx."""
+
+            def __init__(self, window):
+                super().__init__(window)
+                self.calls = 0
+
+            def getmaxyx(self) -> tuple[int, int]:
+                """Count the call and pass it through."""
+                self.calls += 1
+                return self.window.getmaxyx()
+
+        game = Game(6, 6, 10)
+        canvas = MockWindowGetmaxyx(game.canvas)
+        game.canvas = canvas #type: ignore
+
+        for _ in range(3):
+            game._bounds()
+            game.update()
+        self.assertEqual(canvas.calls, 0)
+
+        # a resize shrinks the canvas, the relayout puts it back
+        canvas.window.resize(3, 3)
+        game.request_relayout()
+        game.relayout()
+        self.assertEqual(canvas.calls, 1)
+        self.assertTupleEqual(game._bounds(), (1, 5, 1, 4))
+
+
     def test_new_pellet(self):
         """Make new pellets until you can't"""
         random.seed(0)
@@ -348,3 +557,48 @@ class TestGame(unittest.TestCase):
                 Pellet(1, 1)
             ]
         )
+
+
+    def test_run_session(self):
+        """Play a whole session on a virtual clock, without waiting"""
+        clock = VirtualClock()
+        game = Game(20, 10, 10, clock=clock)
+
+        # turn up, then left, then let the snake run into the wall
+        game.window = ScriptedWindow( #type: ignore
+            game.window,
+            [-1, ord("w"), -1, ord("a"), -1]
+        )
+        random.seed(0)
+        game.run()
+
+        self.assertTrue(game.done)
+        # one move up, then ten moves left into the wall
+        self.assertEqual(game.player.head(), Segment(0, 3))
+        # one frame before the first input, then one per update, 0.1s each
+        self.assertEqual(clock.now_ns(), 12 * 100_000_000)
+
+        high_score = HighScore(20, 10, game.score, None, clock)
+        high_score.window = ScriptedWindow( #type: ignore
+            high_score.window,
+            [ord(" ")]
+        )
+        high_score.run()
+
+        self.assertTrue(high_score.replay)
+
+
+    def test_profiler_hud(self):
+        """The profiler's HUD is drawn over the field, and isn't covered by
+        it or the header"""
+        game = Game(40, 12, 10, FrameProfiler(), VirtualClock())
+        game.window = ScriptedWindow( #type: ignore
+            game.window,
+            [FrameProfiler.toggle_key, -1, -1, -1, ord("q")]
+        )
+        game.run()
+
+        screen = compose(game.windows, 12, 40)
+        self.assertTrue(screen[0].startswith("Score: 0"))
+        for row, phase in enumerate(PHASES, 1):
+            self.assertTrue(screen[row].startswith(phase))
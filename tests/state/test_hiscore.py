@@ -3,15 +3,23 @@
 import curses
 import os
 import tempfile
+import time
 import unittest
+from unittest.mock import patch
 
+from scores import BinaryStore, JournalStore, SqliteStore
+from scores.background import BackgroundScores
+from scores.record import ScoreRecord
+from scores.record import parse_record
+from scores.submitter import ScoreSubmitter
 from state.hiscore import HighScore
-from tests import window_to_list
+from tests import free_port, window_to_list
+from utils.clock import VirtualClock
 
 
 # we are deliberately accesssing protected members to test their functionality
 #pylint: disable=protected-access
-class TestHiscore(unittest.TestCase):
+class TestHiscore(unittest.TestCase): #pylint: disable=too-many-public-methods
     """Test the high score state"""
 
     def setUp(self):
@@ -34,9 +42,15 @@ class TestHiscore(unittest.TestCase):
 
             self.assertEqual(hiscore.save_dir, save_dir)
             self.assertEqual(hiscore.file_path, f"{save_dir}/hiscore.txt")
+            self.assertIsInstance(hiscore.store, JournalStore)
 
+            # the score is journaled, the snapshot isn't rewritten
             with open(f"{save_dir}/hiscore.txt", "rt", encoding="UTF-8") as save_file:
-                self.assertListEqual(save_file.readlines(), ["15\n"])
+                self.assertListEqual(save_file.readlines(), [])
+            with open(f"{save_dir}/hiscore.journal", "rt", encoding="UTF-8") as journal:
+                lines = journal.readlines()
+            self.assertEqual(len(lines), 1)
+            self.assertEqual(parse_record(lines[0]).score, 15) #type: ignore
 
 
     def test_creation_invalid_dir(self):
@@ -52,6 +66,7 @@ class TestHiscore(unittest.TestCase):
 
         self.assertEqual(hiscore.save_dir, None)
         self.assertEqual(hiscore.file_path, None)
+        self.assertEqual(hiscore.store, None)
 
 
     def test_key_pressed_q(self):
@@ -142,8 +157,8 @@ class TestHiscore(unittest.TestCase):
 
             hiscore._get_saved_scores()
 
-            # current score isn't added yet
-            self.assertListEqual(hiscore.scores, [20, 10, 5])
+            # this game's score was already journaled
+            self.assertListEqual(hiscore.scores, [20, 15, 10, 5])
 
 
     def test_get_saved_scores_invalid_dir(self):
@@ -159,21 +174,29 @@ class TestHiscore(unittest.TestCase):
 
 
     def test_save_scores_valid_dir(self):
-        """Remove the file manually, then rewrite it using the function"""
+        """Each save appends a record to the journal, timestamped with the
+        wall time even on a virtual clock"""
 
         with tempfile.TemporaryDirectory() as temp_dir:
             save_dir = f"{temp_dir}/test"
-            hiscore_file = f"{save_dir}/hiscore.txt"
+            journal_file = f"{save_dir}/hiscore.journal"
 
-            hiscore = HighScore(40, 10, 15, save_dir)
-            os.remove(hiscore_file)
+            hiscore = HighScore(40, 10, 15, save_dir, VirtualClock(2_500_000_000))
+            os.remove(journal_file)
 
+            before = time.time()
             hiscore._save_scores()
-            with open(hiscore_file, "rt", encoding="UTF-8") as stream:
-                self.assertListEqual(
-                    stream.readlines(),
-                    ["15\n"]
-                )
+            after = time.time()
+            with open(journal_file, "rt", encoding="UTF-8") as stream:
+                lines = stream.readlines()
+
+            self.assertEqual(len(lines), 1)
+            record = parse_record(lines[0])
+            self.assertEqual(record.score, 15) #type: ignore
+            # the journal keeps milliseconds
+            self.assertGreaterEqual(record.timestamp, round(before, 3) - 0.001) #type: ignore
+            self.assertLessEqual(record.timestamp, after + 0.001) #type: ignore
+            self.assertEqual(len(record.game_id), 32) #type: ignore
 
 
     def test_save_scores_invalid_dir(self):
@@ -264,3 +287,183 @@ class TestHiscore(unittest.TestCase):
                 5
             ]
         )
+
+
+    def test_reset(self):
+        """Show another game's score, keeping the window and the store"""
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            hiscore = HighScore(5, 5, 15, temp_dir, backend="sqlite")
+            window = hiscore.window
+            store = hiscore.store
+            hiscore.key_pressed(ord(" "))
+
+            hiscore.reset(20, 40)
+
+            self.assertFalse(hiscore.done)
+            self.assertFalse(hiscore.replay)
+            self.assertListEqual(hiscore.scores, [20, 15])
+            self.assertIs(hiscore.window, window)
+            self.assertIs(hiscore.store, store)
+
+            hiscore.close()
+            self.assertIsNone(hiscore.store)
+            self.assertListEqual(hiscore.windows, [])
+
+
+    def test_sqlite_backend(self):
+        """Save the score with the game's details to a database"""
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            save_dir = f"{temp_dir}/test"
+
+            hiscore = HighScore(
+                40, 10, 15, save_dir, VirtualClock(), backend="sqlite", ticks=90
+            )
+
+            self.assertEqual(hiscore.file_path, f"{save_dir}/hiscore.sqlite3")
+            self.assertIsInstance(hiscore.store, SqliteStore)
+            self.assertListEqual(hiscore.scores, [15])
+
+            record = hiscore.store.top()[0] #type: ignore
+            self.assertEqual(record.ticks, 90)
+            self.assertEqual((record.width, record.height), (40, 10))
+            self.assertNotEqual(record.player, "")
+            hiscore.store.close() #type: ignore
+
+
+    @patch("getpass.getuser", side_effect=OSError("no login name"))
+    def test_no_player_name(self, _):
+        """The score is still saved when there's no login name"""
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            hiscore = HighScore(
+                40, 10, 15, f"{temp_dir}/test", VirtualClock(), backend="sqlite"
+            )
+
+            record = hiscore.store.top()[0] #type: ignore
+            self.assertEqual(record.score, 15)
+            self.assertEqual(record.player, "")
+            hiscore.store.close() #type: ignore
+
+
+    def test_binary_backend(self):
+        """Migrate the text scores, then save to the binary file"""
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            save_dir = f"{temp_dir}/test"
+            os.makedirs(save_dir)
+            with open(f"{save_dir}/hiscore.txt", "wt", encoding="UTF-8") as file:
+                file.write("20\n10\n")
+
+            hiscore = HighScore(40, 10, 15, save_dir, VirtualClock(), backend="binary")
+
+            self.assertEqual(hiscore.file_path, f"{save_dir}/hiscore.bin")
+            self.assertIsInstance(hiscore.store, BinaryStore)
+            self.assertListEqual(hiscore.scores, [20, 15, 10])
+            self.assertListEqual(
+                [record.score for record in hiscore.store.top()], #type: ignore
+                [20, 15, 10]
+            )
+
+
+    def test_background(self):
+        """Show the screen first, then save and merge the loaded scores"""
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            save_dir = f"{temp_dir}/test"
+            background = BackgroundScores(save_dir)
+            background.save(ScoreRecord(20, 1.0, "old"))
+            background.preload()
+
+            hiscore = HighScore(40, 10, 15, save_dir, background=background)
+
+            # nothing is touched until the screen is updated
+            self.assertEqual(hiscore.file_path, f"{save_dir}/hiscore.txt")
+            self.assertIsNone(hiscore.store)
+            self.assertListEqual(hiscore.scores, [15])
+
+            hiscore._loading.result() #type: ignore
+            hiscore.update()
+
+            self.assertListEqual(hiscore.scores, [20, 15])
+            self.assertIsNone(hiscore._loading)
+
+            hiscore._saving.result() #type: ignore
+            background.shutdown()
+
+            self.assertListEqual(
+                [record.score for record in JournalStore(
+                    f"{save_dir}/hiscore.txt",
+                    f"{save_dir}/hiscore.journal"
+                ).top()],
+                [20, 15]
+            )
+
+
+    def test_background_errors(self):
+        """Say why the scores couldn't be loaded or saved"""
+
+        class BrokenScores(BackgroundScores):
+            """Fails to load or save, on the worker thread."""
+
+            def __init__(self, save_dir: str, failing: str):
+                super().__init__(save_dir)
+                self.failing = failing
+
+            def _load(self) -> list[ScoreRecord]:
+                if self.failing == "load":
+                    raise OSError("corrupt")
+                return super()._load()
+
+            def _save(self, record: ScoreRecord):
+                if self.failing == "save":
+                    raise OSError("disk full")
+                super()._save(record)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for failing, error in [
+                ("load", "Unable to load scores: corrupt"),
+                ("save", "Unable to save this score: disk full")
+            ]:
+                with self.subTest(failing=failing):
+                    background = BrokenScores(f"{temp_dir}/{failing}", failing)
+                    hiscore = HighScore(40, 10, 15, None, background=background)
+
+                    # start the save, then wait for both before checking
+                    hiscore.update()
+                    background.shutdown()
+                    hiscore.update()
+
+                    self.assertEqual(hiscore.error, error)
+                    hiscore.draw()
+                    self.assertEqual(
+                        "".join(window_to_list(hiscore.window)[0]).rstrip(), #type: ignore
+                        error
+                    )
+
+
+    def test_submitter(self):
+        """Queue the score for the leaderboard service, with or without a save
+        directory"""
+
+        submitter = ScoreSubmitter(
+            f"http://127.0.0.1:{free_port()}",
+            retry_interval=0.01
+        )
+        HighScore(40, 10, 15, None, VirtualClock(), ticks=90, submitter=submitter)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            save_dir = f"{temp_dir}/test"
+            background = BackgroundScores(save_dir)
+            hiscore = HighScore(
+                40, 10, 25, save_dir, background=background, submitter=submitter
+            )
+            hiscore.update()
+            background.shutdown()
+
+        submitter.close(5)
+        self.assertListEqual(
+            [(record.score, record.ticks) for record in submitter.pending],
+            [(15, 90), (25, 0)]
+        )
@@ -0,0 +1,87 @@
+"""Test running a session through the state manager"""
+
+import curses
+import os
+import random
+import tempfile
+import unittest
+
+from scores.stats import StatsBuffer
+from state.manager import StateManager
+from state.stats import Death
+from tests import ScriptedWindow
+from utils.clock import VirtualClock
+
+
+class TestStateManager(unittest.TestCase):
+    """Test reusing the states between games"""
+
+    def setUp(self):
+        curses.initscr()
+
+
+    def test_replay_reuses_states(self):
+        """A replay resets the same states, windows, snake and pellets"""
+        manager = StateManager(20, 10, clock=VirtualClock())
+
+        game = manager.next_game()
+        high_score = manager.next_high_score(3, 30)
+        windows = [*game.windows, *high_score.windows]
+        player = game.player
+        segments = list(game.player.segments)
+        pellets = game.pellets
+
+        game.score = 3
+        game.player.move()
+        game.end()
+
+        self.assertIs(manager.next_game(), game)
+        self.assertIs(manager.next_high_score(0, 0), high_score)
+        self.assertListEqual([*game.windows, *high_score.windows], windows)
+        self.assertIs(game.player, player)
+        self.assertIs(game.pellets, pellets)
+        self.assertTrue(
+            all(new is old for new, old in zip(game.player.segments, segments))
+        )
+        self.assertFalse(game.done)
+        self.assertEqual(game.score, 0)
+        self.assertListEqual(high_score.scores, [0])
+        self.assertEqual(manager.pool.created, 3)
+
+
+    def test_play(self):
+        """Play, replay, then quit, with one set of windows"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stats = StatsBuffer(os.path.join(temp_dir, "stats.bin"))
+            self._play(stats)
+
+        self.assertEqual(len(stats), 2)
+        self.assertListEqual(list(stats.columns["death"]), [Death.QUIT] * 2)
+
+
+    def _play(self, stats: StatsBuffer):
+        """Play two games with scripted keys, then close the manager.
+
+        :param stats: Collects the statistics of the games.
+        """
+        manager = StateManager(20, 10, stats=stats, clock=VirtualClock())
+        game = manager.next_game()
+        high_score = manager.next_high_score(0, 0)
+
+        # quit each game straight away, replay once, then quit
+        game.window = ScriptedWindow(game.window, [ord("q")]) #type: ignore
+        high_score.window = ScriptedWindow( #type: ignore
+            high_score.window,
+            [ord(" "), ord("q")]
+        )
+        random.seed(0)
+        manager.play()
+
+        self.assertFalse(high_score.replay)
+        self.assertEqual(manager.pool.created, 3)
+
+        high_score.window = high_score.window.window #type: ignore
+        game.window = game.window.window #type: ignore
+        manager.close()
+        self.assertIsNone(manager.game)
+        self.assertEqual(sum(map(len, manager.pool.free.values())), 3)
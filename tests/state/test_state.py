@@ -1,11 +1,13 @@
 """Test the base state"""
 
 import curses
-import time
 import unittest
 
 from state.state import State
-from tests import MockWindow, timeout_wrapper, window_to_list
+from state.windows import WindowPool
+from utils.clock import VirtualClock
+from utils.profiling import PHASES, FrameProfiler
+from tests import MockWindow, window_to_list
 
 
 # we are deliberately accesssing protected members to test their functionality
@@ -53,15 +55,19 @@ class TestState(unittest.TestCase):
                     return ord("q")
                 return -1
 
-        with timeout_wrapper(0.5):
-            state = State(5, 5, 1000, True)
-            # the mock isn't technically a window object, but the MockWindow is
-            # explicitly compatible
-            state.window = ( #type: ignore
-                MockWindowGetch(state.window)
-            )
+        clock = VirtualClock()
+        state = State(5, 5, 1000, True, clock=clock)
+        # the mock isn't technically a window object, but the MockWindow is
+        # explicitly compatible
+        state.window = ( #type: ignore
+            MockWindowGetch(state.window)
+        )
+
+        state.run()
 
-            state.run()
+        self.assertTrue(state.done)
+        # one frame before the first input, then one per update, 1ms each
+        self.assertEqual(clock.now_ns(), 6 * 1_000_000)
 
 
     def test_key_pressed(self):
@@ -287,7 +293,8 @@ class TestState(unittest.TestCase):
     def test_frame(self):
         """clear, draw, present, wait"""
 
-        state = State(5, 5, 10, True)
+        clock = VirtualClock()
+        state = State(5, 5, 10, True, clock=clock)
 
         state.window.addstr(1, 1, "abc")
         self.assertListEqual(
@@ -301,7 +308,6 @@ class TestState(unittest.TestCase):
             ]
         )
 
-        start = time.time_ns()
         state._frame()
         self.assertListEqual(
             window_to_list(state.window), #type: ignore
@@ -313,11 +319,8 @@ class TestState(unittest.TestCase):
                 [chr(0x2514), chr(0x2500), chr(0x2500), chr(0x2500), chr(0x2518)]
             ]
         )
-        # waited at least 99 miliseconds
-        self.assertGreaterEqual(
-            time.time_ns() - start,
-            99_000_000
-        )
+        # waited for the rest of the frame
+        self.assertEqual(clock.now_ns(), 100_000_000)
 
 
     def test_preframe(self):
@@ -352,7 +355,8 @@ class TestState(unittest.TestCase):
     def test_postframe(self):
         """present, wait"""
 
-        state = State(5, 5, 10, True)
+        clock = VirtualClock()
+        state = State(5, 5, 10, True, clock=clock)
 
         state.window.addstr(1, 1, "abc")
         self.assertListEqual(
@@ -366,7 +370,6 @@ class TestState(unittest.TestCase):
             ]
         )
 
-        start = time.time_ns()
         state._postframe()
         self.assertListEqual(
             window_to_list(state.window), #type: ignore
@@ -378,8 +381,104 @@ class TestState(unittest.TestCase):
                 [" ", " ", " ", " ", " "]
             ]
         )
-        # waited at least 99 miliseconds
-        self.assertGreaterEqual(
-            time.time_ns() - start,
-            99_000_000
+        # waited for the rest of the frame
+        self.assertEqual(clock.now_ns(), 100_000_000)
+
+
+    def test_notify_resize(self):
+        """Only the running state is flagged for a relayout"""
+
+        state = State(5, 5, 10, True)
+        self.assertFalse(state._relayout_pending)
+
+        State.notify_resize()
+        self.assertFalse(state._relayout_pending)
+
+        State.active = state
+        State.notify_resize()
+        self.assertTrue(state._relayout_pending)
+        State.active = None
+
+
+    def test_relayout(self):
+        """Resize the window back to the state's size and clear the flag"""
+
+        state = State(5, 5, 10, True)
+        state.window.resize(3, 3)
+        state.request_relayout()
+
+        state.relayout()
+
+        self.assertFalse(state._relayout_pending)
+        self.assertTupleEqual(state.window.getmaxyx(), (5, 5))
+
+
+    def test_reset(self):
+        """Reset a finished state to run again, in the same window"""
+
+        clock = VirtualClock()
+        state = State(5, 5, 10, True, clock=clock)
+        window = state.window
+        state.end()
+        state._keys_pressed.append(ord("q"))
+        state.window.resize(3, 3)
+        clock.advance(5_000_000_000)
+
+        state.reset()
+
+        self.assertFalse(state.done)
+        self.assertListEqual(state._keys_pressed, [])
+        self.assertIs(state.window, window)
+        self.assertTupleEqual(state.window.getmaxyx(), (5, 5))
+        self.assertEqual(state._State__last_frame, clock.now_ns()) #type: ignore
+
+
+    def test_pooled_windows(self):
+        """Windows come from the pool, and go back to it when closed"""
+
+        pool = WindowPool()
+        first = State(5, 5, 10, True, pool=pool)
+        window = first.window
+        first.close()
+
+        second = State(5, 5, 10, False, pool=pool)
+
+        self.assertListEqual(first.windows, [])
+        self.assertIs(second.window, window)
+        self.assertEqual(pool.created, 1)
+
+
+    def test_run_profiled(self):
+        """Run with a profiler, toggling the HUD with its key"""
+
+        class MockWindowGetch(MockWindow): #pylint: disable=too-few-public-methods
+            """Mock a window object with getch's functionality changed."""
+
+            def __init__(self, window):
+                super().__init__(window)
+                self.__calls = 0
+
+            def getch(self) -> int:
+                """Toggle the HUD on the first frame, quit on the fourth."""
+                self.__calls += 1
+                keys = {
+                    1: FrameProfiler.toggle_key,
+                    5: ord("q")
+                }
+                return keys.get(self.__calls, -1)
+
+        profiler = FrameProfiler()
+        clock = VirtualClock()
+        state = State(30, 10, 1000, True, profiler, clock)
+        state.window = ( #type: ignore
+            MockWindowGetch(state.window)
         )
+
+        state.run()
+
+        # one frame before the first input, then one per update, 1ms each
+        self.assertEqual(clock.now_ns(), 5 * 1_000_000)
+
+        self.assertTrue(profiler.show_hud)
+        for phase in PHASES:
+            self.assertEqual(profiler.histograms[phase].total, 4)
@@ -0,0 +1,39 @@
+"""Test the window pool"""
+
+import curses
+import unittest
+
+from state.windows import WindowPool
+
+
+class TestWindowPool(unittest.TestCase):
+    """Test taking and giving back windows"""
+
+    def setUp(self):
+        curses.initscr()
+
+
+    def test_reuse(self):
+        """Released windows are reused by the next window of the same size"""
+        pool = WindowPool()
+
+        window = pool.acquire(5, 10, 1, 0)
+        window.addstr(0, 0, "left over")
+        pool.release(window)
+
+        self.assertIs(pool.acquire(5, 10, 1, 0), window)
+        self.assertEqual(window.instr(0, 0, 9), b"         ")
+        self.assertEqual(pool.created, 1)
+
+
+    def test_different_sizes(self):
+        """Windows are only reused at the same size and place"""
+        pool = WindowPool()
+
+        window = pool.acquire(5, 10)
+        pool.release(window)
+
+        self.assertIsNot(pool.acquire(5, 10, 1, 0), window)
+        self.assertIsNot(pool.acquire(6, 10), window)
+        self.assertIs(pool.acquire(5, 10), window)
+        self.assertEqual(pool.created, 3)
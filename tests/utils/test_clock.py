@@ -0,0 +1,55 @@
+"""Test the clocks"""
+
+import curses
+import time
+import unittest
+
+from utils.clock import Clock, VirtualClock
+
+
+class TestClock(unittest.TestCase):
+    """Test the real clock"""
+
+    def test_now(self):
+        """The real clock reads the wall time"""
+        before = time.time_ns()
+        now = Clock().now_ns()
+
+        self.assertLessEqual(before, now)
+        self.assertLessEqual(now, time.time_ns())
+
+
+    def test_sleep(self):
+        """The real clock actually waits"""
+        curses.initscr()
+
+        start = time.time_ns()
+        Clock().sleep_ms(10)
+
+        self.assertGreaterEqual(time.time_ns() - start, 9_000_000)
+
+
+class TestVirtualClock(unittest.TestCase):
+    """Test the virtual clock"""
+
+    def test_sleep(self):
+        """Sleeping moves the clock forward without waiting"""
+        clock = VirtualClock(5)
+
+        self.assertEqual(clock.now_ns(), 5)
+
+        start = time.time_ns()
+        clock.sleep_ms(60_000)
+
+        self.assertEqual(clock.now_ns(), 60_000_000_005)
+        self.assertLess(time.time_ns() - start, 1_000_000_000)
+
+
+    def test_advance(self):
+        """Advance by nanoseconds"""
+        clock = VirtualClock()
+
+        clock.advance(123)
+        clock.advance(7)
+
+        self.assertEqual(clock.now_ns(), 130)
@@ -5,7 +5,7 @@ import re
 import unittest
 
 from tests import window_to_list
-from utils.curses import Alignment, check_boundaries, get_old_cursor_visibility, printf
+from utils.curses import Alignment, check_boundaries, printf
 from utils.errors import WindowSizeError
 
 
@@ -154,21 +154,6 @@ class TestFunctions(unittest.TestCase):
             )
 
 
-    def test_get_old_cursor_visibility(self):
-        """Get the old cursor visibility"""
-
-        old_cursor = curses.curs_set(2)
-
-        try:
-            self.assertEqual(
-                get_old_cursor_visibility(),
-                2
-            )
-            self.assertEqual(curses.curs_set(1), 2)
-        finally:
-            curses.curs_set(old_cursor)
-
-
     def test_check_boundaries(self):
         """check the window boundaries"""
 
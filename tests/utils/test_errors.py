@@ -2,7 +2,7 @@
 
 import unittest
 
-from utils.errors import SnakeError, WindowSizeError
+from utils.errors import ScoreFileError, SnakeError, WindowSizeError
 
 
 class TestErr(unittest.TestCase):
@@ -19,6 +19,17 @@ class TestErr(unittest.TestCase):
             raise WindowSizeError()
 
 
+    def test_score_file_err(self):
+        """Make sure the score file error is both score file and snake error.
+        """
+
+        with self.assertRaises(ScoreFileError):
+            raise ScoreFileError()
+
+        with self.assertRaises(SnakeError):
+            raise ScoreFileError()
+
+
     def test_snake_err(self):
         """This is only one kind of error"""
 
@@ -0,0 +1,110 @@
+"""Test the frame profiler"""
+
+import curses
+import os
+import tempfile
+import unittest
+
+from utils.profiling import PHASES, FrameProfiler, Histogram, RingBuffer
+
+
+class TestRingBuffer(unittest.TestCase):
+    """Test the fixed-size timing buffer"""
+
+    def test_append(self):
+        """Fill the buffer, then overwrite the oldest values"""
+        ring = RingBuffer(3)
+
+        self.assertEqual(len(ring), 0)
+        self.assertListEqual(ring.values(), [])
+        self.assertEqual(ring.mean(), 0.0)
+
+        ring.append(1)
+        ring.append(2)
+        self.assertEqual(len(ring), 2)
+        self.assertListEqual(ring.values(), [1, 2])
+
+        ring.append(3)
+        ring.append(4)
+        self.assertEqual(len(ring), 3)
+        self.assertListEqual(ring.values(), [2, 3, 4])
+        self.assertEqual(ring.mean(), 3.0)
+
+
+class TestHistogram(unittest.TestCase):
+    """Test the power-of-two histogram"""
+
+    def test_percentile(self):
+        """Percentiles are the upper bound of the containing bucket"""
+        histogram = Histogram()
+
+        self.assertEqual(histogram.percentile(50), 0)
+
+        for value in [1, 2, 3, 100, 1000]:
+            histogram.add(value)
+
+        self.assertEqual(histogram.total, 5)
+        self.assertEqual(histogram.percentile(0), 1)
+        self.assertEqual(histogram.percentile(50), 3)
+        self.assertEqual(histogram.percentile(80), 127)
+        self.assertEqual(histogram.percentile(100), 1023)
+
+
+class TestFrameProfiler(unittest.TestCase):
+    """Test recording and reporting timings"""
+
+    def test_record(self):
+        """Timings go to the phase's buffer and histogram"""
+        profiler = FrameProfiler(4)
+
+        profiler.record("update", 2_000_000)
+
+        self.assertListEqual(profiler.recent["update"].values(), [2_000_000])
+        self.assertEqual(profiler.histograms["update"].total, 1)
+        self.assertEqual(profiler.histograms["draw"].total, 0)
+
+
+    def test_toggle_hud(self):
+        """Toggle the HUD on and off"""
+        profiler = FrameProfiler()
+
+        self.assertFalse(profiler.show_hud)
+        profiler.toggle_hud()
+        self.assertTrue(profiler.show_hud)
+        profiler.toggle_hud()
+        self.assertFalse(profiler.show_hud)
+
+
+    def test_hud(self):
+        """One line per phase, drawn in the top left"""
+        curses.initscr()
+        profiler = FrameProfiler()
+        profiler.record("scankeys", 1_500_000)
+
+        lines = profiler.hud_lines()
+        self.assertEqual(len(lines), len(PHASES))
+        self.assertEqual(lines[0], "scankeys      1.50 p99   2.10")
+
+        window = curses.newwin(10, 40)
+        profiler.draw_hud(window)
+        self.assertEqual(
+            window.instr(0, 0, len(lines[0])).decode(),
+            lines[0]
+        )
+
+
+    def test_write_summary(self):
+        """Write the table of percentiles to a file"""
+        profiler = FrameProfiler()
+        profiler.record("sleep", 1023)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "frames.txt")
+            profiler.write_summary(path)
+
+            with open(path, "rt", encoding="UTF-8") as file:
+                lines = file.readlines()
+
+        self.assertEqual(len(lines), len(PHASES) + 1)
+        self.assertTrue(lines[0].startswith("phase"))
+        self.assertEqual(lines[-1].split(), ["sleep", "1", "0.001", "0.001", "0.001", "0.001"])
@@ -0,0 +1,78 @@
+"""Test the sampling profiler"""
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from utils.sampling import SamplingProfiler
+
+
+# we are deliberately accesssing protected members to test their functionality
+#pylint: disable=protected-access
+class TestSamplingProfiler(unittest.TestCase):
+    """Test sampling and writing stacks"""
+
+    def test_sample(self):
+        """Sampling the current frame records the whole stack"""
+        profiler = SamplingProfiler()
+
+        profiler._sample(0, sys._getframe())
+        profiler._sample(0, sys._getframe())
+
+        self.assertEqual(profiler.samples, 2)
+        self.assertEqual(len(profiler.stacks), 1)
+
+        stack, count = next(iter(profiler.stacks.items()))
+        self.assertEqual(count, 2)
+        self.assertEqual(stack[-1].co_name, "test_sample")
+
+
+    def test_folded(self):
+        """Frames are joined outermost first, followed by the count"""
+        profiler = SamplingProfiler()
+
+        def inner():
+            profiler._sample(0, sys._getframe())
+
+        inner()
+
+        line = profiler.folded()[0]
+        frames, count = line.rsplit(" ", 1)
+        self.assertEqual(count, "1")
+        outer, innermost = frames.split(";")[-2:]
+        self.assertEqual(
+            outer,
+            f"test_folded (test_sampling.py:{self.test_folded.__code__.co_firstlineno})"
+        )
+        self.assertEqual(
+            innermost,
+            f"inner (test_sampling.py:{inner.__code__.co_firstlineno})"
+        )
+
+
+    @unittest.skipUnless(SamplingProfiler.available(), "no profiling timer")
+    def test_start_stop(self):
+        """Sample a busy loop with the timer, then write the stacks"""
+        profiler = SamplingProfiler(0.001)
+
+        profiler.start()
+        try:
+            end = time.process_time() + 0.1
+            while time.process_time() < end:
+                pass
+        finally:
+            profiler.stop()
+
+        self.assertGreater(profiler.samples, 0)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "stacks.folded")
+            profiler.write(path)
+
+            with open(path, "rt", encoding="UTF-8") as file:
+                lines = file.readlines()
+
+        self.assertEqual(len(lines), len(profiler.stacks))
+        self.assertTrue(any("test_start_stop" in line for line in lines))
@@ -0,0 +1,60 @@
+"""Clocks that the game loop reads the time from and sleeps with."""
+
+import curses
+import time
+
+
+class Clock:
+    """The real clock. Reads the wall time, and sleeps with curses."""
+
+    def now_ns(self) -> int:
+        """Get the current time.
+
+        :return: The current time in nanoseconds.
+        """
+        return time.time_ns()
+
+
+    def sleep_ms(self, milliseconds: int):
+        """Wait for the given amount of time.
+
+        :param milliseconds: Time to wait, in milliseconds.
+        """
+        curses.napms(milliseconds)
+
+
+class VirtualClock(Clock):
+    """A clock that only moves when it's told to. Sleeping advances it
+    instantly, so a state's loop runs as fast as the CPU allows while behaving
+    as though every frame took its full time.
+
+    :param start_ns: The time the clock starts at, in nanoseconds.
+    """
+
+    def __init__(self, start_ns: int = 0):
+        self.time_ns = start_ns
+        """The current virtual time in nanoseconds."""
+
+
+    def now_ns(self) -> int:
+        """Get the current virtual time.
+
+        :return: The current virtual time in nanoseconds.
+        """
+        return self.time_ns
+
+
+    def sleep_ms(self, milliseconds: int):
+        """Advance the clock instead of waiting.
+
+        :param milliseconds: Time to advance by, in milliseconds.
+        """
+        self.advance(milliseconds * 1_000_000)
+
+
+    def advance(self, nanoseconds: int):
+        """Move the clock forward.
+
+        :param nanoseconds: Time to advance by, in nanoseconds.
+        """
+        self.time_ns += nanoseconds
@@ -78,17 +78,6 @@ def printf( #pylint: disable=too-many-arguments,too-many-positional-arguments
             pass
 
 
-def get_old_cursor_visibility(_ = None) -> int:
-    """get the current cursor visibility state. Curses doesn't let you query
-    this directly.
-
-    :return: The old visibility state (0, 1, or 2)
-    """
-    old_cursor = curses.curs_set(0)
-    curses.curs_set(old_cursor)
-    return old_cursor
-
-
 def check_boundaries(window: curses.window, height: int, width: int):
     """Make sure the window is big enough for the game.
 
@@ -7,3 +7,7 @@ class SnakeError(Exception):
 
 class WindowSizeError(SnakeError):
     """Exception for the window being too small to fit the game screen."""
+
+
+class ScoreFileError(SnakeError):
+    """Exception for a score file that is corrupt, or in an unknown format."""
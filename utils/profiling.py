@@ -0,0 +1,199 @@
+"""Per-phase frame timing for the state loop."""
+
+from array import array
+import curses
+
+from utils.curses import printf
+
+
+PHASES = (
+    "scankeys",
+    "key_pressed",
+    "update",
+    "draw",
+    "refresh",
+    "sleep"
+)
+"""The phases of a frame, in the order they run."""
+
+
+class RingBuffer:
+    """Fixed-size buffer of the most recent timings, in nanoseconds. Once it is
+    full, new timings overwrite the oldest ones.
+
+    :param size: Number of timings to keep.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._values = array("q", bytes(8 * size))
+        self._index = 0
+        self._count = 0
+
+
+    def __len__(self) -> int:
+        """Number of timings currently stored."""
+        return self._count
+
+
+    def append(self, value: int):
+        """Add a timing, overwriting the oldest one if the buffer is full.
+
+        :param value: The timing to add.
+        """
+        self._values[self._index] = value
+        self._index = (self._index + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+
+    def values(self) -> list[int]:
+        """Get the stored timings.
+
+        :return: The stored timings, oldest first.
+        """
+        if self._count < self.size:
+            return self._values[:self._count].tolist()
+        return (
+            self._values[self._index:] + self._values[:self._index]
+        ).tolist()
+
+
+    def mean(self) -> float:
+        """Get the mean of the stored timings.
+
+        :return: The mean timing, or 0 if there are none.
+        """
+        if not self._count:
+            return 0.0
+        return sum(self._values[:self._count]) / self._count
+
+
+class Histogram:
+    """Histogram of every timing recorded, in power-of-two nanosecond buckets.
+    This keeps percentiles for the whole run in constant memory, accurate to
+    within a factor of two.
+    """
+
+    buckets = 64
+
+    def __init__(self):
+        self._counts = array("q", bytes(8 * self.buckets))
+        self.total = 0
+        """Number of timings recorded."""
+
+
+    def add(self, value: int):
+        """Record a timing.
+
+        :param value: The timing to record, in nanoseconds.
+        """
+        self._counts[max(value, 0).bit_length()] += 1
+        self.total += 1
+
+
+    def percentile(self, percent: float) -> int:
+        """Get the upper bound of the bucket that contains the percentile.
+
+        :param percent: The percentile, from 0 to 100.
+
+        :return: The upper bound of the bucket, in nanoseconds. 0 if nothing
+            has been recorded.
+        """
+        if not self.total:
+            return 0
+
+        target = self.total * percent / 100
+        seen = 0
+        for bucket, count in enumerate(self._counts):
+            seen += count
+            if count and seen >= target:
+                return (1 << bucket) - 1
+        return (1 << (self.buckets - 1)) - 1
+
+
+class FrameProfiler:
+    """Times each phase of every frame of a state's loop. Each phase keeps a
+    ring buffer of recent timings for the HUD, and a histogram over the whole
+    run for the summary.
+
+    :param size: Number of recent frames to keep for each phase.
+    """
+
+    toggle_key = curses.KEY_F3
+    """Key that shows and hides the HUD. It isn't passed on to the state."""
+
+    def __init__(self, size: int = 256):
+        self.recent = {phase: RingBuffer(size) for phase in PHASES}
+        """Recent timings for each phase."""
+        self.histograms = {phase: Histogram() for phase in PHASES}
+        """Timings over the whole run for each phase."""
+        self.show_hud = False
+        """Whether or not the HUD should be drawn over the frame."""
+
+
+    def record(self, phase: str, elapsed: int):
+        """Record the time a phase took.
+
+        :param phase: One of `PHASES`.
+        :param elapsed: Time the phase took, in nanoseconds.
+        """
+        self.recent[phase].append(elapsed)
+        self.histograms[phase].add(elapsed)
+
+
+    def toggle_hud(self):
+        """Show the HUD if it's hidden, and hide it otherwise."""
+        self.show_hud = not self.show_hud
+
+
+    def hud_lines(self) -> list[str]:
+        """Get the lines of the HUD: the recent mean and all-time p99 for each
+        phase, in milliseconds.
+
+        :return: One line per phase.
+        """
+        return [
+            f"{phase:<11} {self.recent[phase].mean() / 1e6:6.2f} "
+            f"p99 {self.histograms[phase].percentile(99) / 1e6:6.2f}"
+            for phase in PHASES
+        ]
+
+
+    def draw_hud(self, window: curses.window):
+        """Draw the HUD to the top left of the window.
+
+        :param window: The window to draw the HUD to.
+        """
+        for num, line in enumerate(self.hud_lines()):
+            printf(window, line, 0, num, len(line), "left")
+
+
+    def summary(self) -> str:
+        """Summarise the timings over the whole run.
+
+        :return: A table with the number of frames, and the p50, p90, p99 and
+            maximum bucket of each phase in milliseconds.
+        """
+        lines = [
+            f"{'phase':<11} {'frames':>8} {'p50':>8} {'p90':>8} {'p99':>8} "
+            f"{'max':>8}"
+        ]
+        for phase in PHASES:
+            histogram = self.histograms[phase]
+            lines.append(
+                f"{phase:<11} {histogram.total:>8} "
+                + " ".join(
+                    f"{histogram.percentile(percent) / 1e6:>8.3f}"
+                    for percent in (50, 90, 99, 100)
+                )
+            )
+        return "\n".join(lines) + "\n"
+
+
+    def write_summary(self, path: str):
+        """Write the summary to a file.
+
+        :param path: Path of the file to write.
+        """
+        with open(path, "wt", encoding="UTF-8") as file:
+            file.write(self.summary())
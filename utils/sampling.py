@@ -0,0 +1,105 @@
+"""Low overhead sampling profiler for long sessions."""
+
+import os
+import signal
+from types import CodeType, FrameType
+
+
+class SamplingProfiler:
+    """Periodically samples the main thread's stack from a `SIGPROF` timer, and
+    counts how often each stack is seen. The timer only runs on CPU time, so
+    the time spent sleeping between frames costs nothing.
+
+    Stacks are stored as tuples of code objects, and are only turned into text
+    when the folded output is written, so each sample is a short walk up the
+    frames and a dictionary increment.
+
+    :param interval: Seconds of CPU time between samples.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.stacks: dict[tuple[CodeType, ...], int] = {}
+        """Number of times each stack was sampled, from the outermost frame in."""
+        self.samples = 0
+        """Total number of samples taken."""
+        self._old_handler = None
+
+
+    @staticmethod
+    def available() -> bool:
+        """Check if the platform supports the profiling timer.
+
+        :return: True if the profiler can run. False otherwise.
+        """
+        return hasattr(signal, "setitimer") and hasattr(signal, "SIGPROF")
+
+
+    def start(self):
+        """Install the signal handler and start the timer."""
+        self._old_handler = signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+
+    def stop(self):
+        """Stop the timer and restore the previous signal handler."""
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        if self._old_handler is not None:
+            signal.signal(signal.SIGPROF, self._old_handler)
+            self._old_handler = None
+
+
+    def _sample(self, _signum: int, frame: FrameType | None):
+        """Record the stack of the interrupted frame.
+
+        :param _signum: The signal number, always `SIGPROF`.
+        :param frame: The frame that was running when the signal arrived.
+        """
+        codes = []
+        while frame is not None:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        codes.reverse()
+
+        stack = tuple(codes)
+        self.stacks[stack] = self.stacks.get(stack, 0) + 1
+        self.samples += 1
+
+
+    @staticmethod
+    def _frame_name(code: CodeType) -> str:
+        """Format a frame for the folded output.
+
+        :param code: The code object of the frame.
+
+        :return: The function name, file name and line number.
+        """
+        return (
+            f"{code.co_name} "
+            f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        )
+
+
+    def folded(self) -> list[str]:
+        """Get the samples in the folded stack format used by flamegraph
+        tools: the frames separated by semicolons, then the sample count.
+
+        :return: One line per distinct stack, most sampled first.
+        """
+        return [
+            ";".join(self._frame_name(code) for code in stack) + f" {count}"
+            for stack, count in sorted(
+                self.stacks.items(),
+                key=lambda item: item[1],
+                reverse=True
+            )
+        ]
+
+
+    def write(self, path: str):
+        """Write the folded stacks to a file.
+
+        :param path: Path of the file to write.
+        """
+        with open(path, "wt", encoding="UTF-8") as file:
+            file.writelines(f"{line}\n" for line in self.folded())